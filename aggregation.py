@@ -0,0 +1,322 @@
+"""
+Fused Group-By Aggregation Engine
+=================================
+Computes many group-by tables in a single pass per grouping key. Each key
+column is factorized to integer codes once (category codes are reused
+directly), and every requested (column, aggregate) pair is then reduced
+with vectorized np.bincount calls over those codes instead of running a
+separate pandas groupby per table.
+
+Tables are declared the same way as `DataFrame.groupby(key).agg(spec)`:
+
+    tables = {
+        'payment': ('payment_method', {'customer_id': 'count',
+                                       'avg_order_value': 'mean'}),
+        'clv': ('segment', {'customer_lifetime_value': ['mean', 'median', 'sum']}),
+    }
+    results = aggregate_tables(df, tables)
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import numpy as np
+import pandas as pd
+
+SUPPORTED_AGGS = ('count', 'sum', 'mean', 'std', 'var', 'median', 'min', 'max')
+# Aggregates computable from count / sum / sum of squares (see tables_from_stats)
+MERGEABLE_AGGS = ('count', 'sum', 'mean', 'std', 'var')
+
+
+def factorize_key(values):
+    """
+    Convert a grouping column to integer codes
+
+    Returns:
+        tuple: (codes, index) where codes are -1 for missing keys and
+        index holds the group labels in sorted order
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy(dtype=np.int64)
+        index = pd.CategoricalIndex(values.cat.categories, dtype=values.dtype,
+                                    name=values.name)
+        return codes, index
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), pd.Index(uniques, name=values.name)
+
+
+def _grouped_sorted(codes, v, n_groups):
+    """Sort values within groups once for median/min/max lookups"""
+    order = np.lexsort((v, codes))
+    sorted_v = v[order]
+    sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    return sorted_v, starts
+
+
+def _reduce_column(codes, values, aggs, n_groups):
+    """
+    Compute every aggregate for one measure column over shared codes
+
+    Returns:
+        dict: Aggregate name to an array of length n_groups
+    """
+    is_integer = pd.api.types.is_integer_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype)
+    v = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(v)
+    if not valid.all():
+        codes, v = codes[valid], v[valid]
+
+    out = {}
+    counts = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if {'sum', 'mean', 'std', 'var'} & set(aggs):
+            sums = np.bincount(codes, weights=v, minlength=n_groups)
+            means = sums / counts
+        if {'std', 'var'} & set(aggs):
+            # Two-pass variance around the group mean for numerical stability
+            sq = np.bincount(codes, weights=(v - means[codes]) ** 2, minlength=n_groups)
+            var = np.where(counts > 1, sq / (counts - 1), np.nan)
+        if {'median', 'min', 'max'} & set(aggs):
+            sorted_v, starts = _grouped_sorted(codes, v, n_groups)
+            nonempty = counts > 0
+            last = starts + np.maximum(counts - 1, 0)
+
+        for agg in aggs:
+            if agg == 'count':
+                out[agg] = counts.astype(np.int64)
+            elif agg == 'sum':
+                out[agg] = sums.round().astype(np.int64) if is_integer else sums
+            elif agg == 'mean':
+                out[agg] = means
+            elif agg == 'var':
+                out[agg] = var
+            elif agg == 'std':
+                out[agg] = np.sqrt(var)
+            elif agg == 'median':
+                lo = starts + np.maximum(counts - 1, 0) // 2
+                hi = starts + counts // 2
+                lo, hi = np.minimum(lo, len(sorted_v) - 1), np.minimum(hi, len(sorted_v) - 1)
+                out[agg] = np.where(nonempty, (sorted_v[lo] + sorted_v[hi]) / 2, np.nan)
+            elif agg in ('min', 'max'):
+                idx = np.minimum(starts if agg == 'min' else last, len(sorted_v) - 1)
+                if is_integer:
+                    # Empty groups are dropped by the caller, so 0 is only a placeholder
+                    out[agg] = np.where(nonempty, sorted_v[idx], 0).astype(values.dtype)
+                else:
+                    out[agg] = np.where(nonempty, sorted_v[idx], np.nan)
+            else:
+                raise ValueError(f"Unsupported aggregate '{agg}'; use one of {SUPPORTED_AGGS}")
+    return out
+
+
+def fused_aggregate(df, specs, derived=None):
+    """
+    Compute a flat list of (group key, column, aggregate) specs
+
+    All specs that share a group key are computed from one factorization
+    of that key; each measure column is read once per key.
+
+    Args:
+        df: Customer DataFrame
+        specs: Iterable of (key, column, agg) tuples
+        derived: Optional dict of column name to Series used instead of
+            (or in addition to) df columns, e.g. boolean flags to sum
+
+    Returns:
+        dict: key -> (group index, observed mask, {(column, agg): array})
+    """
+    derived = derived or {}
+    plan = {}
+    for key, column, agg in specs:
+        plan.setdefault(key, {}).setdefault(column, [])
+        if agg not in plan[key][column]:
+            plan[key][column].append(agg)
+
+    results = {}
+    for key, columns in plan.items():
+        codes, index = factorize_key(df[key])
+        present = codes >= 0
+        if not present.all():
+            codes = codes[present]
+        n_groups = len(index)
+        observed = np.bincount(codes, minlength=n_groups) > 0
+
+        values = {}
+        for column, aggs in columns.items():
+            series = derived[column] if column in derived else df[column]
+            if not present.all():
+                series = series[present]
+            for agg, arr in _reduce_column(codes, series, aggs, n_groups).items():
+                values[(column, agg)] = arr
+        results[key] = (index, observed, values)
+    return results
+
+
+def aggregate_tables(df, tables, derived=None):
+    """
+    Build several group-by tables with the fused engine
+
+    Args:
+        df: Customer DataFrame
+        tables: Dict of name -> (key, agg_spec), where agg_spec maps each
+            column to an aggregate name or list of names (as in
+            DataFrame.agg). Tables whose columns are missing from df are
+            skipped.
+        derived: Optional dict of extra/override columns (see fused_aggregate)
+
+    Returns:
+        dict: Table name -> DataFrame shaped like df.groupby(key).agg(agg_spec)
+    """
+    derived = derived or {}
+    available = set(df.columns) | set(derived)
+    usable = {}
+    specs = []
+    for name, (key, agg_spec) in tables.items():
+        if key not in df.columns or not set(agg_spec) <= available:
+            continue
+        usable[name] = (key, agg_spec)
+        for column, aggs in agg_spec.items():
+            for agg in ([aggs] if isinstance(aggs, str) else aggs):
+                specs.append((key, column, agg))
+
+    computed = fused_aggregate(df, specs, derived=derived)
+
+    out = {}
+    for name, (key, agg_spec) in usable.items():
+        index, observed, values = computed[key]
+        multi = any(not isinstance(aggs, str) for aggs in agg_spec.values())
+        data = {}
+        for column, aggs in agg_spec.items():
+            if isinstance(aggs, str):
+                label = (column, aggs) if multi else column
+                data[label] = values[(column, aggs)][observed]
+            else:
+                for agg in aggs:
+                    data[(column, agg)] = values[(column, agg)][observed]
+        table = pd.DataFrame(data, index=index[observed])
+        if multi:
+            table.columns = pd.MultiIndex.from_tuples(table.columns)
+        out[name] = table
+    return out
+
+
+def tables_from_stats(stats, tables):
+    """
+    Build group-by tables from sufficient statistics
+
+    Non-mergeable aggregates (e.g. median) are dropped from each spec.
+
+    Returns:
+        dict: Table name -> DataFrame shaped like df.groupby(key).agg(spec)
+    """
+    out = {}
+    for name, (key, agg_spec) in tables.items():
+        multi = any(not isinstance(aggs, str) for aggs in agg_spec.values())
+        data = {}
+        groups = None
+        for column, aggs in agg_spec.items():
+            if (key, column) not in stats:
+                break
+            st = stats[(key, column)]
+            st = st[st['count'] > 0]
+            groups = st.index
+            n, total, sumsq = st['count'].to_numpy(), st['sum'].to_numpy(), st['sumsq'].to_numpy()
+            with np.errstate(invalid='ignore', divide='ignore'):
+                var = np.where(n > 1, np.maximum(sumsq - total * total / n, 0) / (n - 1), np.nan)
+                values = {'count': n.astype(np.int64), 'sum': total, 'mean': total / n,
+                          'var': var, 'std': np.sqrt(var)}
+            for agg in ([aggs] if isinstance(aggs, str) else aggs):
+                if agg in MERGEABLE_AGGS:
+                    data[(column, agg) if multi else column] = values[agg]
+        else:
+            if data:
+                table = pd.DataFrame(data, index=groups)
+                if multi:
+                    table.columns = pd.MultiIndex.from_tuples(table.columns)
+                out[name] = table
+    return out
+
+
+# Table specs of the customer analysis, shared by analyze_customers.py and
+# api_server.py (kept here so the API does not import the plotting stack)
+SEGMENT_TABLES = {
+    'segment_stats': ('segment', {
+        'annual_income': ['mean', 'median', 'std'],
+        'spending_score': ['mean', 'median', 'std'],
+        'purchase_frequency': ['mean', 'median'],
+        'avg_order_value': ['mean', 'median'],
+        'total_purchases': ['mean', 'sum'],
+        'browsing_time_minutes': ['mean', 'median'],
+        'customer_id': ['count']
+    }),
+}
+
+BEHAVIOR_TABLES = {
+    'gender_stats': ('gender', {
+        'spending_score': 'mean',
+        'purchase_frequency': 'mean',
+        'avg_order_value': 'mean',
+        'total_purchases': 'sum'
+    }),
+    'age_stats': ('age_group', {
+        'spending_score': 'mean',
+        'purchase_frequency': 'mean',
+        'avg_order_value': 'mean'
+    }),
+}
+
+PRODUCT_TABLES = {
+    'category_stats': ('product_category_preference', {
+        'customer_id': 'count',
+        'spending_score': 'mean',
+        'avg_order_value': 'mean',
+        'purchase_frequency': 'mean',
+        'customer_lifetime_value': 'mean'
+    }),
+    'device_stats': ('device_type', {
+        'customer_id': 'count',
+        'browsing_time_minutes': 'mean',
+        'purchase_frequency': 'mean',
+        'spending_score': 'mean',
+        'mobile_app_user': 'sum'
+    }),
+    'cross_category_stats': ('cross_category_purchases', {
+        'customer_id': 'count',
+        'spending_score': 'mean',
+        'customer_lifetime_value': 'mean'
+    }),
+}
+
+ENHANCED_TABLES = {
+    'clv_stats': ('segment', {'customer_lifetime_value': ['mean', 'median', 'sum']}),
+    'payment_stats': ('payment_method', {
+        'customer_id': 'count',
+        'avg_order_value': 'mean',
+        'spending_score': 'mean'
+    }),
+    'loyalty_stats': ('loyalty_tier', {
+        'customer_id': 'count',
+        'customer_lifetime_value': 'mean',
+        'repeat_purchase_rate': 'mean'
+    }),
+    'email_stats': ('newsletter_subscribed', {
+        'email_open_rate': 'mean',
+        'click_through_rate': 'mean',
+        'customer_id': 'count'
+    }),
+    'social_stats': ('segment', {'social_media_engagement': ['mean', 'median']}),
+    'satisfaction_stats': ('segment', {'customer_satisfaction_score': ['mean', 'count']}),
+    'geo_stats': ('geographic_region', {
+        'customer_id': 'count',
+        'spending_score': 'mean',
+        'customer_lifetime_value': 'mean'
+    }),
+    'referral_stats': ('referral_source', {
+        'customer_id': 'count',
+        'spending_score': 'mean',
+        'customer_lifetime_value': 'mean'
+    }),
+}
@@ -27,6 +27,17 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
+from data_loader import load_customers
+from aggregation import BEHAVIOR_TABLES, ENHANCED_TABLES, PRODUCT_TABLES, SEGMENT_TABLES
+from cube import age_groups, cube_or_aggregate, load_cube
+from streaming_clustering import streaming_kmeans
+from incremental import run_incremental
+from sketches import explore_file
+from correlation import METHODS, correlations_from_frame, load_correlations, top_pairs
+from approximate import (DEFAULT_RESERVOIR_SIZE, PROGRESS_EVERY, describe_sample, estimate_tables,
+                         format_estimates, load_sample, refine_sample, weighted_corr)
+from profiling import add_profile_arguments, profile_from_args, report_profile, stage
+import argparse
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -34,15 +45,18 @@ warnings.filterwarnings('ignore')
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 8)
 
-def load_data(file_path='ecommerce_customers.csv'):
+def load_data(file_path='ecommerce_customers.csv', columns=None):
     """
-    Load the e-commerce customer dataset
+    Load the e-commerce customer dataset (typed schema, Parquet-cached)
+    
+    Args:
+        columns: Optional list of columns to load
     
     Returns:
         DataFrame: Customer data
     """
     try:
-        df = pd.read_csv(file_path)
+        df = load_customers(file_path, columns=columns)
         print(f"Dataset loaded successfully: {len(df)} customers")
         return df
     except FileNotFoundError:
@@ -73,41 +87,78 @@ def explore_data(df):
     
     # Categorical columns
     print("\n4. Categorical Features:")
-    categorical_cols = df.select_dtypes(include=['object']).columns
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns
     for col in categorical_cols:
         print(f"\n   {col}:")
         print(df[col].value_counts())
 
-def analyze_segments(df):
+def analyze_segments(df, cube=None, approx=None):
     """
     Analyze customer segments
+    
+    Tables the aggregate cube can answer are read from `cube`; the rest
+    (e.g. medians) are computed from df. With `approx` (a sample state
+    from approximate.py) the tables are estimated from the sample instead,
+    with confidence intervals.
+    
+    Returns:
+        dict: Aggregate tables keyed by name
     """
     print("\n" + "="*60)
     print("CUSTOMER SEGMENTATION ANALYSIS")
     print("="*60)
     
-    segment_stats = df.groupby('segment').agg({
-        'annual_income': ['mean', 'median', 'std'],
-        'spending_score': ['mean', 'median', 'std'],
-        'purchase_frequency': ['mean', 'median'],
-        'avg_order_value': ['mean', 'median'],
-        'total_purchases': ['mean', 'sum'],
-        'browsing_time_minutes': ['mean', 'median']
-    }).round(2)
+    if approx is not None:
+        return _approximate_segments(approx)
+    
+    tables = cube_or_aggregate(df, SEGMENT_TABLES, cube)
+    segment_stats = tables['segment_stats']
+    segment_counts = segment_stats[('customer_id', 'count')]
+    segment_stats = segment_stats.drop(columns=[('customer_id', 'count')]).round(2)
     
     print("\nSegment Statistics:")
     print(segment_stats)
     
     # Segment distribution
     print("\nSegment Distribution:")
-    segment_counts = df['segment'].value_counts()
+    segment_counts = segment_counts.sort_values(ascending=False, kind='stable')
     for segment, count in segment_counts.items():
         percentage = (count / len(df)) * 100
         print(f"   {segment}: {count} customers ({percentage:.1f}%)")
+    
+    return {'segment_stats': segment_stats, 'segment_counts': segment_counts}
 
-def analyze_purchasing_behavior(df):
+def _approximate_segments(approx):
+    """analyze_segments() estimated from a sample"""
+    tables, errors = estimate_tables(approx, SEGMENT_TABLES)
+    count_label = ('customer_id', 'count')
+    segment_stats = tables['segment_stats'].drop(columns=[count_label])
+    segment_counts = tables['segment_stats'][count_label]
+    count_errors = errors['segment_stats'][count_label]
+    
+    print("\nSegment Statistics (estimated, 95% CI):")
+    print(format_estimates(segment_stats, errors['segment_stats'].drop(columns=[count_label])))
+    
+    print("\nSegment Distribution:")
+    segment_counts = segment_counts.sort_values(ascending=False, kind='stable')
+    for segment, count in segment_counts.items():
+        percentage = (count / approx['rows']) * 100
+        print(f"   {segment}: {count:,.0f} ± {count_errors[segment]:,.0f} customers ({percentage:.1f}%)")
+    
+    return {'segment_stats': segment_stats, 'segment_counts': segment_counts,
+            'errors': errors['segment_stats']}
+
+def analyze_purchasing_behavior(df, cube=None, approx=None, correlations=None):
     """
     Analyze customer purchasing behavior
+    
+    Correlations are read from `correlations` (see correlation.py) when
+    given, else computed from df; besides the main purchasing columns the
+    strongest pairs over every numeric column are listed. Both use the rows
+    complete in every numeric column; Spearman is marked approximate when
+    the file's ranks came from t-digests. With `approx` (a
+    sample state from approximate.py) correlations and tables are
+    estimated from the sample.
     """
     print("\n" + "="*60)
     print("PURCHASING BEHAVIOR ANALYSIS")
@@ -116,87 +167,87 @@ def analyze_purchasing_behavior(df):
     # Correlation analysis
     numeric_cols = ['age', 'annual_income', 'spending_score', 'purchase_frequency', 
                    'avg_order_value', 'total_purchases', 'browsing_time_minutes']
-    correlation_matrix = df[numeric_cols].corr()
-    
+    spearman = None
+    if approx is not None:
+        correlation_matrix = weighted_corr(approx, numeric_cols)
+    else:
+        if correlations is None:
+            correlations = correlations_from_frame(df)
+        correlation_matrix = correlations['pearson'].loc[numeric_cols, numeric_cols]
+        spearman = correlations['spearman']
+    
+    rank_label = 'Spearman' if correlations is None or correlations.get('exact_ranks', True) \
+        else 'approx. Spearman'
     print("\n1. Correlation Matrix (Top Correlations):")
-    # Get top correlations
-    corr_pairs = []
-    for i in range(len(correlation_matrix.columns)):
-        for j in range(i+1, len(correlation_matrix.columns)):
-            corr_pairs.append((
-                correlation_matrix.columns[i],
-                correlation_matrix.columns[j],
-                correlation_matrix.iloc[i, j]
-            ))
-    
-    corr_pairs.sort(key=lambda x: abs(x[2]), reverse=True)
-    for col1, col2, corr in corr_pairs[:10]:
-        print(f"   {col1} ↔ {col2}: {corr:.3f}")
+    for col1, col2, corr in top_pairs(correlation_matrix, 10):
+        rank_corr = f" ({rank_label} {spearman.loc[col1, col2]:.3f})" if spearman is not None else ""
+        print(f"   {col1} ↔ {col2}: {corr:.3f}{rank_corr}")
+    if correlations is not None and approx is None:
+        print(f"   (over the {int(correlations['rows']):,} customers with every numeric column present)")
+        for method in METHODS:
+            label = rank_label if method == 'spearman' else method.title()
+            print(f"\n   Strongest pairs over all {len(correlations[method])} numeric columns "
+                  f"({label}):")
+            for col1, col2, corr in top_pairs(correlations[method], 10):
+                print(f"   {col1} ↔ {col2}: {corr:.3f}")
+    
+    if approx is not None:
+        sample = approx['sample']
+        tables, errors = estimate_tables(approx, BEHAVIOR_TABLES,
+                                         derived={'age_group': age_groups(sample['age'])})
+        print("\n2. Gender-based Analysis (estimated, 95% CI):")
+        print(format_estimates(tables['gender_stats'], errors['gender_stats']))
+        print("\n3. Age Group Analysis (estimated, 95% CI):")
+        print(format_estimates(tables['age_stats'], errors['age_stats']))
+        return
+    
+    df['age_group'] = age_groups(df['age'])
+    tables = cube_or_aggregate(df, BEHAVIOR_TABLES, cube)
     
     # Gender analysis
     print("\n2. Gender-based Analysis:")
-    gender_stats = df.groupby('gender').agg({
-        'spending_score': 'mean',
-        'purchase_frequency': 'mean',
-        'avg_order_value': 'mean',
-        'total_purchases': 'sum'
-    }).round(2)
-    print(gender_stats)
+    print(tables['gender_stats'].round(2))
     
     # Age group analysis
     print("\n3. Age Group Analysis:")
-    df['age_group'] = pd.cut(df['age'], bins=[0, 25, 35, 50, 100], 
-                             labels=['Young (0-25)', 'Adult (26-35)', 'Middle (36-50)', 'Senior (50+)'])
-    age_stats = df.groupby('age_group').agg({
-        'spending_score': 'mean',
-        'purchase_frequency': 'mean',
-        'avg_order_value': 'mean'
-    }).round(2)
-    print(age_stats)
+    print(tables['age_stats'].round(2))
 
-def analyze_product_preferences(df):
+def analyze_product_preferences(df, cube=None):
     """
     Analyze product category preferences
+    
+    Returns:
+        dict: Aggregate tables keyed by name
     """
     print("\n" + "="*60)
     print("PRODUCT PREFERENCE ANALYSIS")
     print("="*60)
     
+    # Mobile app users are counted by summing a Yes flag
+    tables = cube_or_aggregate(df, PRODUCT_TABLES, cube,
+                               derived={'mobile_app_user': df['mobile_app_user'] == 'Yes'})
+    tables = {name: table.round(2) for name, table in tables.items()}
+    
     # Product category preferences
     print("\n1. Product Category Preferences:")
-    category_stats = df.groupby('product_category_preference').agg({
-        'customer_id': 'count',
-        'spending_score': 'mean',
-        'avg_order_value': 'mean',
-        'purchase_frequency': 'mean',
-        'customer_lifetime_value': 'mean'
-    }).round(2)
+    category_stats = tables['category_stats']
     category_stats.columns = ['Customer Count', 'Avg Spending Score', 'Avg Order Value', 
                              'Avg Purchase Frequency', 'Avg CLV']
     print(category_stats)
     
     # Device type analysis
     print("\n2. Device Type Analysis:")
-    device_stats = df.groupby('device_type').agg({
-        'customer_id': 'count',
-        'browsing_time_minutes': 'mean',
-        'purchase_frequency': 'mean',
-        'spending_score': 'mean',
-        'mobile_app_user': lambda x: (x == 'Yes').sum()
-    }).round(2)
+    device_stats = tables['device_stats']
     device_stats.columns = ['Customer Count', 'Avg Browsing Time', 'Avg Purchase Frequency', 
                            'Avg Spending Score', 'Mobile App Users']
     print(device_stats)
     
     # Cross-category purchases
-    if 'cross_category_purchases' in df.columns:
+    if 'cross_category_stats' in tables:
         print("\n3. Cross-Category Purchase Analysis:")
-        cross_cat_stats = df.groupby('cross_category_purchases').agg({
-            'customer_id': 'count',
-            'spending_score': 'mean',
-            'customer_lifetime_value': 'mean'
-        }).round(2)
-        print(cross_cat_stats)
+        print(tables['cross_category_stats'])
+    
+    return tables
 
 def perform_clustering(df, n_clusters=4):
     """
@@ -208,7 +259,7 @@ def perform_clustering(df, n_clusters=4):
     
     # Select features for clustering
     features = ['annual_income', 'spending_score', 'purchase_frequency', 'avg_order_value']
-    X = df[features].values
+    X = df[features].to_numpy(dtype=np.float64)
     
     # Standardize features
     scaler = StandardScaler()
@@ -232,90 +283,162 @@ def perform_clustering(df, n_clusters=4):
     
     return df
 
-def analyze_enhanced_features(df):
+def perform_streaming_clustering(file_path='ecommerce_customers.csv', n_clusters=4,
+                                 output_file='customer_analysis_results.csv',
+                                 chunksize=250_000):
+    """
+    Perform K-means clustering out of core (running scaler + mini-batch K-Means)
+    
+    Labels are written to output_file chunk by chunk, so the full feature
+    matrix is never held in memory.
+    
+    Returns:
+        DataFrame: Cluster statistics
+    """
+    print("\n" + "="*60)
+    print("CUSTOMER CLUSTERING (Streaming Mini-Batch K-Means)")
+    print("="*60)
+    
+    features = ['annual_income', 'spending_score', 'purchase_frequency', 'avg_order_value']
+    cluster_stats, _, _ = streaming_kmeans(file_path, features, output_file,
+                                           n_clusters=n_clusters, chunksize=chunksize)
+    
+    print(f"\nClustering with {n_clusters} clusters:")
+    cluster_stats = cluster_stats.round(2)
+    cluster_stats.columns = ['Avg Income', 'Avg Spending Score', 'Avg Purchase Freq', 'Avg Order Value', 'Count']
+    print(cluster_stats)
+    
+    return cluster_stats
+
+def analyze_enhanced_features(df, cube=None):
     """
     Analyze enhanced features
+    
+    Tables grouped by a cube dimension are read from `cube`; the others
+    are computed together by the fused aggregation engine (one
+    factorization per grouping column).
+    
+    Returns:
+        dict: Aggregate tables keyed by name
     """
     print("\n" + "="*60)
     print("ENHANCED FEATURES ANALYSIS")
     print("="*60)
     
+    tables = cube_or_aggregate(df, ENHANCED_TABLES, cube)
+    
+    # Single-column tables print like SeriesGroupBy.agg([...])
+    for name in ('clv_stats', 'social_stats', 'satisfaction_stats'):
+        if name in tables:
+            tables[name] = tables[name].droplevel(0, axis=1)
+    
     # Customer Lifetime Value
-    if 'customer_lifetime_value' in df.columns:
+    if 'clv_stats' in tables:
         print("\n1. Customer Lifetime Value Analysis:")
-        clv_stats = df.groupby('segment')['customer_lifetime_value'].agg(['mean', 'median', 'sum']).round(2)
-        print(clv_stats)
+        print(tables['clv_stats'].round(2))
     
     # Payment methods
-    if 'payment_method' in df.columns:
+    if 'payment_stats' in tables:
         print("\n2. Payment Method Preferences:")
-        payment_stats = df.groupby('payment_method').agg({
-            'customer_id': 'count',
-            'avg_order_value': 'mean',
-            'spending_score': 'mean'
-        }).round(2)
-        print(payment_stats)
+        print(tables['payment_stats'].round(2))
     
     # Loyalty program
-    if 'loyalty_tier' in df.columns:
+    if 'loyalty_stats' in tables:
         print("\n3. Loyalty Tier Distribution:")
-        loyalty_stats = df.groupby('loyalty_tier').agg({
-            'customer_id': 'count',
-            'customer_lifetime_value': 'mean',
-            'repeat_purchase_rate': 'mean'
-        }).round(2)
-        print(loyalty_stats)
+        print(tables['loyalty_stats'].round(2))
     
     # Email marketing
-    if 'email_open_rate' in df.columns:
+    if 'email_stats' in tables:
         print("\n4. Email Marketing Metrics:")
-        email_stats = df.groupby('newsletter_subscribed').agg({
-            'email_open_rate': 'mean',
-            'click_through_rate': 'mean',
-            'customer_id': 'count'
-        }).round(3)
-        print(email_stats)
+        print(tables['email_stats'].round(3))
     
     # Social media engagement
-    if 'social_media_engagement' in df.columns:
+    if 'social_stats' in tables:
         print("\n5. Social Media Engagement:")
-        social_stats = df.groupby('segment')['social_media_engagement'].agg(['mean', 'median']).round(1)
-        print(social_stats)
+        print(tables['social_stats'].round(1))
     
     # Customer satisfaction
-    if 'customer_satisfaction_score' in df.columns:
+    if 'satisfaction_stats' in tables:
         print("\n6. Customer Satisfaction by Segment:")
-        satisfaction_stats = df.groupby('segment')['customer_satisfaction_score'].agg(['mean', 'count']).round(2)
-        print(satisfaction_stats)
+        print(tables['satisfaction_stats'].round(2))
     
     # Geographic analysis
-    if 'geographic_region' in df.columns:
+    if 'geo_stats' in tables:
         print("\n7. Geographic Distribution:")
-        geo_stats = df.groupby('geographic_region').agg({
-            'customer_id': 'count',
-            'spending_score': 'mean',
-            'customer_lifetime_value': 'mean'
-        }).round(2)
-        print(geo_stats)
+        print(tables['geo_stats'].round(2))
     
     # Referral sources
-    if 'referral_source' in df.columns:
+    if 'referral_stats' in tables:
         print("\n8. Referral Source Analysis:")
-        referral_stats = df.groupby('referral_source').agg({
-            'customer_id': 'count',
-            'spending_score': 'mean',
-            'customer_lifetime_value': 'mean'
-        }).round(2)
-        print(referral_stats)
+        print(tables['referral_stats'].round(2))
+    
+    return tables
+
+def incremental_analysis(df, file_path='ecommerce_customers.csv', n_clusters=4,
+                         drift_threshold=0.25):
+    """
+    Update segment/enhanced-feature tables and clusters incrementally
+    
+    Only customers added, changed or removed since the previous run are
+    processed; K-Means is refitted only when centroid drift exceeds
+    drift_threshold. Median columns are omitted (not mergeable).
+    
+    Returns:
+        tuple: (df with cluster column, tables)
+    """
+    print("\n" + "="*60)
+    print("INCREMENTAL ANALYSIS")
+    print("="*60)
+    
+    features = ['annual_income', 'spending_score', 'purchase_frequency', 'avg_order_value']
+    df, tables, info = run_incremental(df, file_path, 'analyze_customers',
+                                       {**SEGMENT_TABLES, **ENHANCED_TABLES}, features,
+                                       n_clusters=n_clusters, label_column='cluster',
+                                       drift_threshold=drift_threshold)
+    
+    print(f"\nCustomers added: {info['added']}, changed: {info['changed']}, removed: {info['removed']}")
+    print(f"Centroid drift: {info['drift']:.3f} (threshold {drift_threshold})")
+    print("Clusters refitted" if info['refit'] else "Clusters updated for changed rows only")
+    
+    for name, table in tables.items():
+        print(f"\n{name}:")
+        print(table.round(2))
+    
+    print("\nCluster Distribution:")
+    print(df['cluster'].value_counts().sort_index())
+    
+    return df, tables
 
-def generate_insights(df):
+def _most_common(column):
+    """
+    Most frequent value of a column and its count
+    
+    Ties go to the value that appears first in the data, as value_counts()
+    does on plain string columns (on category columns it would pick the
+    first category instead).
+    """
+    codes, uniques = pd.factorize(column)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    best = int(np.argmax(counts))
+    return uniques[best], int(counts[best])
+
+def generate_insights(df, approx=None):
     """
     Generate key insights from the analysis
+    
+    With `approx` (a sample state from approximate.py) the insights are
+    estimated from the sample.
     """
     print("\n" + "="*60)
     print("KEY INSIGHTS")
     print("="*60)
     
+    if approx is not None:
+        insights = _approximate_insights(approx)
+        for i, insight in enumerate(insights, 1):
+            print(f"\n{i}. {insight}")
+        return
+    
     insights = []
     
     # Insight 1: High value customers
@@ -324,14 +447,14 @@ def generate_insights(df):
                    f"with average spending score of {high_value['spending_score'].mean():.1f}")
     
     # Insight 2: Most preferred category
-    top_category = df['product_category_preference'].value_counts().index[0]
+    top_category, top_category_count = _most_common(df['product_category_preference'])
     insights.append(f"Most Preferred Category: {top_category} "
-                   f"({df['product_category_preference'].value_counts()[top_category]} customers)")
+                   f"({top_category_count} customers)")
     
     # Insight 3: Device preference
-    top_device = df['device_type'].value_counts().index[0]
+    top_device, top_device_count = _most_common(df['device_type'])
     insights.append(f"Most Used Device: {top_device} "
-                   f"({df['device_type'].value_counts()[top_device]} customers)")
+                   f"({top_device_count} customers)")
     
     # Insight 4: Average metrics
     insights.append(f"Average Annual Income: ${df['annual_income'].mean():,.0f}")
@@ -344,11 +467,11 @@ def generate_insights(df):
         insights.append(f"Total CLV: ${df['customer_lifetime_value'].sum():,.2f}")
     
     if 'loyalty_tier' in df.columns:
-        top_tier = df['loyalty_tier'].value_counts().index[0]
+        top_tier, _ = _most_common(df['loyalty_tier'])
         insights.append(f"Most Common Loyalty Tier: {top_tier}")
     
     if 'payment_method' in df.columns:
-        top_payment = df['payment_method'].value_counts().index[0]
+        top_payment, _ = _most_common(df['payment_method'])
         insights.append(f"Most Preferred Payment Method: {top_payment}")
     
     if 'newsletter_subscribed' in df.columns:
@@ -358,38 +481,218 @@ def generate_insights(df):
     for i, insight in enumerate(insights, 1):
         print(f"\n{i}. {insight}")
 
-def main():
+INSIGHT_TABLES = {
+    'segment': ('segment', {'customer_id': 'count', 'spending_score': 'mean'}),
+    'category': ('product_category_preference', {'customer_id': 'count'}),
+    'device': ('device_type', {'customer_id': 'count'}),
+    'overall': ('all', {'annual_income': 'mean', 'spending_score': 'mean',
+                        'purchase_frequency': 'mean',
+                        'customer_lifetime_value': ['mean', 'sum']}),
+    'loyalty': ('loyalty_tier', {'customer_id': 'count'}),
+    'payment': ('payment_method', {'customer_id': 'count'}),
+    'newsletter': ('newsletter_subscribed', {'customer_id': 'count'}),
+}
+
+def _approximate_insights(approx):
     """
-    Main analysis function
+    generate_insights() estimated from a sample
+    
+    Returns:
+        list: Insight strings with 95% confidence intervals
+    """
+    sample = approx['sample']
+    tables, errors = estimate_tables(approx, INSIGHT_TABLES,
+                                     derived={'all': pd.Series('All', index=sample.index)})
+    rows = approx['rows']
+    
+    def top(name):
+        counts = tables[name]['customer_id']
+        label = counts.idxmax()
+        return label, counts[label], errors[name]['customer_id'][label]
+    
+    def overall(column, agg='mean'):
+        return tables['overall'][(column, agg)].iloc[0], errors['overall'][(column, agg)].iloc[0]
+    
+    insights = []
+    segment, segment_err = tables['segment'], errors['segment']
+    if 'High Value' in segment.index:
+        count, err = segment['customer_id']['High Value'], segment_err['customer_id']['High Value']
+        insights.append(f"High Value Customers: {count:,.0f} ± {err:,.0f} ({count/rows*100:.1f}%) "
+                        f"with average spending score of {segment['spending_score']['High Value']:.1f} "
+                        f"± {segment_err['spending_score']['High Value']:.1f}")
+    category, count, err = top('category')
+    insights.append(f"Most Preferred Category: {category} ({count:,.0f} ± {err:,.0f} customers)")
+    device, count, err = top('device')
+    insights.append(f"Most Used Device: {device} ({count:,.0f} ± {err:,.0f} customers)")
+    
+    value, err = overall('annual_income')
+    insights.append(f"Average Annual Income: ${value:,.0f} ± {err:,.0f}")
+    value, err = overall('spending_score')
+    insights.append(f"Average Spending Score: {value:.1f} ± {err:.1f}")
+    value, err = overall('purchase_frequency')
+    insights.append(f"Average Purchase Frequency: {value:.1f} ± {err:.1f} purchases")
+    value, err = overall('customer_lifetime_value')
+    insights.append(f"Average Customer Lifetime Value: ${value:,.2f} ± {err:,.2f}")
+    value, err = overall('customer_lifetime_value', 'sum')
+    insights.append(f"Total CLV: ${value:,.2f} ± {err:,.2f}")
+    
+    insights.append(f"Most Common Loyalty Tier: {top('loyalty')[0]}")
+    insights.append(f"Most Preferred Payment Method: {top('payment')[0]}")
+    newsletter = tables['newsletter']['customer_id']
+    if 'Yes' in newsletter.index:
+        count, err = newsletter['Yes'], errors['newsletter']['customer_id']['Yes']
+        insights.append(f"Newsletter Subscribers: {count:,.0f} ± {err:,.0f} ({count/rows*100:.1f}%)")
+    return insights
+
+PROGRESS_TABLES = {
+    'segment': ('segment', {'customer_id': 'count', 'spending_score': 'mean',
+                            'customer_lifetime_value': 'mean'}),
+}
+
+def print_interim_estimates(state):
+    """
+    Progress callback for approximate.build_sample: segment estimates from
+    the part of the file scanned so far
+    """
+    tables, errors = estimate_tables(state, PROGRESS_TABLES)
+    print(f"\nInterim estimates after {state['rows']:,} customers scanned "
+          f"({len(state['sample']):,} sampled):")
+    print(format_estimates(tables['segment'], errors['segment']))
+
+def run_approximate_analysis(args, profile=None):
+    """
+    Answer the segment, behavior and insight reports from the persisted
+    stratified sample, once per --refine fraction
+    
+    When the sample has to be drawn, interim segment estimates are printed
+    every --progress-every chunks of the scan.
+    """
+    with stage(profile, 'load_sample'):
+        approx = load_sample(args.file, reservoir_size=args.reservoir_size,
+                             progress=print_interim_estimates,
+                             progress_every=args.progress_every)
+    
+    for fraction in args.refine:
+        level = refine_sample(approx, fraction)
+        print("\n" + "="*60)
+        print(f"APPROXIMATE RESULTS: {describe_sample(level)}")
+        print("="*60)
+        with stage(profile, f"approximate_{fraction:g}"):
+            analyze_segments(None, approx=level)
+            analyze_purchasing_behavior(None, approx=level)
+            generate_insights(None, approx=level)
+
+def run_analysis(args, profile=None):
+    """
+    Run the analysis selected by the command-line arguments
+    
+    Each stage is measured when `profile` (see profiling.py) is given.
     """
     print("="*60)
     print("E-COMMERCE CUSTOMER DATASET ANALYSIS")
     print("RSK World - https://rskworld.in")
     print("="*60)
     
+    output_file = 'customer_analysis_results.csv'
+    
+    if args.streaming:
+        with stage(profile, 'explore_file'):
+            explore_file(args.file, workers=args.workers)
+        with stage(profile, 'streaming_clustering'):
+            perform_streaming_clustering(args.file, output_file=output_file, chunksize=args.chunksize)
+        print(f"\nClustering results saved to '{output_file}'")
+        print("\n" + "="*60)
+        print("ANALYSIS COMPLETE")
+        print("="*60)
+        return
+    
+    if args.approximate:
+        run_approximate_analysis(args, profile)
+        print("\n" + "="*60)
+        print("ANALYSIS COMPLETE")
+        print("="*60)
+        return
+    
     # Load data
-    df = load_data()
+    with stage(profile, 'load') as record:
+        df = record['df'] = load_data(args.file)
     if df is None:
         return
     
-    # Perform analyses
-    explore_data(df)
-    analyze_segments(df)
-    analyze_purchasing_behavior(df)
-    analyze_product_preferences(df)
-    analyze_enhanced_features(df)
-    df = perform_clustering(df)
-    generate_insights(df)
+    if args.incremental:
+        with stage(profile, 'incremental_analysis', df) as record:
+            df, _ = incremental_analysis(df, args.file, drift_threshold=args.drift_threshold)
+            record['df'] = df
+        with stage(profile, 'write_csv'):
+            df.to_csv(output_file, index=False)
+        print(f"\nAnalysis results saved to '{output_file}'")
+        print("\n" + "="*60)
+        print("ANALYSIS COMPLETE")
+        print("="*60)
+        return
+    
+    # Perform analyses (grouped tables come from the persisted aggregate cube)
+    with stage(profile, 'load_cube'):
+        cube = load_cube(args.file)
+    with stage(profile, 'explore_data', df):
+        explore_data(df)
+    with stage(profile, 'analyze_segments', df):
+        analyze_segments(df, cube)
+    with stage(profile, 'load_correlations'):
+        correlations = load_correlations(args.file)
+    with stage(profile, 'analyze_purchasing_behavior', df):
+        analyze_purchasing_behavior(df, cube, correlations=correlations)
+    with stage(profile, 'analyze_product_preferences', df):
+        analyze_product_preferences(df, cube)
+    with stage(profile, 'analyze_enhanced_features', df):
+        analyze_enhanced_features(df, cube)
+    with stage(profile, 'perform_clustering', df) as record:
+        df = record['df'] = perform_clustering(df)
+    with stage(profile, 'generate_insights', df):
+        generate_insights(df)
     
     # Save results
-    output_file = 'customer_analysis_results.csv'
-    df.to_csv(output_file, index=False)
+    with stage(profile, 'write_csv', df):
+        df.to_csv(output_file, index=False)
     print(f"\nAnalysis results saved to '{output_file}'")
     
     print("\n" + "="*60)
     print("ANALYSIS COMPLETE")
     print("="*60)
 
+def main(argv=None):
+    """
+    Main analysis function
+    """
+    parser = argparse.ArgumentParser(description='E-commerce customer dataset analysis')
+    parser.add_argument('--file', default='ecommerce_customers.csv', help='Input CSV file')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Only run the out-of-core profile and clustering (for files larger than memory)')
+    parser.add_argument('--chunksize', type=int, default=250_000, help='Rows per chunk in streaming mode')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for the streaming profile (default: all cores)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process customers changed since the last incremental run')
+    parser.add_argument('--drift-threshold', type=float, default=0.25,
+                        help='Centroid drift (standardized units) that triggers a full K-Means refit')
+    parser.add_argument('--approximate', action='store_true',
+                        help='Estimate segment/behavior/insight tables from a persisted stratified sample')
+    parser.add_argument('--reservoir-size', type=int, default=DEFAULT_RESERVOIR_SIZE,
+                        help='Sampled customers per (segment, region, loyalty tier) stratum')
+    parser.add_argument('--refine', type=lambda text: [float(f) for f in text.split(',')],
+                        default=[1.0], metavar='FRACTIONS',
+                        help='Answer from growing shares of the sample, e.g. 0.1,0.5,1')
+    parser.add_argument('--progress-every', type=int, default=PROGRESS_EVERY, metavar='CHUNKS',
+                        help='Print interim estimates every CHUNKS chunks while the sample is drawn '
+                             '(0 = off)')
+    add_profile_arguments(parser, 'analyze_customers')
+    args = parser.parse_args(argv)
+    
+    profile = profile_from_args(args, 'analyze_customers')
+    try:
+        run_analysis(args, profile)
+    finally:
+        report_profile(profile, args)
+
 if __name__ == "__main__":
     main()
-
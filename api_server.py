@@ -0,0 +1,514 @@
+"""
+Customer Analytics HTTP API
+===========================
+A small local HTTP service (standard library asyncio) that serves the
+aggregates from analyze_customers.py as compact JSON, plus paginated and
+filtered customer rows, so index.html no longer downloads and parses the
+whole CSV in the browser.
+
+Endpoints:
+    GET /api/summary                 row/column/segment/category counts
+    GET /api/segments                segment statistics (SEGMENT_TABLES without medians)
+    GET /api/categories              product category statistics
+    GET /api/devices                 device type statistics
+    GET /api/insights                key insights (as generate_insights, plus the
+                                     most preferred payment method)
+    GET /api/customers?offset=0&limit=10&segment=High+Value&columns=age,gender
+                                     rows, filtered on any categorical column
+    GET /<file>                      static files (index.html, the CSV, ...)
+
+Aggregates are read only from the persisted aggregate cube (cube.py), so
+the table specs are served without their non-mergeable aggregates
+(medians); analyze_customers.py reports those. Customer rows are loaded
+once through the Parquet cache, and only for /api/customers. Encoded responses are kept in an
+in-process LRU cache keyed by path and query; the cache is dropped when
+the CSV's size or mtime changes. Responses carry an ETag (If-None-Match
+returns 304) and are gzip-compressed when the client accepts it.
+
+The event loop only parses requests and writes responses (HTTP/1.1
+keep-alive); filtering, aggregation and encoding run in a thread pool, so
+a slow filtered query never blocks other connections. load_test.py
+measures how many concurrent dashboard users the service sustains.
+
+Usage:
+    python api_server.py                          # http://127.0.0.1:8000/
+    python api_server.py --port 8080 --file big.csv --cache-size 512 --workers 4
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+import pandas as pd
+from aggregation import MERGEABLE_AGGS, PRODUCT_TABLES, SEGMENT_TABLES
+from cube import DIMENSIONS, cube_mean, cube_slice, cube_tables, load_cube
+from data_loader import (COLUMNS, DEFAULT_FILE, SCHEMA, file_fingerprint, load_customers,
+                         read_rows)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+CACHE_SIZE = 256
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 1000
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = 512
+WORKERS = min(32, (os.cpu_count() or 1) + 4)
+STREAM_BLOCK = 1 << 20
+FILTER_COLUMNS = [col for col, dtype in SCHEMA.items() if dtype == 'category']
+
+
+class BadRequest(ValueError):
+    """Invalid query parameters (answered with 400; other failures are 500)"""
+
+
+def make_state(file_path=DEFAULT_FILE, cache_size=CACHE_SIZE):
+    """
+    Shared server state: dataset handles and the response cache
+
+    `lock` guards the response cache and dataset checks (held briefly);
+    `load_lock` makes concurrent requests share one cube/row load.
+
+    Returns:
+        dict: file_path, cache_size, fingerprint, generation, cube, df,
+        responses, lock, load_lock
+    """
+    return {'file_path': file_path, 'cache_size': cache_size, 'fingerprint': None,
+            'generation': 0, 'cube': None, 'df': None, 'responses': OrderedDict(),
+            'lock': threading.Lock(), 'load_lock': threading.Lock()}
+
+
+def check_dataset(state):
+    """Drop cached data and responses when the CSV's size or mtime has changed"""
+    current = file_fingerprint(state['file_path'], with_hash=False)
+    if current != state['fingerprint']:
+        state.update(fingerprint=current, cube=None, df=None, generation=state['generation'] + 1)
+        state['responses'].clear()
+
+
+def get_cube(state):
+    """Aggregate cube of the current dataset (loaded on first use)"""
+    cube = state['cube']
+    if cube is None:
+        with state['load_lock']:
+            if state['cube'] is None:
+                state['cube'] = load_cube(state['file_path'])
+            cube = state['cube']
+    return cube
+
+
+def get_customers(state):
+    """Customer rows of the current dataset (loaded on first use)"""
+    df = state['df']
+    if df is None:
+        with state['load_lock']:
+            if state['df'] is None:
+                state['df'] = load_customers(state['file_path'])
+            df = state['df']
+    return df
+
+
+def _records(frame):
+    """DataFrame -> list of JSON-ready dicts, flattening (column, agg) headers"""
+    frame = frame.copy()
+    if isinstance(frame.columns, pd.MultiIndex):
+        frame.columns = ['_'.join(col) for col in frame.columns]
+    return json.loads(frame.reset_index().to_json(orient='records', double_precision=4))
+
+
+def _mergeable(spec):
+    """A table spec without the aggregates the cube cannot merge (e.g. median)"""
+    key, agg_spec = spec
+    kept = {}
+    for column, aggs in agg_spec.items():
+        if isinstance(aggs, str):
+            if aggs in MERGEABLE_AGGS:
+                kept[column] = aggs
+        elif any(agg in MERGEABLE_AGGS for agg in aggs):
+            kept[column] = [agg for agg in aggs if agg in MERGEABLE_AGGS]
+    return key, kept
+
+
+# Aggregate endpoints never load customer rows: every spec is answered by the cube
+API_TABLES = {
+    'segment_stats': _mergeable(SEGMENT_TABLES['segment_stats']),
+    'category_stats': _mergeable(PRODUCT_TABLES['category_stats']),
+    'device_stats': _mergeable(PRODUCT_TABLES['device_stats']),
+}
+
+
+def _table(state, name):
+    """Evaluate one of API_TABLES from the cube"""
+    return cube_tables(get_cube(state), {name: API_TABLES[name]})[name]
+
+
+def api_summary(state, query):
+    """Dataset size and the number of segments and categories"""
+    cube = get_cube(state)
+    return {'rows': int(cube['count'].sum()), 'columns': len(COLUMNS),
+            'segments': int(cube['segment'].nunique()),
+            'categories': int(cube['product_category_preference'].nunique())}
+
+
+def api_segments(state, query):
+    """Segment statistics and counts"""
+    return {'segments': _records(_table(state, 'segment_stats'))}
+
+
+def api_categories(state, query):
+    """Product category statistics"""
+    return {'categories': _records(_table(state, 'category_stats'))}
+
+
+def api_devices(state, query):
+    """Device type statistics (mobile_app_user is the number of app users)"""
+    return {'devices': _records(_table(state, 'device_stats'))}
+
+
+def api_insights(state, query):
+    """
+    The key insights of analyze_customers.generate_insights, from the cube
+
+    A tie for the most common value goes to the value that appears first
+    in the data (the cube keeps each cell's first row), as in
+    generate_insights.
+    """
+    cube = get_cube(state)
+    everything = cube.drop(columns=[d for d in DIMENSIONS if d in cube.columns] + ['first_row']).sum()
+    total = int(everything['count'])
+
+    def overall_mean(measure):
+        return float(everything[f"{measure}__sum"] / everything[f"{measure}__n"])
+
+    def top(dim):
+        sliced = cube_slice(cube, dim).sort_values(['count', 'first_row'], ascending=[False, True])
+        return {'value': str(sliced.index[0]), 'customers': int(sliced['count'].iloc[0])}
+
+    by_segment = cube_slice(cube, 'segment')
+    high_value = int(by_segment['count'].get('High Value', 0))
+    insights = {
+        'high_value': {'customers': high_value, 'pct': round(high_value / total * 100, 1),
+                       'avg_spending_score': round(float(cube_mean(by_segment, 'spending_score')
+                                                         .get('High Value', float('nan'))), 1)},
+        'top_category': top('product_category_preference'),
+        'top_device': top('device_type'),
+        'top_payment_method': top('payment_method'),
+        'avg_annual_income': round(overall_mean('annual_income'), 2),
+        'avg_spending_score': round(overall_mean('spending_score'), 1),
+        'avg_purchase_frequency': round(overall_mean('purchase_frequency'), 1),
+    }
+    if 'customer_lifetime_value__sum' in everything:
+        insights['avg_customer_lifetime_value'] = round(overall_mean('customer_lifetime_value'), 2)
+        insights['total_customer_lifetime_value'] = round(float(everything['customer_lifetime_value__sum']), 2)
+    if 'loyalty_tier' in cube.columns:
+        insights['top_loyalty_tier'] = top('loyalty_tier')
+    if 'newsletter_subscribed__sum' in everything:
+        subscribed = int(round(everything['newsletter_subscribed__sum']))
+        insights['newsletter_subscribers'] = {'customers': subscribed,
+                                              'pct': round(subscribed / total * 100, 1)}
+    return {'insights': insights}
+
+
+def api_customers(state, query):
+    """
+    One page of customer rows
+
+    Query parameters: offset, limit (at most MAX_LIMIT), columns
+    (comma separated) and <categorical column>=<value> filters (repeat a
+    column to match any of several values). Unfiltered pages read only
+    their rows (data_loader.read_rows, total from the cube); the full
+    dataset is loaded once a filter needs it.
+    """
+    try:
+        offset = max(int(query.get('offset', ['0'])[0]), 0)
+        limit = min(max(int(query.get('limit', [str(DEFAULT_LIMIT)])[0]), 0), MAX_LIMIT)
+    except ValueError:
+        raise BadRequest("offset and limit must be integers")
+
+    columns = COLUMNS
+    if 'columns' in query:
+        columns = [c for c in query['columns'][0].split(',') if c]
+        unknown = [c for c in columns if c not in COLUMNS]
+        if unknown:
+            raise BadRequest(f"Unknown columns: {', '.join(unknown)}")
+
+    filters = {}
+    for col, values in query.items():
+        if col in FILTER_COLUMNS:
+            filters[col] = values
+        elif col not in ('offset', 'limit', 'columns'):
+            raise BadRequest(f"Cannot filter on '{col}' (filters: {', '.join(FILTER_COLUMNS)})")
+
+    if not filters:
+        total = int(get_cube(state)['count'].sum())
+        page = read_rows(state['file_path'], offset, limit, columns=columns)
+    else:
+        df = get_customers(state)
+        mask = None
+        for col, values in filters.items():
+            match = df[col].isin(values)
+            mask = match if mask is None else mask & match
+        positions = mask.to_numpy().nonzero()[0]
+        total, page = len(positions), df.iloc[positions[offset:offset + limit]]
+    rows = json.loads(page[columns].to_json(orient='records', double_precision=4))
+    return {'total': int(total), 'offset': offset, 'limit': limit, 'rows': rows}
+
+
+ROUTES = {
+    '/api/summary': api_summary,
+    '/api/segments': api_segments,
+    '/api/categories': api_categories,
+    '/api/devices': api_devices,
+    '/api/insights': api_insights,
+    '/api/customers': api_customers,
+}
+
+
+def cached_response(state, path, query_string):
+    """
+    Encoded response for an API request, from the LRU cache when possible
+
+    The payload is computed outside the cache lock, so requests for
+    different keys run concurrently in the worker pool. A response computed
+    while the dataset changed is returned but not cached. Invalid queries
+    (BadRequest) answer 400; data or loader failures (e.g. the CSV was
+    removed) answer 500 and are logged.
+
+    Returns:
+        dict: status, body, gzip (compressed body or None) and etag
+    """
+    query = parse_qs(query_string, keep_blank_values=True)
+    key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+    generation = None
+    try:
+        with state['lock']:
+            check_dataset(state)
+            generation = state['generation']
+            responses = state['responses']
+            if key in responses:
+                responses.move_to_end(key)
+                return responses[key]
+        status, payload = HTTPStatus.OK, ROUTES[path](state, query)
+    except BadRequest as e:
+        status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+    except Exception as e:
+        _log_error(f"{path}?{query_string}")
+        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"}
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    response = {'status': status, 'body': body,
+                'gzip': gzip.compress(body, 6) if len(body) >= GZIP_MIN_BYTES else None,
+                'etag': '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'}
+    if status == HTTPStatus.OK:
+        with state['lock']:
+            if state['generation'] == generation:
+                responses[key] = response
+                while len(responses) > state['cache_size']:
+                    responses.popitem(last=False)
+    return response
+
+
+def _log_error(context):
+    """Print the current exception with the request it failed"""
+    print(f"Error handling {context}:", file=sys.stderr)
+    traceback.print_exc()
+
+
+def _error(status, message):
+    """JSON error response"""
+    return status, [('Content-Type', 'application/json')], \
+        json.dumps({'error': message}).encode('utf-8')
+
+
+def _static_file(directory, path):
+    """Resolve a URL path to a file inside `directory`, or None"""
+    relative = unquote(path).lstrip('/') or 'index.html'
+    root = os.path.realpath(directory)
+    full = os.path.realpath(os.path.join(root, relative))
+    if os.path.commonpath([root, full]) != root or not os.path.isfile(full):
+        return None
+    return full
+
+
+def respond(state, method, target, headers, directory):
+    """
+    Handle one request (runs in the worker pool)
+
+    Args:
+        state: Dict from make_state()
+        method, target: Request method and target ('/api/customers?limit=5')
+        headers: Request headers with lower-case names
+        directory: Directory of the static files
+
+    Returns:
+        tuple: (status, header list, body) where body is bytes, or an open
+        static file to stream (closed by the caller)
+    """
+    if method not in ('GET', 'HEAD'):
+        return _error(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported")
+    url = urlsplit(target)
+    if url.path not in ROUTES:
+        if url.path.startswith('/api/'):
+            return _error(HTTPStatus.NOT_FOUND, 'Unknown API endpoint')
+        full = _static_file(directory, url.path)
+        if full is None:
+            return _error(HTTPStatus.NOT_FOUND, 'File not found')
+        content_type = mimetypes.guess_type(full)[0] or 'application/octet-stream'
+        try:
+            f = open(full, 'rb')
+        except FileNotFoundError:
+            return _error(HTTPStatus.NOT_FOUND, 'File not found')
+        return HTTPStatus.OK, [('Content-Type', content_type),
+                               ('Content-Length', str(os.fstat(f.fileno()).st_size))], f
+
+    response = cached_response(state, url.path, url.query)
+    if response['status'] == HTTPStatus.OK and response['etag'] in headers.get('if-none-match', ''):
+        return HTTPStatus.NOT_MODIFIED, [('ETag', response['etag'])], b''
+
+    body = response['body']
+    response_headers = [('Content-Type', 'application/json'), ('ETag', response['etag']),
+                        ('Cache-Control', 'no-cache'), ('Vary', 'Accept-Encoding')]
+    if response['gzip'] is not None and 'gzip' in headers.get('accept-encoding', ''):
+        body = response['gzip']
+        response_headers.append(('Content-Encoding', 'gzip'))
+    return response['status'], response_headers, body
+
+
+async def _read_request(reader):
+    """Read a request line and headers; None at end of stream"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, version = line.decode('latin-1').split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+async def handle_connection(reader, writer, state, executor, directory):
+    """Serve the requests of one (keep-alive) connection"""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except ValueError:
+                request = None
+                status, headers, body = _error(HTTPStatus.BAD_REQUEST, 'Malformed request')
+                version, method, keep_alive = 'HTTP/1.1', 'GET', False
+            else:
+                if request is None:
+                    break
+                method, target, version, request_headers = request
+                connection = request_headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                try:
+                    status, headers, body = await loop.run_in_executor(
+                        executor, respond, state, method, target, request_headers, directory)
+                except Exception as e:
+                    _log_error(f"{method} {target}")
+                    status, headers, body = _error(HTTPStatus.INTERNAL_SERVER_ERROR,
+                                                   f"{type(e).__name__}: {e}")
+
+            if isinstance(body, bytes) and status != HTTPStatus.NOT_MODIFIED:
+                headers = headers + [('Content-Length', str(len(body)))]
+            headers = headers + [('Connection', 'keep-alive' if keep_alive else 'close')]
+            head = f"HTTP/1.1 {status.value} {status.phrase}\r\n" + \
+                ''.join(f"{name}: {value}\r\n" for name, value in headers) + '\r\n'
+            writer.write(head.encode('latin-1'))
+            if isinstance(body, bytes):
+                if method != 'HEAD':
+                    writer.write(body)
+            else:
+                with body as f:
+                    while method != 'HEAD':
+                        block = await loop.run_in_executor(executor, f.read, STREAM_BLOCK)
+                        if not block:
+                            break
+                        writer.write(block)
+                        await writer.drain()
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(file_path=DEFAULT_FILE, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                       cache_size=CACHE_SIZE, workers=WORKERS, directory=None):
+    """
+    Start the asyncio HTTP server
+
+    The event loop only parses requests and writes responses; handlers
+    (cube reads, row filtering, JSON encoding, file reads) run in a pool
+    of `workers` threads.
+
+    Args:
+        file_path: Customer CSV the API reads
+        host, port: Address to bind
+        cache_size: Number of encoded responses kept in the LRU cache
+        workers: Worker threads for request handlers
+        directory: Directory of the static files (default: the CSV's)
+
+    Returns:
+        asyncio.Server
+    """
+    directory = directory or os.path.dirname(os.path.abspath(file_path))
+    state = make_state(file_path, cache_size)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+    return await asyncio.start_server(
+        partial(handle_connection, state=state, executor=executor, directory=directory),
+        host, port)
+
+
+async def serve(file_path=DEFAULT_FILE, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                cache_size=CACHE_SIZE, workers=WORKERS):
+    """Run the server until cancelled"""
+    server = await start_server(file_path, host, port, cache_size, workers)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """Serve the API and the demo page"""
+    parser = argparse.ArgumentParser(description='Serve customer analytics as a JSON API')
+    parser.add_argument('--file', default=DEFAULT_FILE, help='Customer CSV file')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='Address to bind')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='Port to listen on')
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help='Number of responses kept in the LRU cache')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help='Worker threads for request handlers')
+    args = parser.parse_args(argv)
+
+    print(f"Serving {args.file} on http://{args.host}:{args.port}/ "
+          f"with {args.workers} workers (Ctrl+C to stop)", flush=True)
+    try:
+        asyncio.run(serve(args.file, args.host, args.port, args.cache_size, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Approximate Queries on a Stratified Reservoir Sample
+====================================================
+Sample-backed estimates (with confidence intervals) for the group-by
+tables of analyze_customers.py, for interactive exploration of files too
+large to scan on every run.
+
+The sample keeps up to `reservoir_size` customers per stratum, where a
+stratum is one (segment, geographic_region, loyalty_tier) combination,
+plus the exact number of customers in every stratum. It is drawn in one
+streaming pass as a bottom-k sample: every row gets a uniform random key
+and each stratum keeps the rows with the smallest keys, which is a uniform
+sample without replacement that can be merged chunk by chunk. Like the
+aggregate cube it is persisted to .cache/<name>.sample.pkl and rebuilt
+when the CSV's fingerprint changes.
+
+Estimates use the stratified (Horvitz-Thompson) estimator. Group counts
+and sums are domain totals; means are ratio estimates with linearized
+variances. All variances include the finite population correction, so
+strata sampled completely contribute no error (for files smaller than
+the reservoir the answers are exact). Medians and standard deviations are
+weighted point estimates without intervals.
+
+Results can be refined progressively: the rows of each stratum are kept
+in key order, so any prefix of a stratum is itself a uniform sample and
+refine_sample(state, 0.1) answers from the first 10% of every stratum.
+While the sample is drawn, build_sample() can also hand the sample of the
+rows scanned so far to a `progress` callback every `progress_every`
+chunks, so estimates appear (and tighten) before the pass finishes.
+
+Usage:
+    state = load_sample('customers_100m.csv', reservoir_size=1000)
+    tables, errors = estimate_tables(refine_sample(state, 0.25), SEGMENT_TABLES)
+    print(format_estimates(tables['segment_stats'], errors['segment_stats']))
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import os
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+from aggregation import factorize_key
+from data_loader import (CACHE_DIR, CATEGORIES, DEFAULT_CHUNKSIZE, DEFAULT_FILE,
+                         iter_chunks, load_or_build)
+
+SAMPLE_VERSION = 1
+STRATA = ['segment', 'geographic_region', 'loyalty_tier']
+DEFAULT_RESERVOIR_SIZE = 1000
+INTERVAL_AGGS = ('count', 'sum', 'mean')
+PROGRESS_EVERY = 10
+POINT_AGGS = ('std', 'var', 'median')
+
+
+def sample_path(file_path):
+    """Location of the persisted sample for a source CSV"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(directory, f"{name}.sample.pkl")
+
+
+def stratum_codes(df):
+    """
+    Integer stratum of each row (missing values form their own level)
+
+    Returns:
+        ndarray: int64 codes, stable across chunks of the typed loader
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    for col in STRATA:
+        levels = pd.Categorical(df[col], categories=CATEGORIES[col]).codes.astype(np.int64)
+        n_levels = len(CATEGORIES[col]) + 1
+        codes = codes * n_levels + np.where(levels < 0, n_levels - 1, levels)
+    return codes
+
+
+def update_reservoir(sample, chunk, reservoir_size, rng):
+    """
+    Merge a chunk into a bottom-k stratified sample
+
+    Rows whose key cannot beat the current k-th smallest key of their
+    (full) stratum are dropped before the merge, so late chunks cost
+    little more than drawing their keys.
+
+    Returns:
+        DataFrame: Up to reservoir_size rows per stratum, sorted by
+        (_stratum, _key)
+    """
+    strata = stratum_codes(chunk)
+    keys = rng.random(len(chunk))
+    keep = np.ones(len(chunk), dtype=bool)
+    if sample is not None and len(sample):
+        stats = sample.groupby('_stratum')['_key'].agg(['size', 'max'])
+        thresholds = pd.Series(np.where(stats['size'] >= reservoir_size, stats['max'], 1.0),
+                               index=stats.index)
+        keep = keys < thresholds.reindex(strata, fill_value=1.0).to_numpy()
+    candidates = chunk[keep].assign(_stratum=strata[keep], _key=keys[keep])
+    merged = candidates if sample is None else pd.concat([sample, candidates], ignore_index=True)
+    merged = merged.sort_values(['_stratum', '_key'], kind='stable', ignore_index=True)
+    return merged[merged.groupby('_stratum').cumcount() < reservoir_size].reset_index(drop=True)
+
+
+def _sample_state(sample, counts, reservoir_size, random_state):
+    """Sample state from the reservoirs and stratum sizes collected so far"""
+    sample = sample.assign(_rank=sample.groupby('_stratum').cumcount())
+    counts = counts.astype(np.int64).sort_index()
+    return {'sample': sample, 'counts': counts, 'rows': int(counts.sum()),
+            'reservoir_size': reservoir_size, 'random_state': random_state}
+
+
+def build_sample(file_path=DEFAULT_FILE, reservoir_size=DEFAULT_RESERVOIR_SIZE, random_state=42,
+                 chunksize=DEFAULT_CHUNKSIZE, progress=None, progress_every=PROGRESS_EVERY):
+    """
+    Draw the stratified reservoir sample in one pass over the CSV
+
+    Keys are drawn from one seeded stream in file order, so the sample
+    does not depend on the chunk size.
+
+    Args:
+        file_path: Customer CSV
+        reservoir_size: Customers kept per stratum
+        random_state: Seed of the key stream
+        chunksize: Rows read per chunk
+        progress: Optional callback, called with the sample state of the
+            rows scanned so far every `progress_every` chunks
+        progress_every: Chunks between progress calls
+
+    Returns:
+        dict: sample (rows with _stratum, _key and _rank columns), counts
+        (customers per stratum), rows, reservoir_size, random_state
+    """
+    rng = np.random.default_rng(random_state)
+    sample, counts = None, pd.Series(dtype=np.int64)
+    for i, chunk in enumerate(iter_chunks(file_path, chunksize=chunksize), 1):
+        counts = counts.add(pd.Series(stratum_codes(chunk)).value_counts(), fill_value=0)
+        sample = update_reservoir(sample, chunk, reservoir_size, rng)
+        if progress is not None and progress_every and i % progress_every == 0:
+            progress(_sample_state(sample, counts, reservoir_size, random_state))
+    return _sample_state(sample, counts, reservoir_size, random_state)
+
+
+def load_sample(file_path=DEFAULT_FILE, reservoir_size=DEFAULT_RESERVOIR_SIZE, random_state=42,
+                rebuild=False, progress=None, progress_every=PROGRESS_EVERY):
+    """
+    Load the persisted sample, rebuilding it when the CSV or the sample
+    parameters have changed (`progress` is passed to build_sample)
+
+    Returns:
+        dict: Sample state (see build_sample)
+    """
+    return load_or_build(
+        sample_path(file_path), file_path,
+        lambda: build_sample(file_path, reservoir_size, random_state, progress=progress,
+                             progress_every=progress_every),
+        {'version': SAMPLE_VERSION, 'reservoir_size': reservoir_size,
+         'random_state': random_state}, rebuild=rebuild)
+
+
+def refine_sample(state, fraction):
+    """
+    Restrict a sample to the first `fraction` of every stratum
+
+    At least two rows per stratum are kept (when available) so that
+    variances can be estimated.
+
+    Returns:
+        dict: Sample state answering from the smaller sample
+    """
+    sample = state['sample']
+    sizes = sample.groupby('_stratum')['_rank'].transform('size').to_numpy()
+    take = np.clip(np.ceil(fraction * sizes), np.minimum(sizes, 2), sizes)
+    return dict(state, sample=sample[sample['_rank'].to_numpy() < take], fraction=fraction)
+
+
+def _stratified_variance(S, Q, k, N):
+    """
+    Variance of an estimated total from per-stratum sums S and sums of
+    squares Q (strata x groups) of the sampled values
+
+    Returns:
+        ndarray: One variance per group
+    """
+    k = k[:, None]
+    N = N[:, None]
+    s2 = np.divide(Q - S ** 2 / k, k - 1, out=np.zeros_like(S), where=k > 1)
+    return (N ** 2 * (1 - k / N) * np.maximum(s2, 0.0) / k).sum(axis=0)
+
+
+def _weighted_median(values, weights):
+    """Weighted median (midpoint of the two middle values on an exact tie, as pandas)"""
+    if len(values) == 0:
+        return np.nan
+    order = np.argsort(values, kind='stable')
+    values, cumulative = values[order], np.cumsum(weights[order])
+    half = cumulative[-1] / 2
+    i = np.searchsorted(cumulative, half)
+    if np.isclose(cumulative[i], half) and i + 1 < len(values):
+        return (values[i] + values[i + 1]) / 2
+    return values[i]
+
+
+def estimate_tables(state, tables, derived=None, confidence=0.95):
+    """
+    Estimate group-by tables from a sample
+
+    Args:
+        state: Sample state from load_sample() or refine_sample()
+        tables: Table specs as in aggregation.aggregate_tables (aggregates
+            in INTERVAL_AGGS get confidence intervals, POINT_AGGS do not)
+        derived: Extra/override columns (Series aligned with the sample),
+            usable as keys or measures
+        confidence: Confidence level of the intervals
+
+    Returns:
+        tuple: (estimates, errors), each a dict of table name -> DataFrame
+        shaped like df.groupby(key).agg(spec); errors hold the interval
+        half-widths (NaN for point estimates)
+    """
+    sample = state['sample']
+    derived = derived or {}
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    strata, h = np.unique(sample['_stratum'].to_numpy(), return_inverse=True)
+    k = np.bincount(h).astype(np.float64)
+    N = state['counts'].reindex(strata).to_numpy(dtype=np.float64)
+    weights = (N / k)[h]
+
+    def column(name):
+        return derived[name] if name in derived else sample[name]
+
+    estimates, errors = {}, {}
+    for name, (key, agg_spec) in tables.items():
+        if not {key, *agg_spec} <= set(sample.columns) | set(derived):
+            continue
+        g, index = factorize_key(column(key))
+        index = index.rename(key)
+        present = g >= 0
+        n_groups = len(index)
+        observed = np.bincount(g[present], minlength=n_groups) > 0
+        cell = h * n_groups + np.where(present, g, 0)
+
+        def sums(values, mask):
+            """Per (stratum, group) sums of values over mask (strata x groups)"""
+            return np.bincount(cell[mask], weights=values[mask],
+                               minlength=len(strata) * n_groups).reshape(len(strata), n_groups)
+
+        multi = any(not isinstance(aggs, str) for aggs in agg_spec.values())
+        values, halves = {}, {}
+        for col, aggs in agg_spec.items():
+            aggs = [aggs] if isinstance(aggs, str) else aggs
+            if col == 'customer_id':
+                y = np.ones(len(sample))
+            else:
+                y = pd.to_numeric(column(col), errors='coerce').to_numpy(dtype=np.float64)
+            valid = present & ~np.isnan(y)
+            c = sums(np.ones(len(y)), valid)
+            S = sums(y, valid)
+            Q = sums(y * y, valid)
+            T_c = (c * (N / k)[:, None]).sum(axis=0)
+            T_y = (S * (N / k)[:, None]).sum(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                R = T_y / T_c
+                for agg in aggs:
+                    label = (col, agg) if multi else col
+                    if agg == 'count':
+                        est, var = T_c, _stratified_variance(c, c, k, N)
+                    elif agg == 'sum':
+                        est, var = T_y, _stratified_variance(S, Q, k, N)
+                    elif agg == 'mean':
+                        S_z = (S - R * c) / T_c
+                        Q_z = (Q - 2 * R * S + R ** 2 * c) / T_c ** 2
+                        est, var = R, _stratified_variance(S_z, Q_z, k, N)
+                    elif agg in ('var', 'std'):
+                        T_yy = (Q * (N / k)[:, None]).sum(axis=0)
+                        est = (T_yy / T_c - R ** 2) * T_c / (T_c - 1)
+                        est, var = (np.sqrt(est) if agg == 'std' else est), np.full(n_groups, np.nan)
+                    elif agg == 'median':
+                        est = np.array([_weighted_median(y[valid & (g == i)], weights[valid & (g == i)])
+                                        for i in range(n_groups)])
+                        var = np.full(n_groups, np.nan)
+                    else:
+                        raise ValueError(f"Unsupported aggregate '{agg}'; "
+                                         f"use one of {INTERVAL_AGGS + POINT_AGGS}")
+                    values[label] = est[observed]
+                    halves[label] = z * np.sqrt(var[observed])
+
+        table = pd.DataFrame(values, index=index[observed])
+        error = pd.DataFrame(halves, index=index[observed])
+        if multi:
+            table.columns = error.columns = pd.MultiIndex.from_tuples(table.columns)
+        estimates[name], errors[name] = table, error
+    return estimates, errors
+
+
+def weighted_corr(state, columns):
+    """
+    Correlation matrix estimated from a sample (rows weighted by their
+    stratum's inverse sampling rate)
+
+    Returns:
+        DataFrame: Correlation matrix of `columns`
+    """
+    sample = state['sample']
+    strata = sample['_stratum'].to_numpy()
+    sizes = pd.Series(strata).map(pd.Series(strata).value_counts()).to_numpy()
+    weights = state['counts'].reindex(strata).to_numpy() / sizes
+    X = sample[columns].to_numpy(dtype=np.float64)
+    cov = np.cov(X, rowvar=False, aweights=weights)
+    sd = np.sqrt(np.diag(cov))
+    return pd.DataFrame(cov / np.outer(sd, sd), index=columns, columns=columns)
+
+
+def format_estimates(table, errors, decimals=2):
+    """
+    Render estimates as 'value ± half-width' strings
+
+    Returns:
+        DataFrame: Strings shaped like `table` (no ± for point estimates)
+    """
+    def cell(value, error):
+        if np.isnan(error):
+            return f"{value:,.{decimals}f}"
+        return f"{value:,.{decimals}f} ± {error:,.{decimals}f}"
+
+    return pd.DataFrame([[cell(v, e) for v, e in zip(row_v, row_e)]
+                         for row_v, row_e in zip(table.to_numpy(dtype=np.float64),
+                                                 errors.to_numpy(dtype=np.float64))],
+                        index=table.index, columns=table.columns)
+
+
+def describe_sample(state):
+    """One-line description of the sample a set of estimates is based on"""
+    sampled = len(state['sample'])
+    return (f"{sampled:,} of {state['rows']:,} customers sampled "
+            f"({sampled / max(state['rows'], 1):.2%}) across {len(state['counts'])} strata; "
+            f"reservoir fraction {state.get('fraction', 1.0):g}")
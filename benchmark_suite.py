@@ -0,0 +1,312 @@
+"""
+Pipeline Benchmark Suite
+========================
+Times and memory-profiles every pipeline stage on synthetic fixtures of
+increasing size, and compares the results with a saved baseline so
+performance regressions show up before deploying.
+
+Fixtures are generated with generate_enhanced_dataset.py (same segment
+distributions, fixed seed) at the requested sizes and kept in
+.cache/bench/. Benchmarked stages:
+- load_data (warm Parquet cache)
+- explore_data and each analyze_* function, perform_clustering and
+  generate_insights (analyze_customers.py)
+- kmeans/dbscan/hierarchical segmentation (customer_segmentation.py)
+- each plot_* function (visualize_data.py, Agg backend, written to a
+  temporary directory)
+
+Each benchmark runs once under tracemalloc for its peak allocation and
+then `--repeat` times for wall/CPU time and RSS growth (profiling.stage).
+Results are written as JSON. With a baseline, a benchmark regresses when
+it is more than `--tolerance` slower (or allocates that much more) than
+the baseline and the absolute difference is above the noise floor; the
+script then exits with status 1.
+
+Usage:
+    python benchmark_suite.py --sizes 1e4,1e5 --save-baseline
+    python benchmark_suite.py --sizes 1e4,1e5            # compare to baseline
+    python benchmark_suite.py --sizes 1e6,1e7 --only 'analyze_*' --only load_data
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+import numpy as np
+import analyze_customers
+import customer_segmentation
+import visualize_data
+from cube import load_cube
+from data_loader import CACHE_DIR
+from generate_enhanced_dataset import generate_dataset, generate_sharded
+from hierarchical_clustering import measure_peak_memory
+from profiling import stage
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = '1e4,1e5'
+RESULTS_FILE = 'benchmark_results.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+FIXTURE_DIR = os.path.join(CACHE_DIR, 'bench')
+# Fixtures at least this large are generated in parallel
+SHARDED_ROWS = 1_000_000
+TOLERANCE = 0.25
+# Differences below these are treated as noise
+MIN_DELTA_SECONDS = 0.005
+MIN_DELTA_MB = 1.0
+
+
+def fixture_path(n_rows, seed=42):
+    """Location of the fixture CSV for a size and seed"""
+    return os.path.join(FIXTURE_DIR, f"customers_{n_rows}_seed{seed}.csv")
+
+
+def ensure_fixture(n_rows, seed=42, workers=None):
+    """Generate the fixture CSV unless it already exists"""
+    path = fixture_path(n_rows, seed)
+    if not os.path.exists(path):
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        print(f"Generating {n_rows:,} row fixture '{path}'...")
+        tmp_path = path + '.tmp.csv'
+        if n_rows >= SHARDED_ROWS:
+            generate_sharded(tmp_path, n_rows, seed=seed, workers=workers)
+        else:
+            generate_dataset(tmp_path, n_rows, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def _fixture_frames(path):
+    """Inputs shared by the benchmarks of one fixture (loaded once)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return {'path': path,
+                'analysis': analyze_customers.load_data(path),
+                'segmentation': customer_segmentation.load_and_prepare_data(path)[0],
+                'plot': visualize_data.load_data(path),
+                'cube': load_cube(path)}
+
+
+def benchmark_specs():
+    """
+    The benchmarked stages
+
+    Returns:
+        dict: name -> (setup, func); setup(frames) returns the args of func
+        and runs outside the measurement (e.g. copying the DataFrame a
+        stage mutates)
+    """
+    analysis = lambda frames: (frames['analysis'].copy(), frames['cube'])
+    specs = {
+        'load_data': (lambda frames: (frames['path'],), analyze_customers.load_data),
+        'explore_data': (lambda frames: (frames['analysis'],), analyze_customers.explore_data),
+        'analyze_segments': (analysis, analyze_customers.analyze_segments),
+        'analyze_purchasing_behavior': (analysis, analyze_customers.analyze_purchasing_behavior),
+        'analyze_product_preferences': (analysis, analyze_customers.analyze_product_preferences),
+        'analyze_enhanced_features': (analysis, analyze_customers.analyze_enhanced_features),
+        'perform_clustering': (lambda frames: (frames['analysis'].copy(),),
+                               analyze_customers.perform_clustering),
+        'generate_insights': (lambda frames: (frames['analysis'],), analyze_customers.generate_insights),
+    }
+    for name in ['kmeans_segmentation', 'dbscan_segmentation', 'hierarchical_segmentation']:
+        specs[name] = (lambda frames: (frames['segmentation'].copy(),),
+                       getattr(customer_segmentation, name))
+    for name in dir(visualize_data):
+        if name.startswith('plot_'):
+            specs[name] = (lambda frames: (frames['plot'],), getattr(visualize_data, name))
+    return specs
+
+
+def select_benchmarks(specs, patterns=None):
+    """Benchmarks whose names match any of the fnmatch patterns (all if none)"""
+    if not patterns:
+        return specs
+    return {name: spec for name, spec in specs.items()
+            if any(fnmatch.fnmatch(name, pattern) for pattern in patterns)}
+
+
+def run_benchmark(setup, func, frames, repeat=3, trace_memory=True):
+    """
+    Measure one stage
+
+    Returns:
+        dict: best_s, median_s, cpu_s (of the best run), rss_delta_mb (max
+        over runs) and peak_alloc_mb (tracemalloc peak, None if not traced)
+    """
+    sink = io.StringIO()
+    peak_alloc = None
+    if trace_memory:
+        args = setup(frames)
+        with contextlib.redirect_stdout(sink):
+            _, peak_alloc = measure_peak_memory(func, *args)
+    profile = {'stages': []}
+    for _ in range(repeat):
+        args = setup(frames)
+        with contextlib.redirect_stdout(sink), stage(profile, func.__name__):
+            func(*args)
+        sink.seek(0)
+        sink.truncate()
+    runs = profile['stages']
+    best = min(runs, key=lambda record: record['wall_s'])
+    deltas = [record['rss_delta_mb'] for record in runs if record['rss_delta_mb'] is not None]
+    return {'best_s': best['wall_s'],
+            'median_s': float(np.median([record['wall_s'] for record in runs])),
+            'cpu_s': best['cpu_s'],
+            'rss_delta_mb': max(deltas) if deltas else None,
+            'peak_alloc_mb': peak_alloc}
+
+
+def run_suite(sizes, patterns=None, repeat=3, seed=42, workers=None, trace_memory=True):
+    """
+    Run the selected benchmarks on every fixture size
+
+    Plots are written to a temporary directory that is removed afterwards.
+
+    Returns:
+        dict: Results document (version, created, machine, results list)
+    """
+    specs = select_benchmarks(benchmark_specs(), patterns)
+    visualize_data._init_renderer()
+    results = []
+    for n_rows in sizes:
+        path = os.path.abspath(ensure_fixture(n_rows, seed, workers))
+        frames = _fixture_frames(path)
+        print(f"\n{n_rows:,} rows:")
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as plot_dir:
+            os.chdir(plot_dir)
+            try:
+                for name, (setup, func) in specs.items():
+                    result = run_benchmark(setup, func, frames, repeat, trace_memory)
+                    results.append(dict(result, benchmark=name, rows=n_rows))
+                    alloc = result['peak_alloc_mb']
+                    print(f"   {name:<32}{result['best_s']:>10.3f}s" +
+                          (f"{alloc:>10.1f} MB" if alloc is not None else ''))
+            finally:
+                os.chdir(cwd)
+    return {'version': RESULTS_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpu_count': os.cpu_count()},
+            'repeat': repeat, 'seed': seed, 'results': results}
+
+
+def save_results(document, path):
+    """Write a results document as JSON"""
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(path):
+    """Read a results document"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(document, baseline, tolerance=TOLERANCE):
+    """
+    Compare results with a baseline, benchmark by benchmark and size by size
+
+    Returns:
+        list: One dict per result with benchmark, rows, time_ratio,
+        memory_ratio and status ('ok', 'regression', 'improved' or 'new')
+    """
+    base = {(r['benchmark'], r['rows']): r for r in baseline['results']}
+    comparison = []
+    for result in document['results']:
+        key = (result['benchmark'], result['rows'])
+        row = {'benchmark': key[0], 'rows': key[1], 'time_ratio': None, 'memory_ratio': None,
+               'status': 'new'}
+        if key in base:
+            old = base[key]
+            delta_s = result['best_s'] - old['best_s']
+            row['time_ratio'] = result['best_s'] / old['best_s'] if old['best_s'] > 0 else None
+            slower = delta_s > MIN_DELTA_SECONDS and delta_s > tolerance * old['best_s']
+            faster = -delta_s > MIN_DELTA_SECONDS and -delta_s > tolerance * old['best_s']
+            bigger = False
+            if result.get('peak_alloc_mb') is not None and old.get('peak_alloc_mb') is not None:
+                delta_mb = result['peak_alloc_mb'] - old['peak_alloc_mb']
+                if old['peak_alloc_mb'] > 0:
+                    row['memory_ratio'] = result['peak_alloc_mb'] / old['peak_alloc_mb']
+                bigger = delta_mb > MIN_DELTA_MB and delta_mb > tolerance * old['peak_alloc_mb']
+            row['status'] = 'regression' if slower or bigger else 'improved' if faster else 'ok'
+        comparison.append(row)
+    return comparison
+
+
+def print_comparison(comparison):
+    """Print the baseline comparison, regressions first"""
+    order = {'regression': 0, 'improved': 1, 'new': 2, 'ok': 3}
+
+    def ratio(value):
+        return f"{value:>9.2f}x" if value is not None else f"{'-':>10}"
+
+    print("\nComparison with baseline (time and peak allocation vs baseline):")
+    print(f"   {'benchmark':<32}{'rows':>12}{'time':>10}{'memory':>10}  status")
+    for row in sorted(comparison, key=lambda r: (order[r['status']], r['benchmark'], r['rows'])):
+        print(f"   {row['benchmark']:<32}{row['rows']:>12,}{ratio(row['time_ratio'])}"
+              f"{ratio(row['memory_ratio'])}  {row['status']}")
+    regressions = sum(row['status'] == 'regression' for row in comparison)
+    print(f"\n   {regressions} regression(s)")
+
+
+def parse_sizes(text):
+    """'1e4,1e5' -> [10000, 100000]"""
+    return [int(float(size)) for size in text.split(',') if size.strip()]
+
+
+def main(argv=None):
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(description='Benchmark the analysis pipeline stages')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"Comma-separated fixture sizes (default {DEFAULT_SIZES})")
+    parser.add_argument('--only', action='append', default=None, metavar='PATTERN',
+                        help="Only run benchmarks matching this pattern (repeatable, e.g. 'plot_*')")
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per benchmark')
+    parser.add_argument('--seed', type=int, default=42, help='Fixture seed')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for generating large fixtures')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='Skip the tracemalloc run (faster, no peak allocation)')
+    parser.add_argument('--output', default=RESULTS_FILE, help='Results JSON file')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help='Relative slowdown/allocation growth counted as a regression')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in select_benchmarks(benchmark_specs(), args.only):
+            print(name)
+        return 0
+
+    document = run_suite(parse_sizes(args.sizes), args.only, args.repeat, args.seed,
+                         args.workers, trace_memory=not args.no_memory)
+    save_results(document, args.output)
+    print(f"\nResults saved to '{args.output}'")
+
+    if args.save_baseline:
+        save_results(document, args.baseline)
+        print(f"Baseline saved to '{args.baseline}'")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at '{args.baseline}' (run with --save-baseline to create one)")
+        return 0
+    comparison = compare_results(document, load_results(args.baseline), args.tolerance)
+    print_comparison(comparison)
+    return 1 if any(row['status'] == 'regression' for row in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
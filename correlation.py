@@ -0,0 +1,264 @@
+"""
+Correlation Matrices
+====================
+Pearson and Spearman correlation matrices over every numeric column of
+the schema (Yes/No flags count as 0/1), and top-k pair extraction.
+
+Both matrices come from one set of co-moments: the columns and their
+ranks are stacked side by side and their centered cross-products are
+accumulated, so Pearson is the correlation of the first half and Spearman
+of the second. Co-moments merge exactly (Chan's pairwise update), so a
+file can be processed in byte ranges by worker processes:
+
+1. Rank pass: each column's distribution is summarized with the t-digests
+   of sketches.py. Columns with at most TDIGEST_DELTA distinct values keep
+   an exact histogram and get exact average ranks (as pandas);
+   high-cardinality columns get ranks interpolated from the digest, so
+   their Spearman coefficients are approximate (see 'exact_ranks').
+2. Moment pass: co-moments of [values, ranks] are accumulated per range
+   and merged.
+
+Rows with a missing value in any of the columns are skipped. The result
+is persisted to .cache/<name>.corr.pkl and recomputed when the CSV's
+fingerprint changes, so analyze_customers.py and visualize_data.py share
+one computation.
+
+Usage:
+    correlations = load_correlations('ecommerce_customers.csv')
+    top_pairs(correlations['pearson'], k=10)
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from cube import FLAG_MEASURES, MEASURES
+from data_loader import CACHE_DIR, DEFAULT_FILE, RANGE_BYTES, load_or_build, split_ranges
+from sketches import merge_tdigests, read_range, tdigest_from_values
+
+CORRELATION_VERSION = 2
+NUMERIC_COLUMNS = MEASURES
+METHODS = ('pearson', 'spearman')
+
+
+def numeric_matrix(df, columns):
+    """
+    Columns as a float64 matrix (flags as 0/1), without rows that have
+    a missing value
+
+    Returns:
+        ndarray: rows x columns
+    """
+    X = np.empty((len(df), len(columns)), dtype=np.float64)
+    for j, col in enumerate(columns):
+        if col in FLAG_MEASURES:
+            flags = df[col]
+            X[:, j] = np.where(flags.isna(), np.nan, flags == FLAG_MEASURES[col])
+        else:
+            X[:, j] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+    return X[~np.isnan(X).any(axis=1)]
+
+
+def comoments(X):
+    """
+    Co-moments of the columns of X
+
+    Returns:
+        dict: n, mean (per column) and C (centered cross-product matrix)
+    """
+    n = len(X)
+    mean = X.mean(axis=0) if n else np.zeros(X.shape[1])
+    centered = X - mean
+    return {'n': n, 'mean': mean, 'C': centered.T @ centered}
+
+
+def merge_comoments(a, b):
+    """Combine the co-moments of two row sets (Chan et al.'s pairwise update)"""
+    if a is None:
+        return b
+    n = a['n'] + b['n']
+    if n == 0:
+        return a
+    delta = b['mean'] - a['mean']
+    return {'n': n, 'mean': a['mean'] + delta * b['n'] / n,
+            'C': a['C'] + b['C'] + np.outer(delta, delta) * a['n'] * b['n'] / n}
+
+
+def correlation_from_comoments(moments):
+    """Correlation matrix from co-moments (NaN for constant columns)"""
+    sd = np.sqrt(np.diag(moments['C']))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return moments['C'] / np.outer(sd, sd)
+
+
+def ranks_from_digests(X, digests):
+    """
+    Rank each column of X within the whole file
+
+    Exact histograms give average ranks of ties (as pandas' rank());
+    compressed digests give ranks interpolated between centroids.
+
+    Returns:
+        ndarray: Ranks shaped like X
+    """
+    R = np.empty_like(X)
+    for j, (means, weights, exact) in enumerate(digests):
+        cumulative = np.cumsum(weights)
+        if exact:
+            mid_ranks = cumulative - (weights - 1) / 2
+            R[:, j] = mid_ranks[np.clip(np.searchsorted(means, X[:, j]), 0, len(means) - 1)]
+        else:
+            R[:, j] = np.interp(X[:, j], means, cumulative - weights / 2) + 0.5
+    return R
+
+
+def _matrices(moments, columns, rows, exact_ranks=True):
+    """Split the stacked co-moments into the result dict"""
+    corr = correlation_from_comoments(moments)
+    p = len(columns)
+    return {'pearson': pd.DataFrame(corr[:p, :p], index=columns, columns=columns),
+            'spearman': pd.DataFrame(corr[p:, p:], index=columns, columns=columns),
+            'rows': rows, 'exact_ranks': exact_ranks}
+
+
+def correlations_from_frame(df, columns=None):
+    """
+    Pearson and Spearman matrices of an in-memory DataFrame (exact ranks)
+
+    Returns:
+        dict: pearson and spearman DataFrames, rows used, exact_ranks
+    """
+    columns = [col for col in (columns or NUMERIC_COLUMNS) if col in df.columns]
+    X = numeric_matrix(df, columns)
+    R = pd.DataFrame(X).rank().to_numpy()
+    return _matrices(comoments(np.hstack([X, R])), columns, len(X))
+
+
+def _read_matrix(task):
+    """Read one byte range as a complete-case numeric matrix"""
+    file_path, header, start, end, columns = task
+    return numeric_matrix(read_range(file_path, header, start, end), columns)
+
+
+def _digest_range(task):
+    """Worker (rank pass): per-column t-digests of one byte range"""
+    X = _read_matrix(task)
+    return [tdigest_from_values(X[:, j]) for j in range(X.shape[1])]
+
+
+def _moment_range(task):
+    """Worker (moment pass): co-moments of [values, ranks] of one byte range"""
+    *task, digests = task
+    X = _read_matrix(task)
+    return comoments(np.hstack([X, ranks_from_digests(X, digests)]))
+
+
+def correlate_file(file_path=DEFAULT_FILE, columns=None, workers=None, range_bytes=RANGE_BYTES):
+    """
+    Pearson and Spearman matrices of a CSV, out of core
+
+    Args:
+        file_path: Customer CSV
+        columns: Columns to correlate (default NUMERIC_COLUMNS)
+        workers: Worker processes (None = all cores, 1 = in-process)
+        range_bytes: Approximate bytes parsed per task
+
+    Returns:
+        dict: pearson and spearman DataFrames, rows used, and exact_ranks
+        (False when any column was ranked from a compressed digest)
+    """
+    header, ranges = split_ranges(file_path, range_bytes)
+    columns = [col for col in (columns or NUMERIC_COLUMNS) if col in header]
+    tasks = [(file_path, header, start, end, columns) for start, end in ranges]
+    pool = None
+    if workers != 1 and len(tasks) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    run = pool.map if pool is not None else map
+    try:
+        digests = None
+        for result in run(_digest_range, tasks):
+            digests = result if digests is None else [merge_tdigests(a, b)
+                                                      for a, b in zip(digests, result)]
+        moments = None
+        for result in run(_moment_range, [task + (digests,) for task in tasks]):
+            moments = merge_comoments(moments, result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if moments is None:
+        moments = comoments(np.empty((0, 2 * len(columns))))
+    exact_ranks = digests is None or all(exact for _, _, exact in digests)
+    return _matrices(moments, columns, moments['n'], exact_ranks)
+
+
+def correlation_path(file_path):
+    """Location of the persisted correlation matrices for a source CSV"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(directory, f"{name}.corr.pkl")
+
+
+def load_correlations(file_path=DEFAULT_FILE, rebuild=False, workers=None):
+    """
+    Load the persisted correlation matrices, recomputing them when the CSV
+    has changed
+
+    Returns:
+        dict: pearson and spearman DataFrames over NUMERIC_COLUMNS, rows used,
+        exact_ranks
+    """
+    return load_or_build(correlation_path(file_path), file_path,
+                         lambda: correlate_file(file_path, workers=workers),
+                         {'version': CORRELATION_VERSION}, rebuild=rebuild)
+
+
+def top_pairs(matrix, k=10):
+    """
+    The k column pairs with the strongest correlation (by absolute value)
+
+    Reads the upper triangle with np.triu_indices and selects with
+    np.argpartition, so only the k winners are sorted. Ties keep the
+    row-major pair order.
+
+    Returns:
+        list: (column, column, correlation) tuples, strongest first
+    """
+    values = matrix.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    pairs = values[rows, cols]
+    strength = np.abs(np.nan_to_num(pairs, nan=-1.0))
+    if k < len(pairs):
+        chosen = np.argpartition(-strength, k - 1)[:k]
+    else:
+        chosen = np.arange(len(pairs))
+    chosen = chosen[np.lexsort((chosen, -strength[chosen]))]
+    labels = matrix.columns
+    return [(labels[rows[i]], labels[cols[i]], pairs[i]) for i in chosen]
+
+
+def main(argv=None):
+    """Print the strongest correlations of a customer CSV"""
+    parser = argparse.ArgumentParser(description='Pearson/Spearman correlations of all numeric columns')
+    parser.add_argument('file', nargs='?', default=DEFAULT_FILE, help='Customer CSV file')
+    parser.add_argument('--top', type=int, default=15, help='Pairs to print per method')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: all cores, 1 = in-process)')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore the persisted matrices')
+    args = parser.parse_args(argv)
+
+    correlations = load_correlations(args.file, rebuild=args.rebuild, workers=args.workers)
+    print(f"Correlations of {len(correlations['pearson'])} columns over {correlations['rows']:,} rows")
+    for method in METHODS:
+        print(f"\nTop {args.top} pairs ({method.title()}):")
+        for col1, col2, corr in top_pairs(correlations[method], args.top):
+            print(f"   {col1} ↔ {col2}: {corr:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Precomputed Aggregate Cube
+==========================
+One table of sufficient statistics over the main categorical dimensions
+(segment, gender, age group, device, product category, loyalty tier,
+region, payment method). Every cell holds the row count, the position of
+its first row and, for each numeric measure, the non-null count, sum and
+sum of squares, so counts,
+sums, means, variances and crosstabs over any subset of the dimensions
+can be read from at most a few tens of thousands of cells instead of
+rescanning the customers.
+
+The cube is built chunk by chunk from the CSV (cells are merged by
+addition), persisted to .cache/<name>.cube.pkl and rebuilt when the CSV's
+fingerprint changes. analyze_customers.py and visualize_data.py slice it
+for every table it can answer.
+
+Usage:
+    cube = load_cube('ecommerce_customers.csv')
+    by_segment = cube_slice(cube, ['segment'])
+    cube_mean(by_segment, 'spending_score')
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from aggregation import MERGEABLE_AGGS, aggregate_tables, factorize_key, tables_from_stats
+from data_loader import (CACHE_DIR, DEFAULT_CHUNKSIZE, DEFAULT_FILE, SCHEMA,
+                         iter_chunks, load_or_build)
+
+CUBE_VERSION = 4
+AGE_BINS = [0, 25, 35, 50, 100]
+AGE_LABELS = ['Young (0-25)', 'Adult (26-35)', 'Middle (36-50)', 'Senior (50+)']
+DIMENSIONS = ['segment', 'gender', 'age_group', 'device_type', 'product_category_preference',
+              'loyalty_tier', 'geographic_region', 'payment_method']
+# Yes/No columns stored as 0/1 measures (their sum is the number of 'Yes')
+FLAG_MEASURES = {'mobile_app_user': 'Yes', 'newsletter_subscribed': 'Yes'}
+MEASURES = [col for col, dtype in SCHEMA.items()
+            if dtype != 'category' and col != 'customer_id'] + list(FLAG_MEASURES)
+
+
+def age_groups(age):
+    """Bin ages into the report's age groups"""
+    return pd.cut(age, bins=AGE_BINS, labels=AGE_LABELS)
+
+
+def cube_path(file_path):
+    """Location of the persisted cube for a source CSV"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(directory, f"{name}.cube.pkl")
+
+
+def _sum_cells(grouped):
+    """Add grouped cube cells, keeping the smallest first_row"""
+    cells = grouped.sum()
+    if 'first_row' in cells.columns:
+        cells['first_row'] = grouped['first_row'].min()
+    return cells
+
+
+def build_cube(df, first_row=0):
+    """
+    Compute the cube cells for a DataFrame
+
+    Dimensions and measures missing from df are left out of the cube
+    (at least one dimension is required). A missing dimension value gets
+    its own cell level (NaN), so the customer still counts in every slice
+    over the other dimensions and only drops out of slices over that one,
+    as with DataFrame.groupby.
+
+    Args:
+        df: Customer DataFrame
+        first_row: Position of df's first row in the dataset (for chunks)
+
+    Returns:
+        DataFrame: One row per observed dimension combination with the
+        dimension columns (categorical), 'count', 'first_row' (position
+        of the cell's first customer, so ties between values can be
+        broken by order of appearance) and '<measure>__n',
+        '<measure>__sum', '<measure>__sumsq' columns
+    """
+    dims = {}
+    for dim in DIMENSIONS:
+        if dim == 'age_group' and 'age' in df.columns:
+            dims[dim] = factorize_key(age_groups(df['age']).rename(dim))
+        elif dim in df.columns:
+            dims[dim] = factorize_key(df[dim])
+
+    if not dims:
+        raise ValueError(f"build_cube needs at least one of {DIMENSIONS}")
+
+    # The last level of every dimension holds its missing values
+    shape = tuple(len(index) + 1 for _, index in dims.values())
+    codes = np.stack([np.where(c < 0, len(index), c) for c, index in dims.values()])
+    flat = np.ravel_multi_index(codes, shape)
+    cells, first, inverse = np.unique(flat, return_index=True, return_inverse=True)
+    n_cells = len(cells)
+
+    data = {}
+    cell_codes = np.unravel_index(cells, shape)
+    for (dim, (_, index)), dim_codes in zip(dims.items(), cell_codes):
+        dim_codes = np.where(dim_codes == len(index), -1, dim_codes)
+        data[dim] = pd.Categorical.from_codes(dim_codes, dtype=index.dtype) \
+            if isinstance(index, pd.CategoricalIndex) \
+            else index.take(dim_codes, allow_fill=True, fill_value=np.nan)
+    data['count'] = np.bincount(inverse, minlength=n_cells)
+    data['first_row'] = first.astype(np.int64) + first_row
+
+    for measure in MEASURES:
+        if measure not in df.columns:
+            continue
+        if measure in FLAG_MEASURES:
+            v = (df[measure] == FLAG_MEASURES[measure]).to_numpy(dtype=np.float64)
+        else:
+            v = df[measure].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(v)
+        c, v = inverse[valid], v[valid]
+        data[f"{measure}__n"] = np.bincount(c, minlength=n_cells)
+        data[f"{measure}__sum"] = np.bincount(c, weights=v, minlength=n_cells)
+        data[f"{measure}__sumsq"] = np.bincount(c, weights=v * v, minlength=n_cells)
+    return pd.DataFrame(data)
+
+
+def merge_cubes(cubes):
+    """Add the cells of several cubes (e.g. one per chunk) together"""
+    cubes = list(cubes)
+    dims = [dim for dim in DIMENSIONS if dim in cubes[0].columns]
+    merged = pd.concat(cubes, ignore_index=True)
+    return _sum_cells(merged.groupby(dims, observed=True, sort=True, dropna=False)).reset_index()
+
+
+def build_cube_file(file_path=DEFAULT_FILE, chunksize=DEFAULT_CHUNKSIZE):
+    """Build the cube from a CSV in chunks"""
+    columns = [col for col in DIMENSIONS + MEASURES if col in SCHEMA]
+    cubes = []
+    offset = 0
+    for chunk in iter_chunks(file_path, columns=columns, chunksize=chunksize):
+        cubes.append(build_cube(chunk, first_row=offset))
+        offset += len(chunk)
+    return merge_cubes(cubes)
+
+
+def load_cube(file_path=DEFAULT_FILE, rebuild=False):
+    """
+    Load the persisted cube, rebuilding it when the CSV has changed
+
+    See data_loader.load_or_build for the staleness check.
+
+    Returns:
+        DataFrame: Cube cells (see build_cube)
+    """
+    return load_or_build(cube_path(file_path), file_path, lambda: build_cube_file(file_path),
+                         {'version': CUBE_VERSION}, rebuild=rebuild)
+
+
+def cube_slice(cube, by):
+    """
+    Roll the cube up to a subset of its dimensions
+
+    Returns:
+        DataFrame: Summed statistics (and the smallest first_row) indexed
+        by the `by` dimensions
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    return _sum_cells(cube.drop(columns=[d for d in DIMENSIONS if d in cube.columns and d not in by])
+                      .groupby(by, observed=True, sort=True))
+
+
+def cube_counts(sliced):
+    """Row counts of a slice (a crosstab when the slice has two dimensions)"""
+    counts = sliced['count'].astype(np.int64)
+    return counts.unstack(fill_value=0) if sliced.index.nlevels == 2 else counts
+
+
+def cube_sum(sliced, measure):
+    """Per-group sum of a measure (integer for integer columns)"""
+    sums = sliced[f"{measure}__sum"]
+    if measure in FLAG_MEASURES or pd.api.types.is_integer_dtype(SCHEMA.get(measure)):
+        sums = sums.round().astype(np.int64)
+    return sums
+
+
+def cube_mean(sliced, measure):
+    """Per-group mean of a measure"""
+    return sliced[f"{measure}__sum"] / sliced[f"{measure}__n"]
+
+
+def cube_tables(cube, tables):
+    """
+    Answer group-by table specs from the cube
+
+    Only tables grouped by a cube dimension, over cube measures (or
+    customer_id counts), with mergeable aggregates are answered.
+
+    Returns:
+        dict: Table name -> DataFrame shaped like df.groupby(key).agg(spec)
+    """
+    usable = {}
+    for name, (key, agg_spec) in tables.items():
+        if key not in cube.columns or key not in DIMENSIONS:
+            continue
+        ok = True
+        for column, aggs in agg_spec.items():
+            aggs = [aggs] if isinstance(aggs, str) else aggs
+            if column == 'customer_id':
+                ok = ok and set(aggs) <= {'count'}
+            else:
+                ok = ok and f"{column}__n" in cube.columns and set(aggs) <= set(MERGEABLE_AGGS)
+        if ok:
+            usable[name] = (key, agg_spec)
+
+    stats = {}
+    for name, (key, agg_spec) in usable.items():
+        sliced = cube_slice(cube, key)
+        for column in agg_spec:
+            if column == 'customer_id':
+                stats[(key, column)] = pd.DataFrame({'count': sliced['count'], 'sum': 0.0,
+                                                     'sumsq': 0.0})
+            else:
+                stats[(key, column)] = pd.DataFrame({'count': sliced[f"{column}__n"],
+                                                     'sum': sliced[f"{column}__sum"],
+                                                     'sumsq': sliced[f"{column}__sumsq"]})
+    out = tables_from_stats(stats, usable)
+    for name, (key, agg_spec) in usable.items():
+        for column, aggs in agg_spec.items():
+            # Integer sums come back as float sums of squares; restore the dtype
+            if 'sum' in ([aggs] if isinstance(aggs, str) else aggs) and \
+                    (column in FLAG_MEASURES or pd.api.types.is_integer_dtype(SCHEMA.get(column))):
+                label = (column, 'sum') if isinstance(out[name].columns, pd.MultiIndex) else column
+                out[name][label] = out[name][label].round().astype(np.int64)
+    return out
+
+
+def cube_or_aggregate(df, tables, cube=None, derived=None):
+    """
+    Build group-by tables from the cube where possible, scanning df for the rest
+
+    Args:
+        df: Customer DataFrame (only scanned for tables the cube cannot answer)
+        tables: Table specs as in aggregation.aggregate_tables
+        cube: Cube from load_cube()/build_cube(), or None to always scan
+        derived: Extra columns for the scan (see aggregate_tables)
+
+    Returns:
+        dict: Table name -> DataFrame, in the order of `tables`
+    """
+    from_cube = cube_tables(cube, tables) if cube is not None else {}
+    rest = {name: spec for name, spec in tables.items() if name not in from_cube}
+    scanned = aggregate_tables(df, rest, derived=derived) if rest else {}
+    return {name: from_cube.get(name, scanned.get(name)) for name in tables
+            if name in from_cube or name in scanned}
@@ -10,13 +10,25 @@ Email: help@rskworld.in
 Phone: +91 93305 39277
 """
 
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.cluster import KMeans, DBSCAN, AgglomerativeClustering
+from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import silhouette_score
+from data_loader import load_customers
+from streaming_clustering import streaming_kmeans
+from density_clustering import sampled_dbscan
+from hierarchical_clustering import fit_ward, two_stage_ward, measure_peak_memory, full_ward_memory_mb
+from scoring import MODEL_KEEP, nearest_centroid, save_model_artifact
+from incremental import run_incremental
+from sampling import stratified_sample_indices
+from profiling import add_profile_arguments, profile_from_args, report_profile, stage
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from threadpoolctl import threadpool_limits
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -24,67 +36,149 @@ warnings.filterwarnings('ignore')
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
 
+# Features used by K-Means and the encoded categorical columns (saved in the model artifact)
+CLUSTER_FEATURES = ['annual_income', 'spending_score', 'purchase_frequency',
+                    'avg_order_value', 'browsing_time_minutes']
+ENCODED_COLUMNS = {'gender': 'gender_encoded',
+                   'product_category_preference': 'category_encoded',
+                   'device_type': 'device_encoded'}
+
 def load_and_prepare_data(file_path='ecommerce_customers.csv'):
     """
     Load and prepare data for clustering
     """
-    df = pd.read_csv(file_path)
+    df = load_customers(file_path)
     
     # Encode categorical variables
     le_gender = LabelEncoder()
     le_category = LabelEncoder()
     le_device = LabelEncoder()
     
-    df['gender_encoded'] = le_gender.fit_transform(df['gender'])
-    df['category_encoded'] = le_category.fit_transform(df['product_category_preference'])
-    df['device_encoded'] = le_device.fit_transform(df['device_type'])
+    df[ENCODED_COLUMNS['gender']] = le_gender.fit_transform(df['gender'])
+    df[ENCODED_COLUMNS['product_category_preference']] = le_category.fit_transform(df['product_category_preference'])
+    df[ENCODED_COLUMNS['device_type']] = le_device.fit_transform(df['device_type'])
     
     return df, le_gender, le_category, le_device
 
-def find_optimal_clusters(X, max_clusters=10):
+# Per-process state for the k sweep (set once by the pool initializer)
+_sweep_data = {}
+
+def _init_sweep(X, sample_idx, limit_threads):
+    """Store the matrix in the worker once instead of per task"""
+    _sweep_data['X'] = X
+    _sweep_data['sample_idx'] = sample_idx
+    if limit_threads:
+        # One BLAS/OpenMP thread per process avoids oversubscription
+        _sweep_data['limits'] = threadpool_limits(1)
+
+def _fit_k(k, random_state=42):
+    """
+    Fit K-Means for one k and score it on the silhouette sample
+    
+    Only the centers and scores are returned, so workers do not send the
+    full model (with its labels_ for every row) back to the parent.
+    """
+    X = _sweep_data['X']
+    sample_idx = _sweep_data['sample_idx']
+    
+    start = time.perf_counter()
+    kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=10)
+    kmeans.fit(X)
+    fit_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    score = silhouette_score(X[sample_idx], kmeans.labels_[sample_idx])
+    silhouette_time = time.perf_counter() - start
+    
+    return {'k': k, 'inertia': kmeans.inertia_, 'silhouette': score,
+            'fit_time': fit_time, 'silhouette_time': silhouette_time,
+            'centers': kmeans.cluster_centers_}
+
+def find_optimal_clusters(X, max_clusters=10, n_jobs=None, sample_size=10_000,
+                          strata=None, random_state=42):
     """
     Find optimal number of clusters using Elbow Method and Silhouette Score
+    
+    The k sweep runs in a process pool and the O(n^2) silhouette score is
+    estimated on a sample of at most `sample_size` rows, stratified by
+    `strata` (e.g. the segment column) when given.
+    
+    Args:
+        X: Standardized feature matrix
+        max_clusters: Largest k to try (k starts at 2)
+        n_jobs: Worker processes (None = all cores, 1 = run in-process)
+        sample_size: Rows used for the silhouette score (None = all rows)
+        strata: Optional labels to stratify the silhouette sample by
+    
+    Returns:
+        tuple: (optimal_k, inertias, silhouette_scores, K_range, results)
+        where results holds the cluster centers and timings for each k
     """
-    inertias = []
-    silhouette_scores = []
     K_range = range(2, max_clusters + 1)
-    
-    for k in K_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(X)
-        inertias.append(kmeans.inertia_)
-        silhouette_scores.append(silhouette_score(X, kmeans.labels_))
+    if strata is None:
+        strata = np.zeros(len(X), dtype=np.int8)
+    sample_idx = stratified_sample_indices(strata, sample_size, random_state)
+    
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n_jobs = min(n_jobs, len(K_range))
+    if n_jobs == 1:
+        _init_sweep(X, sample_idx, limit_threads=False)
+        results = [_fit_k(k, random_state) for k in K_range]
+        _sweep_data.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_sweep,
+                                 initargs=(X, sample_idx, True)) as pool:
+            results = list(pool.map(_fit_k, K_range, [random_state] * len(K_range)))
+    
+    inertias = [r['inertia'] for r in results]
+    silhouette_scores = [r['silhouette'] for r in results]
     
     # Find optimal k (highest silhouette score)
     optimal_k = K_range[np.argmax(silhouette_scores)]
     
-    return optimal_k, inertias, silhouette_scores, K_range
+    return optimal_k, inertias, silhouette_scores, K_range, results
+
+def print_sweep_timings(results):
+    """Print the wall-time breakdown of the k sweep"""
+    print("\nOptimal-k search timings:")
+    print(f"   {'k':>3} {'fit (s)':>9} {'silhouette (s)':>15} {'inertia':>12} {'silhouette':>11}")
+    for r in results:
+        print(f"   {r['k']:>3} {r['fit_time']:>9.3f} {r['silhouette_time']:>15.3f} "
+              f"{r['inertia']:>12.2f} {r['silhouette']:>11.3f}")
 
-def kmeans_segmentation(df, n_clusters=4):
+def kmeans_segmentation(df, n_clusters=4, n_jobs=None, sample_size=10_000):
     """
     Perform K-Means clustering
+    
+    The number of clusters is chosen by find_optimal_clusters(); n_jobs and
+    sample_size are passed through to its parallel, sampled k sweep. The
+    winning centers are reused and customers are assigned to the nearest
+    one, which matches the fitted labels without refitting.
+    
+    Returns:
+        tuple: (df with kmeans_cluster, cluster centers, fitted scaler)
     """
     print("\n" + "="*60)
     print("K-MEANS CLUSTERING")
     print("="*60)
     
     # Select features
-    features = ['annual_income', 'spending_score', 'purchase_frequency', 
-                'avg_order_value', 'browsing_time_minutes']
-    X = df[features].values
+    X = df[CLUSTER_FEATURES].to_numpy(dtype=np.float64)
     
     # Standardize
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
     
     # Find optimal clusters
-    optimal_k, inertias, sil_scores, K_range = find_optimal_clusters(X_scaled)
+    optimal_k, inertias, sil_scores, K_range, results = find_optimal_clusters(
+        X_scaled, n_jobs=n_jobs, sample_size=sample_size, strata=df['segment'])
+    print_sweep_timings(results)
     print(f"\nOptimal number of clusters: {optimal_k}")
     print(f"Best Silhouette Score: {sil_scores[optimal_k-2]:.3f}")
     
-    # Perform clustering with optimal k
-    kmeans = KMeans(n_clusters=optimal_k, random_state=42, n_init=10)
-    df['kmeans_cluster'] = kmeans.fit_predict(X_scaled)
+    # Reuse the centers fitted for optimal k during the sweep
+    centers = results[optimal_k - 2]['centers']
+    df['kmeans_cluster'] = nearest_centroid(X_scaled, centers)
     
     # Analyze clusters
     print("\nCluster Characteristics:")
@@ -100,11 +194,42 @@ def kmeans_segmentation(df, n_clusters=4):
                                 'Avg Order Value', 'Avg Browsing Time', 'Count']
     print(cluster_analysis)
     
-    return df, kmeans, scaler
+    return df, centers, scaler
+
+def kmeans_streaming_segmentation(file_path='ecommerce_customers.csv', n_clusters=4,
+                                  output_file='customer_segmentation_results.csv',
+                                  chunksize=250_000):
+    """
+    Perform K-Means clustering out of core
+    
+    Fits a running StandardScaler and mini-batch K-Means over loader chunks,
+    then writes cluster labels to output_file chunk by chunk.
+    """
+    print("\n" + "="*60)
+    print("K-MEANS CLUSTERING (STREAMING)")
+    print("="*60)
+    
+    cluster_analysis, kmeans, scaler = streaming_kmeans(
+        file_path, CLUSTER_FEATURES, output_file, n_clusters=n_clusters,
+        label_column='kmeans_cluster', chunksize=chunksize)
+    
+    print("\nCluster Characteristics:")
+    cluster_analysis = cluster_analysis.round(2)
+    cluster_analysis.columns = ['Avg Income', 'Avg Spending', 'Avg Freq', 
+                                'Avg Order Value', 'Avg Browsing Time', 'Count']
+    print(cluster_analysis)
+    
+    return cluster_analysis, kmeans, scaler
 
-def dbscan_segmentation(df):
+def dbscan_segmentation(df, eps=0.5, min_samples=5, sample_size=50_000):
     """
     Perform DBSCAN clustering
+    
+    The neighborhood graph comes from a cached KD-tree index. Pass
+    eps='auto' to pick eps from the k-distance curve. Above sample_size
+    rows, DBSCAN runs on a random sample (with min_samples scaled by the
+    sampling fraction) and the remaining customers are assigned to their
+    nearest core point.
     """
     print("\n" + "="*60)
     print("DBSCAN CLUSTERING")
@@ -113,19 +238,24 @@ def dbscan_segmentation(df):
     # Select features
     features = ['annual_income', 'spending_score', 'purchase_frequency', 
                 'avg_order_value', 'browsing_time_minutes']
-    X = df[features].values
+    X = df[features].to_numpy(dtype=np.float64)
     
     # Standardize
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
     
     # Perform DBSCAN
-    dbscan = DBSCAN(eps=0.5, min_samples=5)
-    df['dbscan_cluster'] = dbscan.fit_predict(X_scaled)
+    labels, dbscan = sampled_dbscan(X_scaled, eps=eps, min_samples=min_samples,
+                                    sample_size=sample_size)
+    df['dbscan_cluster'] = labels
+    if eps == 'auto':
+        print(f"\nAuto-selected eps (k-distance knee): {dbscan.eps:.3f}")
+    if dbscan.min_samples != min_samples:
+        print(f"min_samples scaled to the sample: {dbscan.min_samples}")
     
     # Analyze clusters
-    n_clusters = len(set(df['dbscan_cluster'])) - (1 if -1 in df['dbscan_cluster'] else 0)
-    n_noise = list(df['dbscan_cluster']).count(-1)
+    n_noise = int((labels == -1).sum())
+    n_clusters = len(np.unique(labels)) - (1 if n_noise > 0 else 0)
     
     print(f"\nNumber of clusters found: {n_clusters}")
     print(f"Number of noise points: {n_noise}")
@@ -143,9 +273,15 @@ def dbscan_segmentation(df):
     
     return df, dbscan
 
-def hierarchical_segmentation(df, n_clusters=4):
+def hierarchical_segmentation(df, n_clusters=4, method='auto', n_micro=2000,
+                              connectivity=False, max_full_rows=20_000):
     """
     Perform Hierarchical Clustering
+    
+    method='full' runs Ward on every customer (O(n^2) memory);
+    method='two_stage' runs Ward on n_micro mini-batch K-Means centroids
+    and maps the labels back; 'auto' picks two_stage above max_full_rows.
+    connectivity=True constrains Ward to a k-nearest-neighbor graph.
     """
     print("\n" + "="*60)
     print("HIERARCHICAL CLUSTERING")
@@ -154,15 +290,27 @@ def hierarchical_segmentation(df, n_clusters=4):
     # Select features
     features = ['annual_income', 'spending_score', 'purchase_frequency', 
                 'avg_order_value', 'browsing_time_minutes']
-    X = df[features].values
+    X = df[features].to_numpy(dtype=np.float64)
     
     # Standardize
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
     
+    if method == 'auto':
+        method = 'two_stage' if len(X_scaled) > max_full_rows else 'full'
+    
     # Perform Agglomerative Clustering
-    hierarchical = AgglomerativeClustering(n_clusters=n_clusters, linkage='ward')
-    df['hierarchical_cluster'] = hierarchical.fit_predict(X_scaled)
+    if method == 'two_stage':
+        (labels, hierarchical, _), peak_mb = measure_peak_memory(
+            two_stage_ward, X_scaled, n_clusters=n_clusters, n_micro=n_micro,
+            connectivity=connectivity)
+        df['hierarchical_cluster'] = labels
+        print(f"\nTwo-stage Ward on {min(n_micro, len(X_scaled))} micro-clusters")
+        print(f"Peak memory: {peak_mb:,.1f} MB "
+              f"(full Ward distance matrix: ~{full_ward_memory_mb(len(X_scaled)):,.1f} MB)")
+    else:
+        hierarchical = fit_ward(X_scaled, n_clusters, connectivity=connectivity)
+        df['hierarchical_cluster'] = hierarchical.labels_
     
     # Analyze clusters
     print("\nCluster Characteristics:")
@@ -221,37 +369,138 @@ def generate_segment_profiles(df):
             print(f"    - Top Category: {cluster_data['product_category_preference'].mode()[0]}")
             print(f"    - Top Device: {cluster_data['device_type'].mode()[0]}")
 
-def main():
+def run_segmentation(args, profile=None):
     """
-    Main segmentation function
+    Run the segmentation selected by the command-line arguments
+    
+    Each stage is measured when `profile` (see profiling.py) is given.
     """
     print("="*60)
     print("CUSTOMER SEGMENTATION ANALYSIS")
     print("RSK World - https://rskworld.in")
     print("="*60)
     
+    output_file = 'customer_segmentation_results.csv'
+    
+    if args.streaming:
+        with stage(profile, 'kmeans_streaming_segmentation'):
+            _, kmeans, scaler = kmeans_streaming_segmentation(
+                args.file, n_clusters=args.clusters, output_file=output_file,
+                chunksize=args.chunksize)
+        with stage(profile, 'save_model_artifact'):
+            model_path = save_model_artifact(scaler, kmeans, CLUSTER_FEATURES,
+                                             directory=args.model_dir, keep=args.keep_models)
+        print(f"\nSegmentation results saved to '{output_file}'")
+        print(f"Model artifact saved to '{model_path}'")
+        print("\n" + "="*60)
+        print("SEGMENTATION COMPLETE")
+        print("="*60)
+        return
+    
     # Load and prepare data
-    df, le_gender, le_category, le_device = load_and_prepare_data()
+    with stage(profile, 'load_and_prepare_data') as record:
+        df, le_gender, le_category, le_device = load_and_prepare_data(args.file)
+        record['df'] = df
     print(f"\nDataset loaded: {len(df)} customers")
     
+    if args.incremental:
+        with stage(profile, 'incremental_clustering', df) as record:
+            df, _, info = run_incremental(df, args.file, 'customer_segmentation', {},
+                                          CLUSTER_FEATURES, n_clusters=args.clusters,
+                                          label_column='kmeans_cluster',
+                                          drift_threshold=args.drift_threshold)
+            record['df'] = df
+        print(f"\nCustomers added: {info['added']}, changed: {info['changed']}, removed: {info['removed']}")
+        print(f"Centroid drift: {info['drift']:.3f} (threshold {args.drift_threshold})")
+        print("Clusters refitted" if info['refit'] else "Clusters updated for changed rows only")
+        with stage(profile, 'compare_segments', df):
+            compare_segments(df)
+        with stage(profile, 'generate_segment_profiles', df):
+            generate_segment_profiles(df)
+        with stage(profile, 'write_csv', df):
+            df.to_csv(output_file, index=False)
+        print(f"\nSegmentation results saved to '{output_file}'")
+        print("\n" + "="*60)
+        print("SEGMENTATION COMPLETE")
+        print("="*60)
+        return
+    
     # Perform different clustering methods
-    df, kmeans, scaler = kmeans_segmentation(df)
-    df, dbscan = dbscan_segmentation(df)
-    df, hierarchical = hierarchical_segmentation(df)
+    with stage(profile, 'kmeans_segmentation', df) as record:
+        df, centers, scaler = kmeans_segmentation(df, n_jobs=args.jobs,
+                                                  sample_size=args.silhouette_sample)
+        record['df'] = df
+    eps = args.dbscan_eps if args.dbscan_eps == 'auto' else float(args.dbscan_eps)
+    with stage(profile, 'dbscan_segmentation', df) as record:
+        df, dbscan = dbscan_segmentation(df, eps=eps, sample_size=args.dbscan_sample)
+        record['df'] = df
+    with stage(profile, 'hierarchical_segmentation', df) as record:
+        df, hierarchical = hierarchical_segmentation(df, method=args.hierarchical,
+                                                     connectivity=args.connectivity)
+        record['df'] = df
     
     # Compare and analyze
-    compare_segments(df)
-    generate_segment_profiles(df)
+    with stage(profile, 'compare_segments', df):
+        compare_segments(df)
+    with stage(profile, 'generate_segment_profiles', df):
+        generate_segment_profiles(df)
     
     # Save results
-    output_file = 'customer_segmentation_results.csv'
-    df.to_csv(output_file, index=False)
+    with stage(profile, 'write_csv', df):
+        df.to_csv(output_file, index=False)
     print(f"\nSegmentation results saved to '{output_file}'")
     
+    # Save the fitted K-Means model for scoring new customers
+    encoders = {'gender': le_gender, 'product_category_preference': le_category,
+                'device_type': le_device}
+    with stage(profile, 'save_model_artifact'):
+        model_path = save_model_artifact(scaler, centers, CLUSTER_FEATURES, encoders=encoders,
+                                         encoded_columns=ENCODED_COLUMNS, directory=args.model_dir,
+                                         keep=args.keep_models)
+    print(f"Model artifact saved to '{model_path}'")
+    
     print("\n" + "="*60)
     print("SEGMENTATION COMPLETE")
     print("="*60)
 
+def main(argv=None):
+    """
+    Main segmentation function
+    """
+    parser = argparse.ArgumentParser(description='Customer segmentation analysis')
+    parser.add_argument('--file', default='ecommerce_customers.csv', help='Input CSV file')
+    parser.add_argument('--streaming', action='store_true',
+                        help='Run out-of-core mini-batch K-Means only (for files larger than memory)')
+    parser.add_argument('--clusters', type=int, default=4,
+                        help='Number of clusters in streaming and incremental mode')
+    parser.add_argument('--chunksize', type=int, default=250_000, help='Rows per chunk in streaming mode')
+    parser.add_argument('--dbscan-eps', default='0.5',
+                        help="DBSCAN eps, or 'auto' to pick it from the k-distance curve")
+    parser.add_argument('--dbscan-sample', type=int, default=50_000,
+                        help='Max rows clustered directly by DBSCAN; the rest go to the nearest core point')
+    parser.add_argument('--hierarchical', choices=['auto', 'full', 'two_stage'], default='auto',
+                        help='Ward on all rows, on micro-cluster centroids, or chosen by size')
+    parser.add_argument('--connectivity', action='store_true',
+                        help='Constrain hierarchical clustering to a k-nearest-neighbor graph')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Re-assign K-Means clusters only for customers changed since the last run')
+    parser.add_argument('--drift-threshold', type=float, default=0.25,
+                        help='Centroid drift (standardized units) that triggers a full K-Means refit')
+    parser.add_argument('--model-dir', default='models',
+                        help='Directory for the versioned K-Means model artifact used by scoring.py')
+    parser.add_argument('--keep-models', type=int, default=MODEL_KEEP,
+                        help='Model versions kept in --model-dir; older ones are deleted')
+    parser.add_argument('--jobs', type=int, default=None, help='Worker processes for the optimal-k search')
+    parser.add_argument('--silhouette-sample', type=int, default=10_000,
+                        help='Rows (stratified by segment) used to estimate silhouette scores')
+    add_profile_arguments(parser, 'customer_segmentation')
+    args = parser.parse_args(argv)
+    
+    profile = profile_from_args(args, 'customer_segmentation')
+    try:
+        run_segmentation(args, profile)
+    finally:
+        report_profile(profile, args)
+
 if __name__ == "__main__":
     main()
-
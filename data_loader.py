@@ -0,0 +1,491 @@
+"""
+Typed Data Loader for E-commerce Customer Dataset
+=================================================
+Shared CSV loader used by the analysis, segmentation and visualization
+scripts. Columns are read with an explicit dtype schema that mirrors the
+40-column CREATE TABLE in queries.sql, but with narrow numeric types
+(nullable Int8/Int16/Int32 and float32) and `category` dtypes for the
+low-cardinality string columns. Category values outside the known lists
+are kept (and reported on stderr) rather than read as missing. A chunked
+mode streams files that are larger than memory, and an optional Parquet
+cache (requires pyarrow) skips CSV parsing on repeated runs.
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+
+import pandas as pd
+
+DEFAULT_FILE = 'ecommerce_customers.csv'
+DEFAULT_CHUNKSIZE = 250_000
+
+# Category values (sorted so groupby/value ordering matches plain strings)
+CATEGORIES = {
+    'gender': ['Female', 'Male'],
+    'product_category_preference': ['Beauty', 'Books', 'Clothing', 'Electronics',
+                                    'Home & Garden', 'Sports'],
+    'device_type': ['Desktop', 'Mobile', 'Tablet'],
+    'segment': ['High Value', 'Low Value', 'Medium Value'],
+    'payment_method': ['Bank Transfer', 'Cash on Delivery', 'Credit Card',
+                       'Debit Card', 'Digital Wallet', 'PayPal'],
+    'newsletter_subscribed': ['No', 'Yes'],
+    'referral_source': ['Advertisement', 'Direct', 'Email Campaign', 'Google Search',
+                        'Influencer', 'Referral', 'Social Media'],
+    'mobile_app_user': ['No', 'Yes'],
+    'loyalty_tier': ['Bronze', 'Diamond', 'Gold', 'Platinum', 'Silver'],
+    'geographic_region': ['Central', 'East', 'North', 'South', 'West'],
+    'preferred_shipping': ['Express', 'Overnight', 'Same Day', 'Standard'],
+}
+
+# Column order and storage dtypes (see CREATE TABLE in queries.sql).
+# Monetary columns stay float64 so sums like total CLV keep cent precision.
+SCHEMA = {
+    'customer_id': 'int32',
+    'age': 'int8',
+    'gender': 'category',
+    'annual_income': 'float64',
+    'spending_score': 'int8',
+    'purchase_frequency': 'int16',
+    'avg_order_value': 'float64',
+    'total_purchases': 'int16',
+    'browsing_time_minutes': 'int16',
+    'product_category_preference': 'category',
+    'device_type': 'category',
+    'last_purchase_days': 'int16',
+    'segment': 'category',
+    'customer_lifetime_value': 'float64',
+    'return_rate': 'float32',
+    'payment_method': 'category',
+    'newsletter_subscribed': 'category',
+    'social_media_engagement': 'int16',
+    'avg_review_rating': 'float32',
+    'cart_abandonment_rate': 'float32',
+    'discount_usage_pct': 'float32',
+    'referral_source': 'category',
+    'customer_satisfaction_score': 'float32',
+    'preferred_shopping_hour': 'int8',
+    'mobile_app_user': 'category',
+    'wishlist_items': 'int16',
+    'customer_since_months': 'int16',
+    'loyalty_tier': 'category',
+    'email_open_rate': 'float32',
+    'click_through_rate': 'float32',
+    'cross_category_purchases': 'int8',
+    'repeat_purchase_rate': 'float32',
+    'avg_session_duration': 'int16',
+    'pages_per_session': 'int16',
+    'geographic_region': 'category',
+    'preferred_shipping': 'category',
+    'support_interactions': 'int16',
+    'product_reviews_count': 'int16',
+    'social_shares': 'int16',
+    'coupon_redemptions': 'int16',
+}
+
+COLUMNS = list(SCHEMA)
+
+
+def get_dtypes(columns=None):
+    """
+    Build the dtype mapping passed to pandas for the requested columns
+
+    Integer columns use pandas' nullable integer dtypes (int8 -> Int8), so
+    an empty cell becomes <NA> instead of failing the whole read.
+
+    Returns:
+        dict: Column name to dtype (CategoricalDtype for string columns)
+    """
+    columns = COLUMNS if columns is None else columns
+    dtypes = {}
+    for col in columns:
+        if col not in SCHEMA:
+            continue
+        if SCHEMA[col] == 'category':
+            dtypes[col] = pd.CategoricalDtype(CATEGORIES[col])
+        elif SCHEMA[col].startswith('int'):
+            dtypes[col] = SCHEMA[col].capitalize()
+        else:
+            dtypes[col] = SCHEMA[col]
+    return dtypes
+
+
+# (source, column, value) triples already reported by apply_categories
+_reported_categories = set()
+
+
+def apply_categories(df, source=DEFAULT_FILE):
+    """
+    Give the category columns of df the known CATEGORIES
+
+    Values outside the known lists are kept as extra categories (sorted in
+    with the known ones) and reported once per source on stderr, so no
+    customer silently loses a value.
+
+    Returns:
+        DataFrame: df (modified in place)
+    """
+    for col, known in CATEGORIES.items():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            observed = values.cat.categories
+        else:
+            observed = pd.Index(values.dropna().unique())
+        extra = sorted(set(observed.astype(str)) - set(known))
+        dtype = pd.CategoricalDtype(sorted(known + extra) if extra else known)
+        if values.dtype != dtype:
+            df[col] = values.astype(dtype)
+        new = [value for value in extra if (source, col, value) not in _reported_categories]
+        if new:
+            _reported_categories.update((source, col, value) for value in new)
+            print(f"Warning: '{source}' has {col} values outside the known categories "
+                  f"({', '.join(new[:5])}); they are kept as extra categories", file=sys.stderr)
+    return df
+
+
+def read_customers(file_path=DEFAULT_FILE, columns=None, chunksize=None):
+    """
+    Read the customer CSV with the typed schema
+
+    Category columns are parsed with inferred categories and then given the
+    known CATEGORIES (see apply_categories; iter_chunks does this per chunk).
+
+    Args:
+        file_path: Path to the CSV file
+        columns: Optional list of columns to read (column projection)
+        chunksize: If given, return an iterator of DataFrames of this many rows
+
+    Returns:
+        DataFrame, or an iterator of DataFrames when chunksize is set
+    """
+    dtypes = {col: 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype
+              for col, dtype in get_dtypes(columns).items()}
+    if chunksize is not None:
+        return pd.read_csv(file_path, usecols=columns, dtype=dtypes, chunksize=chunksize)
+    return apply_categories(pd.read_csv(file_path, usecols=columns, dtype=dtypes), file_path)
+
+
+def iter_chunks(file_path=DEFAULT_FILE, columns=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Stream the customer CSV as typed DataFrame chunks
+
+    Yields:
+        DataFrame: Up to `chunksize` customers at a time
+    """
+    with read_customers(file_path, columns=columns, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield apply_categories(chunk, file_path)
+
+
+# Bytes parsed per task when a file is processed in parallel byte ranges
+RANGE_BYTES = 32 << 20
+
+
+def split_ranges(file_path, range_bytes=RANGE_BYTES):
+    """
+    Split a CSV into byte ranges that start at line starts
+
+    Returns:
+        tuple: (header columns, list of (start, end) byte offsets)
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        offsets = [f.tell()]
+        while offsets[-1] < size:
+            f.seek(min(offsets[-1] + range_bytes, size))
+            f.readline()
+            offsets.append(min(f.tell(), size))
+    columns = header.decode('utf-8').strip().split(',')
+    return columns, list(zip(offsets[:-1], offsets[1:]))
+
+
+def parse_csv_bytes(data, columns, **options):
+    """
+    Parse headerless CSV bytes (e.g. one byte range of a file)
+
+    Numeric schema columns are read as float64 and category columns as
+    category with the typed C parser. If a numeric column holds text, the
+    data is re-read as strings and the unparseable cells become NaN.
+
+    Args:
+        data: CSV bytes without the header line
+        columns: Column names of the file
+        **options: Extra pandas.read_csv options (e.g. na_values)
+
+    Returns:
+        tuple: (chunk, dict of column -> (unparseable mask, text values))
+    """
+    dtypes = {col: 'category' if SCHEMA[col] == 'category' else 'float64'
+              for col in columns if col in SCHEMA}
+    options = dict(options, header=None, names=columns)
+    try:
+        return pd.read_csv(io.BytesIO(data), dtype=dtypes, **options), {}
+    except ValueError:
+        pass
+
+    chunk = pd.read_csv(io.BytesIO(data), dtype=str, **options)
+    unparsed = {}
+    for col, dtype in SCHEMA.items():
+        if dtype == 'category' or col not in chunk:
+            continue
+        text = chunk[col]
+        values = pd.to_numeric(text, errors='coerce')
+        bad = (values.isna() & text.notna()).to_numpy()
+        if bad.any():
+            unparsed[col] = (bad, text.to_numpy())
+        chunk[col] = values.astype('float64')
+    return chunk, unparsed
+
+
+def memory_usage_mb(df):
+    """Return the deep memory footprint of a DataFrame in MB"""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+# ---------------------------------------------------------------------------
+# Columnar cache
+# ---------------------------------------------------------------------------
+
+CACHE_DIR = '.cache'
+CACHE_VERSION = 2
+
+
+def _has_pyarrow():
+    """Return True when pyarrow is available for the Parquet cache"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _cache_paths(file_path):
+    """Return (parquet_path, meta_path) for a source CSV"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return (os.path.join(directory, f"{name}.parquet"),
+            os.path.join(directory, f"{name}.meta.json"))
+
+
+def file_fingerprint(file_path, with_hash=True):
+    """
+    Fingerprint a source file by size, mtime and (optionally) content hash
+
+    Returns:
+        dict: size, mtime_ns and sha256 keys
+    """
+    stat = os.stat(file_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def _read_meta(meta_path):
+    """Load cache metadata, or None if missing/corrupt"""
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, fingerprint):
+    """Store the source fingerprint alongside the cache"""
+    meta = dict(fingerprint, version=CACHE_VERSION)
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def _check_fingerprint(stored, file_path):
+    """
+    Compare a stored fingerprint with the current file
+
+    Size and mtime are compared first; the content hash is only computed
+    when they differ but the size matches (e.g. after a copy or touch).
+
+    Returns:
+        tuple: (unchanged, refreshed) where refreshed is the current
+        fingerprint to store when only the mtime changed, else None
+    """
+    current = file_fingerprint(file_path, with_hash=False)
+    if current['size'] != stored['size']:
+        return False, None
+    if current['mtime_ns'] == stored['mtime_ns']:
+        return True, None
+    current = file_fingerprint(file_path)
+    if current['sha256'] != stored.get('sha256'):
+        return False, None
+    return True, current
+
+
+def cache_is_warm(file_path):
+    """
+    Check whether the Parquet cache matches the current CSV
+
+    A matching content hash after a copy or touch refreshes the stored
+    metadata instead of forcing a rebuild.
+    """
+    parquet_path, meta_path = _cache_paths(file_path)
+    meta = _read_meta(meta_path)
+    if meta is None or meta.get('version') != CACHE_VERSION or not os.path.exists(parquet_path):
+        return False
+    unchanged, refreshed = _check_fingerprint(meta, file_path)
+    if refreshed is not None:
+        _write_meta(meta_path, refreshed)
+    return unchanged
+
+
+def load_or_build(path, file_path, build, params, rebuild=False):
+    """
+    Load a result derived from a CSV from its pickle, or build and store it
+
+    The stored result is reused while the CSV is unchanged (see
+    _check_fingerprint) and was built with the same `params`.
+
+    Args:
+        path: Pickle holding the result
+        file_path: Source CSV
+        build: Callable returning the result
+        params: Dict the result depends on (format version, sample size, ...)
+        rebuild: Ignore the stored result
+
+    Returns:
+        The stored or newly built result
+    """
+    if not rebuild and os.path.exists(path):
+        stored = pd.read_pickle(path)
+        if stored.get('params') == params:
+            unchanged, refreshed = _check_fingerprint(stored['fingerprint'], file_path)
+            if refreshed is not None:
+                pd.to_pickle(dict(stored, fingerprint=refreshed), path)
+            if unchanged:
+                return stored['result']
+
+    fingerprint = file_fingerprint(file_path)
+    result = build()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.to_pickle({'params': params, 'fingerprint': fingerprint, 'result': result}, path)
+    return result
+
+
+def build_cache(file_path=DEFAULT_FILE, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Convert the CSV to a typed Parquet file chunk by chunk
+
+    Returns:
+        str: Path to the Parquet cache file
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_path, meta_path = _cache_paths(file_path)
+    os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+    fingerprint = file_fingerprint(file_path)
+
+    tmp_path = parquet_path + '.tmp'
+    writer = None
+    try:
+        for chunk in iter_chunks(file_path, chunksize=chunksize):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        writer.close()
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, parquet_path)
+    _write_meta(meta_path, fingerprint)
+    return parquet_path
+
+
+def load_customers(file_path=DEFAULT_FILE, columns=None, use_cache=True):
+    """
+    Load the customer dataset, using the Parquet cache when available
+
+    The cache is rebuilt automatically when the CSV's size, mtime or hash
+    changes. Without pyarrow (or with use_cache=False) the CSV is parsed
+    directly with the typed schema.
+
+    Args:
+        file_path: Path to the CSV file
+        columns: Optional list of columns to read (column projection)
+        use_cache: Set to False to always parse the CSV
+
+    Returns:
+        DataFrame: Customer data
+    """
+    if not (use_cache and _has_pyarrow()):
+        return read_customers(file_path, columns=columns)
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+    if not cache_is_warm(file_path):
+        build_cache(file_path)
+    parquet_path, _ = _cache_paths(file_path)
+    return apply_categories(pd.read_parquet(parquet_path, columns=columns), file_path)
+
+
+def read_rows(file_path=DEFAULT_FILE, offset=0, limit=None, columns=None):
+    """
+    Read a slice of customers without loading the whole dataset
+
+    A warm Parquet cache is read only in the row groups that overlap the
+    slice; otherwise the CSV lines before `offset` are skipped unparsed
+    (the cache is not built here).
+
+    Args:
+        file_path: Path to the CSV file
+        offset: Position of the first customer to return
+        limit: Maximum number of customers (None for all the rest)
+        columns: Optional list of columns to read (column projection)
+
+    Returns:
+        DataFrame: The customers in [offset, offset + limit), with a
+        RangeIndex starting at offset
+    """
+    end = None if limit is None else offset + limit
+    if _has_pyarrow() and cache_is_warm(file_path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(_cache_paths(file_path)[0])
+        tables, start, first = [], 0, None
+        for group in range(parquet.num_row_groups):
+            n = parquet.metadata.row_group(group).num_rows
+            if start + n > offset and (end is None or start < end):
+                first = start if first is None else first
+                tables.append(parquet.read_row_group(group, columns=columns))
+            start += n
+        if tables:
+            df = pa.concat_tables(tables).to_pandas()
+            df = df.iloc[offset - first:None if end is None else end - first]
+        else:
+            schema = parquet.schema_arrow
+            df = schema.empty_table().select(columns or schema.names).to_pandas()
+    else:
+        header = pd.read_csv(file_path, nrows=0).columns
+        dtypes = {col: 'category' if isinstance(dtype, pd.CategoricalDtype) else dtype
+                  for col, dtype in get_dtypes(columns).items()}
+        df = pd.read_csv(file_path, skiprows=offset + 1, nrows=limit, header=None,
+                         names=header, usecols=columns, dtype=dtypes)
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    return apply_categories(df, file_path)
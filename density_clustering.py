@@ -0,0 +1,149 @@
+"""
+Scalable DBSCAN Helpers
+=======================
+Support code for dbscan_segmentation() in customer_segmentation.py:
+
+- A KD-tree neighbor index that is built once per feature matrix and
+  cached (the INDEX_CACHE_SIZE most recent), then reused for the k-distance curve and the eps-neighborhood
+  graph passed to DBSCAN (metric='precomputed').
+- Automatic eps selection from the knee of the sorted k-distance curve.
+- A sampled mode for large inputs: DBSCAN runs on a random core sample and
+  every remaining customer takes the label of its nearest core point
+  (or noise when that point is farther than eps). min_samples is scaled
+  by the sampling fraction, since a sample holds proportionally fewer
+  neighbors within eps of each point.
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sklearn.neighbors import NearestNeighbors
+
+# Fitted neighbor indexes keyed by a fingerprint of the indexed matrix,
+# least recently used first (sampled_dbscan uses two: sample and core points)
+INDEX_CACHE_SIZE = 2
+_index_cache = OrderedDict()
+
+
+def _fingerprint(X):
+    """Hash a matrix's shape and contents"""
+    X = np.ascontiguousarray(X)
+    return (X.shape, hashlib.sha1(X.tobytes()).hexdigest())
+
+
+def build_neighbor_index(X, algorithm='kd_tree', leaf_size=40):
+    """
+    Build (or fetch from cache) a nearest-neighbor index over X
+
+    Returns:
+        NearestNeighbors: Fitted index
+    """
+    key = (_fingerprint(X), algorithm, leaf_size)
+    if key in _index_cache:
+        _index_cache.move_to_end(key)
+        return _index_cache[key]
+    index = NearestNeighbors(algorithm=algorithm, leaf_size=leaf_size).fit(X)
+    _index_cache[key] = index
+    while len(_index_cache) > INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+    return index
+
+
+def clear_index_cache():
+    """Drop all cached neighbor indexes"""
+    _index_cache.clear()
+
+
+def k_distances(index, X, k):
+    """
+    Distance from each point to its k-th nearest neighbor (self included,
+    matching DBSCAN's min_samples convention), sorted ascending
+    """
+    distances, _ = index.kneighbors(X, n_neighbors=k)
+    return np.sort(distances[:, -1])
+
+
+def estimate_eps(index, X, min_samples=5):
+    """
+    Pick eps at the knee of the sorted k-distance curve
+
+    The knee is the point farthest from the straight line joining the
+    first and last points of the (normalized) curve.
+
+    Returns:
+        float: Suggested eps
+    """
+    curve = k_distances(index, X, min_samples)
+    if len(curve) < 3 or curve[-1] == curve[0]:
+        return float(curve[-1]) if len(curve) else 0.5
+    x = np.linspace(0.0, 1.0, len(curve))
+    y = (curve - curve[0]) / (curve[-1] - curve[0])
+    # Distance below the diagonal; the curve is convex so the knee maximizes x - y
+    knee = int(np.argmax(x - y))
+    return float(curve[knee])
+
+
+def sampled_dbscan(X, eps=0.5, min_samples=5, sample_size=50_000,
+                   random_state=42, chunksize=100_000):
+    """
+    Run DBSCAN on X, or on a sample of X for large inputs
+
+    Args:
+        X: Standardized feature matrix
+        eps: Neighborhood radius, or 'auto' to use estimate_eps()
+        min_samples: DBSCAN min_samples for the full data; a sample uses
+            1 + (min_samples - 1) * fraction (at least 2), the expected
+            number of points within eps at the sample's density
+        sample_size: Max rows clustered directly (None = all rows)
+        random_state: Seed for the sample
+        chunksize: Rows per nearest-core query when assigning the rest
+
+    Returns:
+        tuple: (labels, dbscan) where labels uses -1 for noise and dbscan
+        is the model fitted on the sample (dbscan.eps and
+        dbscan.min_samples hold the values used)
+    """
+    n = len(X)
+    if sample_size is None or sample_size >= n:
+        sample_idx = np.arange(n)
+    else:
+        rng = np.random.default_rng(random_state)
+        sample_idx = np.sort(rng.choice(n, size=sample_size, replace=False))
+    X_sample = X[sample_idx]
+    if len(sample_idx) < n:
+        fraction = len(sample_idx) / n
+        min_samples = max(2, int(round(1 + (min_samples - 1) * fraction)))
+
+    index = build_neighbor_index(X_sample)
+    if eps == 'auto':
+        eps = estimate_eps(index, X_sample, min_samples)
+
+    # Reuse the index for the eps-neighborhood graph
+    graph = index.radius_neighbors_graph(X_sample, radius=eps, mode='distance')
+    dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed')
+    sample_labels = dbscan.fit_predict(graph)
+
+    if len(sample_idx) == n:
+        return sample_labels, dbscan
+
+    labels = np.full(n, -1, dtype=sample_labels.dtype)
+    labels[sample_idx] = sample_labels
+    core_idx = dbscan.core_sample_indices_
+    if len(core_idx) == 0:
+        return labels, dbscan
+
+    # Assign the remaining customers to their nearest core point within eps
+    core_index = build_neighbor_index(X_sample[core_idx])
+    core_labels = sample_labels[core_idx]
+    rest = np.setdiff1d(np.arange(n), sample_idx, assume_unique=True)
+    for start in range(0, len(rest), chunksize):
+        rows = rest[start:start + chunksize]
+        distances, nearest = core_index.kneighbors(X[rows], n_neighbors=1)
+        labels[rows] = np.where(distances[:, 0] <= eps, core_labels[nearest[:, 0]], -1)
+    return labels, dbscan
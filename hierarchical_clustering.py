@@ -0,0 +1,185 @@
+"""
+Memory-Bounded Hierarchical Clustering
+======================================
+Two-stage Ward clustering for hierarchical_segmentation() in
+customer_segmentation.py. Plain Ward linkage needs the full pairwise
+distance matrix (n * (n - 1) / 2 doubles), which is out of reach for
+production-sized customer tables. Instead:
+
+1. Customers are compressed into a few thousand micro-clusters with
+   mini-batch K-Means.
+2. Ward linkage runs on the micro-cluster centroids only, weighted by
+   the number of customers in each micro-cluster (weighted_ward), so a
+   merge costs what it would cost on the customers themselves.
+3. Each customer inherits the label of its micro-cluster.
+
+Both the full and the two-stage paths support a connectivity-constrained
+mode (k-nearest-neighbor graph), which keeps Ward's memory linear in n.
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import tracemalloc
+import numpy as np
+from sklearn.cluster import AgglomerativeClustering, MiniBatchKMeans
+from sklearn.neighbors import kneighbors_graph
+
+
+def full_ward_memory_mb(n_rows):
+    """Estimated size of the condensed distance matrix used by full Ward linkage"""
+    return n_rows * (n_rows - 1) / 2 * 8 / (1024 * 1024)
+
+
+def fit_ward(X, n_clusters, connectivity=False, n_neighbors=10):
+    """
+    Ward agglomerative clustering, optionally constrained to a kNN graph
+
+    Returns:
+        AgglomerativeClustering: Fitted model (labels_ holds one label per row)
+    """
+    graph = None
+    if connectivity:
+        graph = kneighbors_graph(X, n_neighbors=min(n_neighbors, len(X) - 1),
+                                 include_self=False)
+    model = AgglomerativeClustering(n_clusters=n_clusters, linkage='ward',
+                                    connectivity=graph)
+    return model.fit(X)
+
+
+def weighted_ward(centers, weights, n_clusters, connectivity=None):
+    """
+    Ward agglomerative clustering of weighted points
+
+    Merging clusters a and b costs the increase in the within-cluster sum
+    of squares, w_a * w_b / (w_a + w_b) * ||c_a - c_b||^2, where w is the
+    number of customers behind each point. Every cluster keeps the cost of
+    its nearest neighbor; after a merge only the clusters that pointed at
+    one of the merged pair are rescanned.
+
+    Args:
+        centers: Point coordinates (points x features)
+        weights: Positive weight of each point
+        n_clusters: Number of clusters to stop at
+        connectivity: Optional points x points adjacency (dense or sparse);
+            only adjacent clusters are merged while any adjacent pair remains
+
+    Returns:
+        ndarray: Cluster label (0 .. n_clusters - 1) of each point
+    """
+    centers = np.array(centers, dtype=np.float64)
+    weights = np.array(weights, dtype=np.float64)
+    n = len(centers)
+    active = np.ones(n, dtype=bool)
+    owner = np.arange(n)
+    adjacency = None
+    if connectivity is not None:
+        adjacency = connectivity.toarray() if hasattr(connectivity, 'toarray') else np.asarray(connectivity)
+        adjacency = (adjacency != 0) | (adjacency != 0).T
+
+    def costs(i):
+        d = weights[i] * weights / (weights[i] + weights) * ((centers - centers[i]) ** 2).sum(axis=1)
+        d[~active] = np.inf
+        d[i] = np.inf
+        if adjacency is not None:
+            d[~adjacency[i]] = np.inf
+        return d
+
+    def nearest(i):
+        d = costs(i)
+        j = np.argmin(d)
+        return j, d[j]
+
+    nn = np.zeros(n, dtype=np.int64)
+    nn_cost = np.full(n, np.inf)
+    for i in range(n):
+        nn[i], nn_cost[i] = nearest(i)
+
+    for _ in range(n - max(n_clusters, 1)):
+        i = np.argmin(nn_cost)
+        if not np.isfinite(nn_cost[i]):
+            # Disconnected graph: let the remaining components merge freely
+            adjacency = None
+            for k in np.flatnonzero(active):
+                nn[k], nn_cost[k] = nearest(k)
+            i = np.argmin(nn_cost)
+        j = nn[i]
+        total = weights[i] + weights[j]
+        centers[i] = (weights[i] * centers[i] + weights[j] * centers[j]) / total
+        weights[i] = total
+        active[j] = False
+        nn_cost[j] = np.inf
+        owner[owner == j] = i
+        if adjacency is not None:
+            adjacency[i] |= adjacency[j]
+            adjacency[:, i] |= adjacency[:, j]
+            adjacency[i, i] = False
+
+        d = costs(i)
+        nn[i] = np.argmin(d)
+        nn_cost[i] = d[nn[i]]
+        stale = active & ((nn == i) | (nn == j))
+        stale[i] = False
+        for k in np.flatnonzero(stale):
+            nn[k], nn_cost[k] = nearest(k)
+        closer = active & (d < nn_cost)
+        nn[closer] = i
+        nn_cost[closer] = d[closer]
+    return np.unique(owner, return_inverse=True)[1]
+
+
+def two_stage_ward(X, n_clusters=4, n_micro=2000, connectivity=False,
+                   batch_size=4096, random_state=42):
+    """
+    Pre-cluster X into micro-clusters, then run Ward on their centroids
+    weighted by micro-cluster size
+
+    Args:
+        X: Standardized feature matrix
+        n_clusters: Final number of clusters
+        n_micro: Number of micro-clusters (capped at the number of rows)
+        connectivity: Constrain Ward to a kNN graph over the centroids
+        batch_size: Mini-batch size for the pre-clustering step
+        random_state: Seed for the pre-clustering step
+
+    Returns:
+        tuple: (labels for every row of X, Ward label of each micro-cluster,
+        micro-cluster model)
+    """
+    n_micro = min(n_micro, len(X))
+    micro = MiniBatchKMeans(n_clusters=n_micro, batch_size=batch_size,
+                            random_state=random_state, n_init=3)
+    micro_labels = micro.fit_predict(X)
+    sizes = np.bincount(micro_labels, minlength=n_micro)
+    # Micro-clusters left without customers take no part in the merge
+    used = np.flatnonzero(sizes)
+    centers = micro.cluster_centers_[used]
+    graph = None
+    if connectivity:
+        graph = kneighbors_graph(centers, n_neighbors=min(10, len(centers) - 1),
+                                 include_self=False)
+    ward_labels = np.full(n_micro, -1, dtype=np.int64)
+    ward_labels[used] = weighted_ward(centers, sizes[used], n_clusters, connectivity=graph)
+    return ward_labels[micro_labels], ward_labels, micro
+
+
+def measure_peak_memory(func, *args, **kwargs):
+    """
+    Run func while tracing allocations
+
+    Returns:
+        tuple: (result, peak_mb)
+    """
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return result, peak / (1024 * 1024)
@@ -0,0 +1,240 @@
+"""
+Incremental Re-segmentation
+===========================
+Keeps the per-group statistics and K-Means cluster assignments from the
+previous run and only processes customers that are new, changed or
+removed since then (rows are matched on customer_id and compared by a
+row hash).
+
+- Group statistics are stored as mergeable sufficient statistics
+  (count, sum, sum of squares per group), so counts, sums, means,
+  variances and standard deviations can be updated by subtracting the old
+  rows' contributions and adding the new ones. Medians are not mergeable
+  and are left out of incremental tables.
+- Only changed and new rows are assigned to the stored centroids. Per
+  cluster feature sums are maintained as well; when any cluster mean
+  drifts further than `drift_threshold` (in standardized units) from its
+  centroid, K-Means is refitted on all rows.
+
+State lives in .cache/incremental/<name>.pkl next to the source CSV.
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+from aggregation import factorize_key, tables_from_stats
+from data_loader import CACHE_DIR
+from scoring import nearest_centroid
+
+STATE_VERSION = 1
+
+
+def state_path(file_path, name):
+    """Location of the incremental state for a source CSV"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR, 'incremental')
+    return os.path.join(directory, f"{name}.pkl")
+
+
+def row_hashes(df):
+    """Hash every row (all columns) to detect changed customers"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def stat_pairs(tables):
+    """
+    Collect the (group key, column) pairs needed by a set of table specs
+
+    Returns:
+        list: Sorted unique (key, column) pairs
+    """
+    pairs = set()
+    for key, agg_spec in tables.values():
+        for column in agg_spec:
+            pairs.add((key, column))
+    return sorted(pairs)
+
+
+def compute_group_stats(df, pairs):
+    """
+    Compute count / sum / sum of squares per group for each (key, column)
+
+    Returns:
+        dict: (key, column) -> DataFrame indexed by group label
+    """
+    stats = {}
+    factorized = {}
+    for key, column in pairs:
+        if key not in factorized:
+            factorized[key] = factorize_key(df[key])
+        codes, index = factorized[key]
+        v = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = (codes >= 0) & ~np.isnan(v)
+        c, v = codes[valid], v[valid]
+        n = len(index)
+        stats[(key, column)] = pd.DataFrame({
+            'count': np.bincount(c, minlength=n),
+            'sum': np.bincount(c, weights=v, minlength=n),
+            'sumsq': np.bincount(c, weights=v * v, minlength=n),
+        }, index=pd.Index(list(index), name=key))
+    return stats
+
+
+def update_group_stats(stats, removed, added):
+    """
+    Apply a delta: subtract removed rows' statistics and add new rows'
+
+    Returns:
+        dict: Updated statistics
+    """
+    updated = {}
+    for pair, table in stats.items():
+        table = table.sub(removed[pair], fill_value=0).add(added[pair], fill_value=0)
+        updated[pair] = table
+    return updated
+
+
+def _cluster_sums(X_scaled, labels, n_clusters):
+    """Per-cluster row counts and feature sums"""
+    counts = np.bincount(labels, minlength=n_clusters)
+    sums = np.stack([np.bincount(labels, weights=X_scaled[:, j], minlength=n_clusters)
+                     for j in range(X_scaled.shape[1])], axis=1)
+    return counts, sums
+
+
+def _fit_clusters(df, features, n_clusters, random_state):
+    """Full K-Means refit; returns the cluster part of the state and labels"""
+    X = df[features].to_numpy(dtype=np.float64)
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    labels = kmeans.fit_predict(X_scaled).astype(np.int32)
+    counts, sums = _cluster_sums(X_scaled, labels, n_clusters)
+    clusters = {'mean': scaler.mean_, 'scale': scaler.scale_,
+                'centers': kmeans.cluster_centers_, 'counts': counts, 'sums': sums}
+    return clusters, labels
+
+
+def _scale(df, features, clusters):
+    """Standardize rows with the stored scaler statistics"""
+    return (df[features].to_numpy(dtype=np.float64) - clusters['mean']) / clusters['scale']
+
+
+def centroid_drift(clusters):
+    """Largest distance between a cluster's current mean and its centroid"""
+    counts = clusters['counts']
+    nonempty = counts > 0
+    means = clusters['sums'][nonempty] / counts[nonempty, None]
+    if not nonempty.any():
+        return 0.0
+    return float(np.sqrt(((means - clusters['centers'][nonempty]) ** 2).sum(axis=1)).max())
+
+
+def _check_unique_ids(ids, source, hint=''):
+    """Rows are matched on customer_id, so every id must appear once"""
+    duplicated = pd.unique(ids[ids.duplicated()])
+    if len(duplicated):
+        examples = ', '.join(str(v) for v in duplicated[:5])
+        raise ValueError(f"{source} has {len(duplicated):,} duplicate customer_id values "
+                         f"(e.g. {examples}); incremental mode needs unique ids{hint}")
+
+
+def run_incremental(df, file_path, name, tables, features, n_clusters=4,
+                    label_column='cluster', drift_threshold=0.25, random_state=42):
+    """
+    Update group statistics and cluster labels from the last snapshot
+
+    Args:
+        df: Current customer data (must contain unique customer_id values)
+        file_path: Source CSV (locates the state directory)
+        name: State name, one per calling script
+        tables: Table specs whose statistics are maintained
+        features: Clustering features
+        n_clusters: Number of K-Means clusters
+        label_column: Cluster column added to df
+        drift_threshold: Centroid drift (standardized units) that forces a refit
+        random_state: Seed for K-Means refits
+
+    Returns:
+        tuple: (df with label_column, group tables, info dict with
+        added/changed/removed counts, drift and whether a refit ran)
+
+    Raises:
+        ValueError: If df or the stored snapshot has duplicate customer_ids
+    """
+    path = state_path(file_path, name)
+    _check_unique_ids(df['customer_id'], 'The customer data')
+    tables = {table: (key, agg_spec) for table, (key, agg_spec) in tables.items()
+              if key in df.columns and set(agg_spec) <= set(df.columns)}
+    pairs = stat_pairs(tables)
+    keep_cols = sorted({'customer_id'} | {c for pair in pairs for c in pair} | set(features))
+    hashes = row_hashes(df)
+
+    state = pd.read_pickle(path) if os.path.exists(path) else None
+    if (state is None or state['version'] != STATE_VERSION or state['pairs'] != pairs
+            or state['features'] != features or state['n_clusters'] != n_clusters):
+        state = None
+
+    info = {'added': len(df), 'changed': 0, 'removed': 0, 'drift': 0.0, 'refit': True}
+    if state is None:
+        stats = compute_group_stats(df, pairs)
+        clusters, labels = _fit_clusters(df, features, n_clusters, random_state)
+    else:
+        snapshot = state['snapshot']
+        _check_unique_ids(snapshot['customer_id'], f"The stored snapshot '{path}'",
+                          hint=' (delete the snapshot to rebuild it)')
+        old_pos = pd.Index(snapshot['customer_id']).get_indexer(df['customer_id'])
+        is_new = old_pos < 0
+        matched = ~is_new
+        is_changed = np.zeros(len(df), dtype=bool)
+        is_changed[matched] = snapshot['_hash'].to_numpy()[old_pos[matched]] != hashes[matched]
+        still_present = np.zeros(len(snapshot), dtype=bool)
+        still_present[old_pos[matched]] = True
+
+        touched_new = is_new | is_changed
+        stale_old = ~still_present
+        stale_old[old_pos[is_changed]] = True
+        old_rows = snapshot[stale_old]
+        new_rows = df[touched_new]
+        info.update(added=int(is_new.sum()), changed=int(is_changed.sum()),
+                    removed=int((~still_present).sum()), refit=False)
+
+        # Group statistics: remove old versions, add new versions
+        stats = update_group_stats(state['stats'], compute_group_stats(old_rows, pairs),
+                                   compute_group_stats(new_rows, pairs))
+
+        # Clusters: unchanged rows keep labels, touched rows are re-assigned
+        clusters = state['clusters']
+        labels = np.empty(len(df), dtype=np.int32)
+        labels[matched] = snapshot[label_column].to_numpy()[old_pos[matched]]
+        new_labels = nearest_centroid(_scale(new_rows, features, clusters),
+                                      clusters['centers'], None)
+        labels[touched_new] = new_labels
+
+        old_counts, old_sums = _cluster_sums(_scale(old_rows, features, clusters),
+                                             old_rows[label_column].to_numpy(), n_clusters)
+        new_counts, new_sums = _cluster_sums(_scale(new_rows, features, clusters),
+                                             new_labels, n_clusters)
+        clusters = dict(clusters, counts=clusters['counts'] - old_counts + new_counts,
+                        sums=clusters['sums'] - old_sums + new_sums)
+        info['drift'] = centroid_drift(clusters)
+        if info['drift'] > drift_threshold:
+            clusters, labels = _fit_clusters(df, features, n_clusters, random_state)
+            info['refit'] = True
+
+    df[label_column] = labels
+    snapshot = df[keep_cols].copy()
+    snapshot['_hash'] = hashes
+    snapshot[label_column] = labels
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.to_pickle({'version': STATE_VERSION, 'pairs': pairs, 'features': features,
+                  'n_clusters': n_clusters, 'stats': stats, 'clusters': clusters,
+                  'snapshot': snapshot}, path)
+    return df, tables_from_stats(stats, tables), info
@@ -0,0 +1,216 @@
+"""
+Analytics API Load Test
+=======================
+Replays a mix of dashboard requests against api_server.py and reports
+latency percentiles (p50/p95/p99) and throughput, to see how many
+concurrent dashboard users one machine can serve.
+
+Each simulated user keeps one HTTP/1.1 keep-alive connection open and
+sends requests back to back: mostly /api/customers pages filtered by
+segment, geographic region and/or loyalty tier (values taken from the
+dataset's cube), plus the aggregate endpoints. The mix is seeded, so runs
+are repeatable. By default a server is started on a free local port for
+the CSV, so the test runs offline; pass --url to target a running server.
+
+Usage:
+    python load_test.py                               # 20 users for 10s
+    python load_test.py --users 50 --duration 30 --file big.csv
+    python load_test.py --url http://127.0.0.1:8000 --users 100
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+import numpy as np
+from cube import load_cube
+from data_loader import DEFAULT_FILE
+
+FILTER_DIMENSIONS = ['segment', 'geographic_region', 'loyalty_tier']
+AGGREGATE_PATHS = ['/api/summary', '/api/segments', '/api/categories', '/api/devices',
+                   '/api/insights']
+# Share of requests that hit aggregate endpoints (the rest are filtered pages)
+AGGREGATE_SHARE = 0.2
+PAGE_SIZE = 50
+MAX_PAGES = 20
+SERVER_START_TIMEOUT = 120
+
+
+def request_mix(file_path=DEFAULT_FILE, n_requests=1000, seed=42):
+    """
+    Build a seeded list of request targets
+
+    Filtered requests combine one to three of FILTER_DIMENSIONS with values
+    observed in the dataset and a random page offset.
+
+    Returns:
+        list: Request targets such as '/api/customers?segment=High+Value&limit=50'
+    """
+    cube = load_cube(file_path)
+    values = {dim: [str(v) for v in cube[dim].dropna().unique()] for dim in FILTER_DIMENSIONS
+              if dim in cube.columns}
+    dims = list(values)
+    rng = np.random.default_rng(seed)
+    targets = []
+    for _ in range(n_requests):
+        if rng.random() < AGGREGATE_SHARE:
+            targets.append(AGGREGATE_PATHS[rng.integers(len(AGGREGATE_PATHS))])
+            continue
+        chosen = rng.choice(dims, size=rng.integers(1, len(dims) + 1), replace=False)
+        query = [(dim, values[dim][rng.integers(len(values[dim]))]) for dim in chosen]
+        query += [('offset', int(rng.integers(MAX_PAGES)) * PAGE_SIZE), ('limit', PAGE_SIZE)]
+        targets.append('/api/customers?' + urlencode(query))
+    return targets
+
+
+async def _fetch(reader, writer, host, target):
+    """Send one GET on an open connection; returns (status, body size)"""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n"
+                 f"Accept-Encoding: gzip\r\n\r\n".encode('latin-1'))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status, length
+
+
+async def _user(host, port, targets, start, deadline, latencies, errors):
+    """One simulated dashboard user: a keep-alive connection issuing requests"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        i = start
+        while time.perf_counter() < deadline:
+            target = targets[i % len(targets)]
+            i += 1
+            began = time.perf_counter()
+            try:
+                status, _ = await _fetch(reader, writer, host, target)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                errors.append(target)
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            latencies.append(time.perf_counter() - began)
+            if status >= 400:
+                errors.append(target)
+    finally:
+        writer.close()
+
+
+async def run_load(url, targets, users=20, duration=10.0):
+    """
+    Drive `users` concurrent connections for `duration` seconds
+
+    Returns:
+        dict: requests, errors, seconds, throughput (req/s) and latency
+        percentiles p50/p95/p99/max in milliseconds
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies, errors = [], []
+    began = time.perf_counter()
+    deadline = began + duration
+    step = max(len(targets) // users, 1)
+    await asyncio.gather(*(_user(host, port, targets, u * step, deadline, latencies, errors)
+                           for u in range(users)))
+    seconds = time.perf_counter() - began
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {'users': users, 'requests': len(latencies), 'errors': len(errors),
+            'seconds': seconds, 'throughput': len(latencies) / seconds,
+            'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': ms.max()}
+
+
+def print_report(result):
+    """Print a load test summary"""
+    print(f"\n{result['users']} users, {result['requests']} requests in {result['seconds']:.1f}s "
+          f"({result['errors']} errors)")
+    print(f"   Throughput: {result['throughput']:,.1f} req/s")
+    print(f"   Latency: p50 {result['p50_ms']:.2f} ms | p95 {result['p95_ms']:.2f} ms | "
+          f"p99 {result['p99_ms']:.2f} ms | max {result['max_ms']:.2f} ms")
+
+
+def _free_port():
+    """An unused local TCP port"""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(file_path, workers=None):
+    """
+    Start api_server.py in a subprocess and wait until it accepts connections
+
+    Returns:
+        tuple: (Popen, base URL)
+    """
+    port = _free_port()
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api_server.py')
+    command = [sys.executable, server, '--file', file_path, '--port', str(port)]
+    if workers:
+        command += ['--workers', str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("api_server.py exited during startup")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("api_server.py did not start in time")
+
+
+def main(argv=None):
+    """Run the load test"""
+    parser = argparse.ArgumentParser(description='Load test the analytics API')
+    parser.add_argument('--file', default=DEFAULT_FILE, help='Customer CSV file')
+    parser.add_argument('--url', default=None,
+                        help='Base URL of a running server (default: start one locally)')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent users')
+    parser.add_argument('--duration', type=float, default=10.0, help='Test length in seconds')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Distinct requests in the replayed mix')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker threads for the local server')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the request mix')
+    parser.add_argument('--warmup', type=float, default=2.0,
+                        help='Seconds of unmeasured traffic before the test')
+    args = parser.parse_args(argv)
+
+    targets = request_mix(args.file, args.requests, args.seed)
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_local_server(args.file, args.workers)
+        print(f"Started api_server.py on {url}")
+    try:
+        if args.warmup > 0:
+            asyncio.run(run_load(url, targets, min(args.users, 4), args.warmup))
+        print_report(asyncio.run(run_load(url, targets, args.users, args.duration)))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Stage Profiling
+===============
+Shared --profile instrumentation for analyze_customers.py,
+customer_segmentation.py and visualize_data.py. Each stage of a run
+(load, each analysis, clustering, each chart, CSV write) is wrapped in
+stage(), which records wall time, CPU time, resident memory (current,
+delta and the process peak so far, read together from the same source)
+and the memory delta of the DataFrame it works on.
+CPU time and memory are those of the measuring process: work done in
+child processes shows up as wall time only, except chart rendering, whose
+workers measure their own stages.
+
+The report is written as JSON; optionally the whole run is recorded with
+cProfile and dumped in pstats format (open it with snakeviz, or convert it
+to a flame graph with flameprof/gprof2dot).
+
+Usage:
+    profile = new_profile('analyze_customers', cprofile_path='run.prof')
+    with stage(profile, 'load') as record:
+        df = load_data()
+        record['df'] = df
+    report = finish_profile(profile, 'profile.json')
+    print_profile(report)
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import cProfile
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from data_loader import memory_usage_mb
+
+PROFILE_VERSION = 2
+
+
+def memory_mb():
+    """
+    Current and peak resident set size of this process in MB
+
+    Both come from one read of /proc/self/status (VmRSS and VmHWM, in kB)
+    where available, so the peak is never below the current value; other
+    platforms use psutil and getrusage, with the peak raised to at least
+    the current value.
+
+    Returns:
+        tuple: (rss, peak), either None where it cannot be read
+    """
+    try:
+        with open('/proc/self/status') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['VmRSS'].split()[0]) / 1024, int(fields['VmHWM'].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        import psutil
+        rss = psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        rss = None
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        peak = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        peak = None
+    if rss is not None and peak is not None:
+        peak = max(peak, rss)
+    return rss, peak
+
+
+def rss_mb():
+    """Current resident set size in MB (None where it cannot be read)"""
+    return memory_mb()[0]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unavailable)"""
+    return memory_mb()[1]
+
+
+def new_profile(script, cprofile_path=None):
+    """
+    Start profiling a run
+
+    Args:
+        script: Name recorded in the report
+        cprofile_path: Also record the run with cProfile and dump it here
+
+    Returns:
+        dict: Profile state to pass to stage() and finish_profile()
+    """
+    profile = {'script': script, 'started_at': datetime.now().isoformat(timespec='seconds'),
+               'stages': [], 'wall': time.perf_counter(), 'cpu': time.process_time(),
+               'cprofile_path': cprofile_path, 'cprofile': None}
+    if cprofile_path:
+        profile['cprofile'] = cProfile.Profile()
+        profile['cprofile'].enable()
+    return profile
+
+
+@contextmanager
+def stage(profile, name, df=None):
+    """
+    Measure one stage of a run
+
+    A no-op when profile is None, so callers can always wrap their stages.
+    Store the DataFrame the stage produced in record['df'] to measure its
+    memory delta against `df` (or its absolute size if `df` is None).
+    process_peak_rss_mb is the peak of the whole process up to the end of
+    the stage, not of the stage alone.
+
+    Yields:
+        dict: The stage record
+    """
+    if profile is None:
+        yield {}
+        return
+    record = {'name': name}
+    df_before = memory_usage_mb(df) if df is not None else None
+    rss_before = rss_mb()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record['wall_s'] = time.perf_counter() - wall
+        record['cpu_s'] = time.process_time() - cpu
+        record['rss_mb'], record['process_peak_rss_mb'] = memory_mb()
+        record['rss_delta_mb'] = None if rss_before is None or record['rss_mb'] is None \
+            else record['rss_mb'] - rss_before
+        df_after = record.pop('df', df)
+        if df_after is not None:
+            record['df_mb'] = memory_usage_mb(df_after)
+            record['df_delta_mb'] = record['df_mb'] - (df_before or 0.0)
+        profile['stages'].append(record)
+
+
+def add_stages(profile, records, process):
+    """Add stage records measured in another process (e.g. a render worker)"""
+    if profile is None:
+        return
+    for record in records:
+        profile['stages'].append(dict(record, process=process))
+
+
+def finish_profile(profile, json_path=None):
+    """
+    Stop profiling and write the report
+
+    Args:
+        profile: Dict from new_profile()
+        json_path: Where to write the JSON report (None = don't write)
+
+    Returns:
+        dict: The report (script, platform, totals and stages)
+    """
+    if profile['cprofile'] is not None:
+        profile['cprofile'].disable()
+        profile['cprofile'].dump_stats(profile['cprofile_path'])
+
+    report = {
+        'version': PROFILE_VERSION,
+        'script': profile['script'],
+        'started_at': profile['started_at'],
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'total_wall_s': time.perf_counter() - profile['wall'],
+        'total_cpu_s': time.process_time() - profile['cpu'],
+        'peak_rss_mb': peak_rss_mb(),
+        'cprofile': profile['cprofile_path'],
+        'stages': profile['stages'],
+    }
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def print_profile(report):
+    """Print the stage table of a report, in run order"""
+    def mb(value):
+        return f"{value:>10.1f}" if value is not None else f"{'-':>10}"
+
+    print(f"\nProfile of {report['script']} (seconds, MB):")
+    print(f"   {'stage':<44}{'wall':>9}{'cpu':>9}{'rss':>10}{'Δrss':>10}{'Δdf':>10}")
+    for record in report['stages']:
+        name = record['name'] + (f" [{record['process']}]" if 'process' in record else '')
+        print(f"   {name:<44}{record['wall_s']:>9.2f}{record['cpu_s']:>9.2f}"
+              f"{mb(record['rss_mb'])}{mb(record['rss_delta_mb'])}{mb(record.get('df_delta_mb'))}")
+    print(f"   Total: {report['total_wall_s']:.2f}s wall, {report['total_cpu_s']:.2f}s CPU, "
+          f"peak RSS {mb(report['peak_rss_mb']).strip()} MB")
+
+
+def add_profile_arguments(parser, script):
+    """Add the shared --profile/--cprofile options to a script's parser"""
+    parser.add_argument('--profile', nargs='?', const=f"{script}_profile.json", default=None,
+                        metavar='JSON',
+                        help=f"Time each stage and write a JSON report (default {script}_profile.json)")
+    parser.add_argument('--cprofile', default=None, metavar='PROF',
+                        help='With --profile, also dump cProfile stats (pstats format) here')
+
+
+def profile_from_args(args, script):
+    """new_profile() when --profile was given, else None"""
+    return new_profile(script, args.cprofile) if args.profile else None
+
+
+def report_profile(profile, args):
+    """Finish, save and print a profile started by profile_from_args()"""
+    if profile is None:
+        return
+    report = finish_profile(profile, args.profile)
+    print_profile(report)
+    print(f"\nProfile report saved to '{args.profile}'")
+    if args.cprofile:
+        print(f"cProfile stats saved to '{args.cprofile}'")
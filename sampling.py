@@ -0,0 +1,38 @@
+"""
+Sampling Helpers
+================
+Stratified row sampling shared by the clustering code (silhouette
+sampling in customer_segmentation.py) and the density plots in
+visualize_data.py.
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def stratified_sample_indices(strata, sample_size, random_state=42):
+    """
+    Draw row indices with proportional allocation across strata
+
+    Returns:
+        ndarray: Sorted row indices (all rows if sample_size >= n)
+    """
+    n = len(strata)
+    if sample_size is None or sample_size >= n:
+        return np.arange(n)
+
+    rng = np.random.default_rng(random_state)
+    codes, uniques = pd.factorize(np.asarray(strata))
+    sizes = np.bincount(codes)
+    # Proportional allocation, at least one row per non-empty stratum
+    alloc = np.maximum(np.floor(sizes * sample_size / n).astype(int), 1)
+    indices = []
+    for code, take in enumerate(alloc):
+        members = np.flatnonzero(codes == code)
+        indices.append(rng.choice(members, size=min(take, len(members)), replace=False))
+    return np.sort(np.concatenate(indices))
@@ -0,0 +1,216 @@
+"""
+Segmentation Model Artifacts and Online Scoring
+===============================================
+Saves the fitted StandardScaler, K-Means centroids, label encoders and
+feature list from customer_segmentation.py to a versioned .npz artifact,
+and assigns clusters to new customers from that artifact.
+
+Scoring is pure NumPy (standardize, then nearest centroid by squared
+Euclidean distance in vectorized batches), so this module never imports
+scikit-learn.
+
+Usage:
+    python scoring.py new_customers.csv --output scored_customers.csv
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import time
+
+import numpy as np
+from data_loader import DEFAULT_CHUNKSIZE, iter_chunks
+
+ARTIFACT_FORMAT = 1
+MODEL_DIR = 'models'
+MODEL_PREFIX = 'segmentation_model_v'
+# Artifacts kept per directory; older versions are deleted on save
+MODEL_KEEP = 5
+
+
+def _artifact_versions(directory):
+    """Return (version, path) pairs for the artifacts in a directory, oldest first"""
+    pattern = re.compile(re.escape(MODEL_PREFIX) + r'(\d+)\.npz$')
+    versions = []
+    for path in glob.glob(os.path.join(directory, MODEL_PREFIX + '*.npz')):
+        match = pattern.search(os.path.basename(path))
+        if match:
+            versions.append((int(match.group(1)), path))
+    return sorted(versions)
+
+
+def save_model_artifact(scaler, kmeans, features, encoders=None, encoded_columns=None,
+                        directory=MODEL_DIR, label_column='kmeans_cluster', keep=MODEL_KEEP):
+    """
+    Save a fitted scaler, K-Means model and encoders as the next model version
+
+    Only the newest `keep` versions are kept in the directory.
+
+    Args:
+        scaler: Fitted StandardScaler
+        kmeans: Fitted KMeans / MiniBatchKMeans, or its cluster centers
+        features: Feature columns, in the order the models were fitted on
+        encoders: Optional dict of column name -> fitted LabelEncoder
+        encoded_columns: Optional dict of column name -> output column name
+            (default '<column>_encoded')
+        directory: Directory holding the versioned artifacts
+        label_column: Name of the cluster column written when scoring
+        keep: Number of versions to keep (None = keep all)
+
+    Returns:
+        str: Path of the saved artifact
+    """
+    os.makedirs(directory, exist_ok=True)
+    existing = _artifact_versions(directory)
+    version = existing[-1][0] + 1 if existing else 1
+    path = os.path.join(directory, f"{MODEL_PREFIX}{version}.npz")
+
+    encoders = encoders or {}
+    encoded_columns = encoded_columns or {}
+    meta = {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'features': list(features),
+        'label_column': label_column,
+        'encoders': {col: encoded_columns.get(col, f"{col}_encoded") for col in encoders},
+    }
+    arrays = {
+        'mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'centers': np.asarray(getattr(kmeans, 'cluster_centers_', kmeans), dtype=np.float64),
+        'meta': np.array(json.dumps(meta)),
+    }
+    for column, encoder in encoders.items():
+        arrays[f"classes__{column}"] = np.asarray(encoder.classes_).astype(str)
+
+    np.savez(path, **arrays)
+    if keep is not None:
+        for _, old_path in _artifact_versions(directory)[:-max(keep, 1)]:
+            os.remove(old_path)
+    return path
+
+
+def load_model_artifact(path=None, directory=MODEL_DIR):
+    """
+    Load a model artifact (the latest version when path is None)
+
+    Returns:
+        dict: mean, scale, centers, features, label_column, encoders
+        (column -> (output column, sorted class array)) and version
+    """
+    if path is None:
+        versions = _artifact_versions(directory)
+        if not versions:
+            raise FileNotFoundError(f"No segmentation model found in '{directory}'")
+        path = versions[-1][1]
+
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        if meta['format'] != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported model artifact format: {meta['format']}")
+        artifact = {
+            'mean': data['mean'],
+            'scale': data['scale'],
+            'centers': data['centers'],
+            'encoders': {col: (output, data[f"classes__{col}"])
+                         for col, output in meta['encoders'].items()},
+        }
+    artifact.update(features=meta['features'], label_column=meta['label_column'],
+                    version=meta['version'], path=path)
+    # Precompute squared centroid norms for the distance expansion
+    artifact['center_norms'] = (artifact['centers'] ** 2).sum(axis=1)
+    return artifact
+
+
+def nearest_centroid(X_scaled, centers, center_norms=None, batch_size=100_000):
+    """
+    Index of the nearest centroid for each row, in vectorized batches
+
+    Uses ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; the ||x||^2 term is
+    constant per row and dropped.
+
+    Returns:
+        ndarray: int32 cluster labels
+    """
+    if center_norms is None:
+        center_norms = (centers ** 2).sum(axis=1)
+    labels = np.empty(len(X_scaled), dtype=np.int32)
+    for start in range(0, len(X_scaled), batch_size):
+        batch = X_scaled[start:start + batch_size]
+        distances = center_norms - 2.0 * batch @ centers.T
+        labels[start:start + batch_size] = distances.argmin(axis=1)
+    return labels
+
+
+def encode_column(values, classes):
+    """Map values to LabelEncoder codes (-1 for classes unseen at fit time)"""
+    values = np.asarray(values).astype(str)
+    codes = np.searchsorted(classes, values)
+    codes = np.minimum(codes, len(classes) - 1)
+    return np.where(classes[codes] == values, codes, -1)
+
+
+def score_customers(df, artifact, batch_size=100_000):
+    """
+    Assign clusters (and encoded categoricals) to new customers
+
+    Args:
+        df: DataFrame with at least the artifact's feature columns
+        artifact: Dict returned by load_model_artifact()
+        batch_size: Rows per distance computation
+
+    Returns:
+        DataFrame: df with the cluster column (and *_encoded columns) added
+    """
+    X = df[artifact['features']].to_numpy(dtype=np.float64)
+    X_scaled = (X - artifact['mean']) / artifact['scale']
+    df[artifact['label_column']] = nearest_centroid(
+        X_scaled, artifact['centers'], artifact['center_norms'], batch_size)
+    for column, (output, classes) in artifact['encoders'].items():
+        if column in df.columns:
+            df[output] = encode_column(df[column], classes)
+    return df
+
+
+def score_file(input_file, output_file, artifact, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Score a CSV chunk by chunk and write the results
+
+    Returns:
+        int: Number of customers scored
+    """
+    total = 0
+    for i, chunk in enumerate(iter_chunks(input_file, chunksize=chunksize)):
+        scored = score_customers(chunk, artifact)
+        scored.to_csv(output_file, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        total += len(scored)
+    return total
+
+
+def main(argv=None):
+    """Score a CSV of customers with a saved segmentation model"""
+    parser = argparse.ArgumentParser(description='Assign segmentation clusters to new customers')
+    parser.add_argument('input', help='CSV file of customers to score')
+    parser.add_argument('--model', default=None, help='Model artifact (default: latest in models/)')
+    parser.add_argument('--output', default='scored_customers.csv', help='Output CSV file')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE, help='Rows per chunk')
+    args = parser.parse_args(argv)
+
+    artifact = load_model_artifact(args.model)
+    start = time.perf_counter()
+    total = score_file(args.input, args.output, artifact, chunksize=args.chunksize)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {total} customers with model v{artifact['version']} "
+          f"in {elapsed:.2f}s -> '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
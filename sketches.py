@@ -0,0 +1,432 @@
+"""
+Mergeable Sketches and Out-of-Core Dataset Profile
+==================================================
+Computes the summary printed by explore_data() in analyze_customers.py
+(column types and non-null counts, missing values, describe() statistics
+and categorical value counts) without loading the file. The CSV is split
+into line-aligned byte ranges; worker processes summarize their ranges
+into small mergeable states, which the main process merges in file order:
+
+- count, mean, std, min and max: Welford moments, merged with Chan's
+  parallel formula (exact up to float rounding)
+- 25%/50%/75% quantiles: merging t-digests (compression TDIGEST_DELTA),
+  kept as exact histograms while a column has at most TDIGEST_DELTA
+  distinct values; otherwise the rank error is well below 1%
+- categorical value counts: exact frequency tables (the categorical
+  columns have a handful of values each)
+- distinct counts of numeric columns: exact for those histograms, else
+  HyperLogLog with 2**HLL_PRECISION registers (standard error
+  1.04 / sqrt(2**HLL_PRECISION), about 0.8%)
+
+Memory per worker is bounded by the byte range size, independent of the
+file size.
+
+Usage:
+    python sketches.py                                 # ecommerce_customers.csv
+    python sketches.py customers_100m.csv --workers 16 --json profile.json
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from data_loader import DEFAULT_FILE, RANGE_BYTES, SCHEMA, parse_csv_bytes, split_ranges
+
+TDIGEST_DELTA = 200
+HLL_PRECISION = 14
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+
+# ---------------------------------------------------------------------------
+# Welford moments (vectorized over columns)
+# ---------------------------------------------------------------------------
+
+def moments_from_array(X):
+    """
+    Moments of each column of a 2-D float array, ignoring NaN
+
+    Returns:
+        dict: n, mean, m2 (sum of squared deviations), min and max per column
+    """
+    valid = ~np.isnan(X)
+    n = valid.sum(axis=0).astype(np.float64)
+    total = np.where(valid, X, 0.0).sum(axis=0)
+    mean = np.divide(total, n, out=np.zeros_like(total), where=n > 0)
+    m2 = np.where(valid, (X - mean) ** 2, 0.0).sum(axis=0)
+    has_values = n > 0
+    lo = np.where(has_values, np.nanmin(np.where(valid, X, np.inf), axis=0, initial=np.inf), np.inf)
+    hi = np.where(has_values, np.nanmax(np.where(valid, X, -np.inf), axis=0, initial=-np.inf), -np.inf)
+    return {'n': n, 'mean': mean, 'm2': m2, 'min': lo, 'max': hi}
+
+
+def merge_moments(a, b):
+    """Combine two moment states (Chan et al.'s pairwise update)"""
+    n = a['n'] + b['n']
+    delta = b['mean'] - a['mean']
+    safe_n = np.where(n > 0, n, 1.0)
+    return {'n': n,
+            'mean': a['mean'] + delta * b['n'] / safe_n,
+            'm2': a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / safe_n,
+            'min': np.minimum(a['min'], b['min']),
+            'max': np.maximum(a['max'], b['max'])}
+
+
+# ---------------------------------------------------------------------------
+# t-digest
+# ---------------------------------------------------------------------------
+
+def tdigest_compress(means, weights, exact=True, delta=TDIGEST_DELTA):
+    """
+    Merge centroids so each spans at most one unit of the arcsine scale
+    function (small centroids at the tails, large in the middle)
+
+    Equal means are always merged. If the input is an exact histogram
+    (`exact`) and has at most `delta` distinct values, it is kept as is.
+
+    Returns:
+        tuple: (means, weights, exact) with at most about `delta` centroids
+    """
+    if len(means) == 0:
+        return means, weights, exact
+    order = np.argsort(means, kind='stable')
+    means, weights = means[order], weights[order]
+    ties = np.flatnonzero(np.r_[True, means[1:] != means[:-1]])
+    means, weights = means[ties], np.add.reduceat(weights, ties)
+    if exact and len(means) <= delta:
+        return means, weights, True
+    cumulative = np.cumsum(weights)
+    q = (cumulative - weights / 2) / cumulative[-1]
+    k = np.floor(delta / (2 * np.pi) * np.arcsin(2 * q - 1))
+    starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+    merged_weights = np.add.reduceat(weights, starts)
+    merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+    return merged_means, merged_weights, False
+
+
+def tdigest_from_values(values, delta=TDIGEST_DELTA):
+    """t-digest (means, weights, exact) of the non-NaN values"""
+    values = values[~np.isnan(values)]
+    # Hash-count first: most columns have few distinct values, so this skips the sort
+    counts = pd.Series(values, copy=False).value_counts(sort=False)
+    if len(counts) <= delta:
+        counts = counts.sort_index()
+        return counts.index.to_numpy(dtype=np.float64), counts.to_numpy(dtype=np.float64), True
+    return tdigest_compress(values.astype(np.float64), np.ones(len(values)), True, delta)
+
+
+def merge_tdigests(a, b, delta=TDIGEST_DELTA):
+    """Combine two t-digests"""
+    return tdigest_compress(np.concatenate([a[0], b[0]]), np.concatenate([a[1], b[1]]),
+                            a[2] and b[2], delta)
+
+
+def tdigest_quantiles(digest, quantiles, lo, hi):
+    """
+    Estimate quantiles from a t-digest
+
+    An exact histogram gives the exact quantiles (linear interpolation
+    between order statistics, as pandas). Otherwise the estimate
+    interpolates between centroid centers, anchored at the exact minimum
+    `lo` and maximum `hi`.
+
+    Returns:
+        ndarray: One estimate per quantile (NaN for an empty digest)
+    """
+    means, weights, exact = digest
+    if len(means) == 0:
+        return np.full(len(quantiles), np.nan)
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1]
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    if exact:
+        position = quantiles * (total - 1)
+        below = np.floor(position)
+        value_below = means[np.searchsorted(cumulative, below, side='right')]
+        value_above = means[np.searchsorted(cumulative, np.minimum(below + 1, total - 1),
+                                            side='right')]
+        return value_below + (position - below) * (value_above - value_below)
+    centers = np.r_[0.0, cumulative - weights / 2, total]
+    values = np.r_[lo, means, hi]
+    return np.interp(quantiles * total, centers, values)
+
+
+# ---------------------------------------------------------------------------
+# HyperLogLog
+# ---------------------------------------------------------------------------
+
+def hash64(values):
+    """
+    64-bit hashes of float values (splitmix64 finalizer of their bit
+    patterns; -0.0 and 0.0 hash alike)
+
+    Returns:
+        ndarray: uint64 hashes
+    """
+    with np.errstate(over='ignore'):
+        x = (np.asarray(values, dtype=np.float64) + 0.0).view(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def hll_registers(values, precision=HLL_PRECISION):
+    """
+    HyperLogLog registers of the non-NaN values of a float array
+
+    The first `precision` bits of each 64-bit hash pick a register; the
+    register keeps the maximum position of the first set bit in the rest.
+
+    Returns:
+        ndarray: uint8 registers (2**precision)
+    """
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return registers
+    hashes = hash64(values)
+    rest_bits = 64 - precision
+    index = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+    rest = hashes & np.uint64((1 << rest_bits) - 1)
+    # frexp gives the bit length (rest has <= 53 bits, so the float is exact)
+    bit_length = np.frexp(rest.astype(np.float64))[1]
+    np.maximum.at(registers, index, (rest_bits - bit_length + 1).astype(np.uint8))
+    return registers
+
+
+def hll_estimate(registers):
+    """Distinct count estimated from HyperLogLog registers"""
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = np.count_nonzero(registers == 0)
+    if estimate <= 2.5 * m and zeros:
+        # Small-range correction (linear counting)
+        estimate = m * np.log(m / zeros)
+    return int(round(estimate))
+
+
+# ---------------------------------------------------------------------------
+# Dataset profile
+# ---------------------------------------------------------------------------
+
+def profile_chunk(chunk):
+    """
+    Summarize a DataFrame into a mergeable profile state
+
+    Columns of SCHEMA stored as category (and any non-numeric column) get
+    frequency tables; all others get moments, a t-digest and HLL registers.
+
+    Returns:
+        dict: Profile state (see merge_profiles())
+    """
+    columns = list(chunk.columns)
+    numeric = [col for col in columns if SCHEMA.get(col) != 'category'
+               and pd.api.types.is_numeric_dtype(chunk[col])]
+    X = chunk[numeric].to_numpy(dtype=np.float64) if numeric else np.empty((len(chunk), 0))
+    return {
+        'rows': len(chunk),
+        'columns': columns,
+        'numeric': numeric,
+        'missing': chunk.isna().sum().to_numpy(),
+        'moments': moments_from_array(X),
+        'digests': [tdigest_from_values(X[:, j]) for j in range(len(numeric))],
+        'hll': np.stack([hll_registers(X[:, j]) for j in range(len(numeric))])
+               if numeric else np.empty((0, 1 << HLL_PRECISION), dtype=np.uint8),
+        'freqs': {col: chunk[col].value_counts(dropna=True, sort=False).to_dict()
+                  for col in columns if col not in numeric},
+    }
+
+
+def merge_profiles(a, b):
+    """
+    Combine the profile states of two parts of the same file
+
+    Returns:
+        dict: Profile state of both parts
+    """
+    if a is None:
+        return b
+    freqs = {}
+    for col, counts in a['freqs'].items():
+        merged = dict(counts)
+        for value, count in b['freqs'][col].items():
+            merged[value] = merged.get(value, 0) + count
+        freqs[col] = merged
+    return {
+        'rows': a['rows'] + b['rows'],
+        'columns': a['columns'],
+        'numeric': a['numeric'],
+        'missing': a['missing'] + b['missing'],
+        'moments': merge_moments(a['moments'], b['moments']),
+        'digests': [merge_tdigests(da, db) for da, db in zip(a['digests'], b['digests'])],
+        'hll': np.maximum(a['hll'], b['hll']),
+        'freqs': freqs,
+    }
+
+
+def read_range(file_path, columns, start, end):
+    """
+    Parse one byte range: numeric columns as float64, the rest as category
+
+    Unparseable numeric cells (e.g. age=abc) become NaN like empty ones,
+    so the profile counts them as missing (see data_loader.parse_csv_bytes).
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return parse_csv_bytes(data, columns)[0]
+
+
+def _profile_range(task):
+    """Worker: profile one byte range of the file"""
+    return profile_chunk(read_range(*task))
+
+
+def profile_file(file_path=DEFAULT_FILE, workers=None, range_bytes=RANGE_BYTES):
+    """
+    Profile a customer CSV out of core
+
+    Args:
+        file_path: CSV to profile
+        workers: Worker processes (None = all cores, 1 = in-process)
+        range_bytes: Approximate bytes parsed per task
+
+    Returns:
+        dict: Merged profile state (pass it to summarize_profile())
+    """
+    columns, ranges = split_ranges(file_path, range_bytes)
+    tasks = [(file_path, columns, start, end) for start, end in ranges]
+    if not tasks:
+        return profile_chunk(pd.DataFrame(columns=columns))
+    if workers == 1 or len(tasks) == 1:
+        results = map(_profile_range, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_profile_range, tasks)
+    state = None
+    try:
+        for result in results:
+            state = merge_profiles(state, result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return state
+
+
+def summarize_profile(state):
+    """
+    Turn a profile state into the tables explore_data() prints
+
+    Returns:
+        dict: rows, columns, missing (total), info (dtype / non-null /
+        distinct per column), describe (as DataFrame.describe()) and
+        value_counts (column -> Series, most frequent first)
+    """
+    rows, columns, numeric = state['rows'], state['columns'], state['numeric']
+    moments = state['moments']
+    n = moments['n']
+    std = np.sqrt(np.divide(moments['m2'], n - 1, out=np.full_like(n, np.nan), where=n > 1))
+    has_values = n > 0
+    quantiles = [tdigest_quantiles(digest, DESCRIBE_PERCENTILES, lo, hi)
+                 for digest, lo, hi in zip(state['digests'], moments['min'], moments['max'])]
+    describe = pd.DataFrame(
+        [n, np.where(has_values, moments['mean'], np.nan), std,
+         np.where(has_values, moments['min'], np.nan),
+         *np.array(quantiles).reshape(len(numeric), -1).T,
+         np.where(has_values, moments['max'], np.nan)],
+        index=['count', 'mean', 'std', 'min',
+               *(f"{p:.0%}" for p in DESCRIBE_PERCENTILES), 'max'],
+        columns=numeric)
+
+    value_counts = {col: pd.Series(counts, name='count', dtype=np.int64)
+                    .rename_axis(col).sort_values(ascending=False, kind='stable')
+                    for col, counts in state['freqs'].items()}
+    # Exact histograms know their distinct count; the rest use HyperLogLog
+    distinct = {col: len(digest[0]) if digest[2] else hll_estimate(registers)
+                for col, digest, registers in zip(numeric, state['digests'], state['hll'])}
+    distinct.update({col: int((counts > 0).sum()) for col, counts in value_counts.items()})
+    missing = dict(zip(columns, state['missing']))
+    info = pd.DataFrame({
+        'dtype': [SCHEMA.get(col, 'float64' if col in numeric else 'object') for col in columns],
+        'non_null': [rows - int(missing[col]) for col in columns],
+        'distinct': [distinct[col] for col in columns],
+    }, index=pd.Index(columns, name='column'))
+    return {'rows': rows, 'columns': len(columns), 'missing': int(state['missing'].sum()),
+            'info': info, 'describe': describe,
+            'value_counts': {col: counts[counts > 0] for col, counts in value_counts.items()}}
+
+
+def print_summary(summary):
+    """Print a summary in the layout of explore_data()"""
+    print("\n" + "="*60)
+    print("EXPLORATORY DATA ANALYSIS")
+    print("="*60)
+
+    print("\n1. Dataset Overview:")
+    print(f"   Total Customers: {summary['rows']}")
+    print(f"   Total Features: {summary['columns']}")
+
+    print("\n2. Data Quality:")
+    print(summary['info'])
+    print(f"\n   Missing Values: {summary['missing']}")
+
+    print("\n3. Statistical Summary:")
+    print(summary['describe'])
+
+    print("\n4. Categorical Features:")
+    for col, counts in summary['value_counts'].items():
+        print(f"\n   {col}:")
+        print(counts)
+
+
+def summary_to_json(summary):
+    """JSON-serializable form of a summary"""
+    return {'rows': summary['rows'], 'columns': summary['columns'], 'missing': summary['missing'],
+            'info': summary['info'].reset_index().to_dict(orient='records'),
+            'describe': json.loads(summary['describe'].to_json()),
+            'value_counts': {col: {str(k): int(v) for k, v in counts.items()}
+                             for col, counts in summary['value_counts'].items()}}
+
+
+def explore_file(file_path=DEFAULT_FILE, workers=None, range_bytes=RANGE_BYTES):
+    """
+    Out-of-core explore_data(): profile the file and print the summary
+
+    Returns:
+        dict: The summary (see summarize_profile())
+    """
+    summary = summarize_profile(profile_file(file_path, workers, range_bytes))
+    print_summary(summary)
+    return summary
+
+
+def main(argv=None):
+    """Profile a customer CSV with mergeable sketches"""
+    parser = argparse.ArgumentParser(description='Out-of-core dataset profile (mergeable sketches)')
+    parser.add_argument('file', nargs='?', default=DEFAULT_FILE, help='CSV file to profile')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: all cores, 1 = in-process)')
+    parser.add_argument('--range-mb', type=int, default=RANGE_BYTES >> 20,
+                        help='Megabytes of CSV parsed per task')
+    parser.add_argument('--json', default=None, metavar='PATH', help='Also write the summary as JSON')
+    args = parser.parse_args(argv)
+
+    began = time.perf_counter()
+    summary = explore_file(args.file, workers=args.workers, range_bytes=args.range_mb << 20)
+    print(f"\nProfiled {summary['rows']:,} rows in {time.perf_counter() - began:.2f}s")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary_to_json(summary), f, indent=2)
+        print(f"Summary saved to '{args.json}'")
+
+
+if __name__ == "__main__":
+    main()
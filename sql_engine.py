@@ -0,0 +1,577 @@
+"""
+Embedded SQL Engine for queries.sql
+===================================
+Bulk-loads the customer CSV into an embedded database and runs the
+numbered analytical queries from queries.sql by ID, returning DataFrames.
+
+- DuckDB is used when installed (columnar, reads the CSV natively);
+  otherwise the standard-library SQLite engine is used, loaded with
+  batched executemany() inside a single transaction.
+- The table is created from the CREATE TABLE statement in queries.sql,
+  and indexes are added on segment, loyalty_tier and geographic_region
+  (customer_id is the primary key).
+- With --database, a persistent SQLite file (WAL mode) is kept instead.
+  Each refresh hashes the CSV rows and upserts only new or changed
+  customers (INSERT ... ON CONFLICT DO UPDATE) in one large transaction,
+  deletes customers no longer in the CSV, and maintains covering indexes
+  planned from the GROUP BY clauses of queries 4-50.
+- The persistent store also keeps materialized summary tables (count,
+  sum and non-null count of every numeric column) for the segment, tier,
+  region and referral breakdowns. Triggers keep them in step with every
+  upsert/delete, and run_query() rewrites grouped queries and scalar
+  full-table subqueries to read from the smallest matching summary.
+
+Usage:
+    python sql_engine.py --list
+    python sql_engine.py --query 4 --query 28
+    python sql_engine.py --benchmark --repeat 5
+    python sql_engine.py --database --benchmark
+    python sql_engine.py --database --benchmark --no-rewrite
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import csv
+import hashlib
+import itertools
+import os
+import re
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+from data_loader import CACHE_DIR, COLUMNS, DEFAULT_FILE, SCHEMA
+
+QUERIES_FILE = 'queries.sql'
+TABLE = 'ecommerce_customers'
+INDEXED_COLUMNS = ['segment', 'loyalty_tier', 'geographic_region']
+LOAD_BATCH_SIZE = 50_000
+HASH_TABLE = '_row_hashes'
+COVERING_PREFIX = 'cov_'
+# Widest covering index; wider GROUP BY workloads get a plain key index
+MAX_INDEX_COLUMNS = 10
+SUMMARY_PREFIX = 'mv_'
+# Group keys of the materialized summaries (finest last)
+SUMMARY_DIMENSIONS = [
+    ('segment',),
+    ('loyalty_tier',),
+    ('geographic_region',),
+    ('referral_source',),
+    ('segment', 'loyalty_tier', 'payment_method', 'geographic_region'),
+]
+SUMMARY_MEASURES = [col for col, dtype in SCHEMA.items()
+                    if dtype != 'category' and col != 'customer_id']
+
+_QUERY_HEADER = re.compile(r'^--\s*(\d+)\.\s*(.+?)\s*$')
+
+
+def _has_duckdb():
+    """Return True when the optional DuckDB engine is installed"""
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def parse_queries(path=QUERIES_FILE):
+    """
+    Split queries.sql into the CREATE TABLE statement and numbered queries
+
+    A query starts at a '-- <n>. <title>' comment and runs until the next
+    one; other comment lines are dropped.
+
+    Returns:
+        tuple: (create_table_sql, {query_id: (title, sql)})
+    """
+    create_lines = []
+    queries = {}
+    current = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            header = _QUERY_HEADER.match(line)
+            if header:
+                current = int(header.group(1))
+                queries[current] = (header.group(2), [])
+            elif line.lstrip().startswith('--'):
+                continue
+            elif current is None:
+                create_lines.append(line)
+            else:
+                queries[current][1].append(line)
+
+    def clean(lines):
+        return ''.join(lines).strip().rstrip(';').strip()
+
+    return clean(create_lines), {qid: (title, clean(lines)) for qid, (title, lines) in queries.items()}
+
+
+def _load_sqlite(conn, file_path, batch_size):
+    """Insert the CSV rows in batches within one transaction"""
+    with open(file_path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        sql = (f"INSERT INTO {TABLE} ({', '.join(header)}) "
+               f"VALUES ({', '.join('?' * len(header))})")
+        rows = 0
+        with conn:
+            while True:
+                batch = list(itertools.islice(reader, batch_size))
+                if not batch:
+                    break
+                # Column affinity converts the numeric strings on insert
+                conn.executemany(sql, batch)
+                rows += len(batch)
+    return rows
+
+
+def connect(file_path=DEFAULT_FILE, engine='auto', queries_file=QUERIES_FILE,
+            batch_size=LOAD_BATCH_SIZE):
+    """
+    Create an in-memory database with the customer table loaded and indexed
+
+    Args:
+        file_path: Customer CSV
+        engine: 'duckdb', 'sqlite' or 'auto' (DuckDB when installed)
+        queries_file: queries.sql (source of the CREATE TABLE statement)
+        batch_size: Rows per executemany() call (SQLite)
+
+    Returns:
+        tuple: (connection, engine name, load info dict with rows and seconds)
+    """
+    if engine == 'auto':
+        engine = 'duckdb' if _has_duckdb() else 'sqlite'
+    create_sql, _ = parse_queries(queries_file)
+
+    start = time.perf_counter()
+    if engine == 'duckdb':
+        import duckdb
+        conn = duckdb.connect(':memory:')
+        conn.execute(create_sql)
+        conn.execute(f"INSERT INTO {TABLE} SELECT * FROM read_csv_auto(?, header=true)",
+                     [file_path])
+        rows = conn.execute(f"SELECT COUNT(*) FROM {TABLE}").fetchone()[0]
+    elif engine == 'sqlite':
+        conn = sqlite3.connect(':memory:')
+        conn.execute(create_sql)
+        rows = _load_sqlite(conn, file_path, batch_size)
+    else:
+        raise ValueError(f"Unknown engine '{engine}'; use 'duckdb', 'sqlite' or 'auto'")
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for column in INDEXED_COLUMNS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{column} ON {TABLE} ({column})")
+    if engine == 'sqlite':
+        conn.execute('ANALYZE')
+    index_time = time.perf_counter() - start
+    return conn, engine, {'rows': rows, 'load_time': load_time, 'index_time': index_time}
+
+
+# ---------------------------------------------------------------------------
+# Persistent store
+# ---------------------------------------------------------------------------
+
+def database_path(file_path):
+    """Default location of the persistent database for a source CSV"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(directory, f"{name}.sqlite")
+
+
+def plan_covering_indexes(queries, query_ids=range(4, 51), max_columns=MAX_INDEX_COLUMNS):
+    """
+    Choose indexes for the GROUP BY keys used by a set of queries
+
+    Queries grouping by the same table columns share one index: the key
+    columns followed by every other column those queries read, so SQLite
+    can answer them from the index alone. When that is wider than
+    max_columns only the key columns are indexed. GROUP BY on computed
+    aliases (e.g. age_group) is skipped.
+
+    Returns:
+        list: (index name, column list) pairs
+    """
+    known = set(COLUMNS)
+    by_key = {}
+    for query_id in query_ids:
+        if query_id not in queries:
+            continue
+        sql = queries[query_id][1]
+        group_by = re.search(r'GROUP BY\s+(.+?)\s*(?:ORDER BY|HAVING|LIMIT|$)', sql, re.S)
+        if not group_by:
+            continue
+        key = tuple(col.strip() for col in group_by.group(1).split(','))
+        if not set(key) <= known:
+            continue
+        used = {word for word in re.findall(r'\w+', sql) if word in known}
+        by_key.setdefault(key, set()).update(used - set(key))
+
+    indexes = []
+    for key, used in sorted(by_key.items()):
+        columns = list(key) + sorted(used)
+        if len(columns) > max_columns:
+            columns = list(key)
+        indexes.append((COVERING_PREFIX + '_'.join(key), columns))
+    return indexes
+
+
+def open_store(db_path, queries_file=QUERIES_FILE):
+    """
+    Open (or create) the persistent database in WAL mode
+
+    Returns:
+        sqlite3.Connection: Connection with the customer and row-hash tables
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    create_sql, _ = parse_queries(queries_file)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(create_sql)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {HASH_TABLE} "
+                 f"(customer_id INTEGER PRIMARY KEY, row_hash INTEGER NOT NULL)")
+    return conn
+
+
+def _row_hash(row):
+    """Signed 64-bit hash of a raw CSV row"""
+    digest = hashlib.blake2b('\x1f'.join(row).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+
+def refresh_store(conn, file_path=DEFAULT_FILE, batch_size=LOAD_BATCH_SIZE):
+    """
+    Bring the persistent table in line with the CSV
+
+    Rows whose hash matches the stored one are skipped; new and changed
+    customers are upserted in batches and customers missing from the CSV
+    are deleted, all in one transaction.
+
+    Returns:
+        dict: rows (read), added, changed, removed, seconds and rows_per_sec
+    """
+    start = time.perf_counter()
+    stored = conn.execute(f"SELECT customer_id, row_hash FROM {HASH_TABLE} ORDER BY customer_id").fetchall()
+    stored_ids = np.array([r[0] for r in stored], dtype=np.int64)
+    stored_hashes = np.array([r[1] for r in stored], dtype=np.int64)
+    seen = np.zeros(len(stored_ids), dtype=bool)
+    del stored
+
+    info = {'rows': 0, 'added': 0, 'changed': 0, 'removed': 0}
+    with open(file_path, newline='', encoding='utf-8') as f, conn:
+        reader = csv.reader(f)
+        header = next(reader)
+        updates = ', '.join(f"{col} = excluded.{col}" for col in header if col != 'customer_id')
+        upsert = (f"INSERT INTO {TABLE} ({', '.join(header)}) VALUES ({', '.join('?' * len(header))}) "
+                  f"ON CONFLICT(customer_id) DO UPDATE SET {updates}")
+        upsert_hash = (f"INSERT INTO {HASH_TABLE} (customer_id, row_hash) VALUES (?, ?) "
+                       f"ON CONFLICT(customer_id) DO UPDATE SET row_hash = excluded.row_hash")
+        id_col = header.index('customer_id')
+
+        while True:
+            batch = list(itertools.islice(reader, batch_size))
+            if not batch:
+                break
+            ids = np.array([int(row[id_col]) for row in batch], dtype=np.int64)
+            hashes = np.array([_row_hash(row) for row in batch], dtype=np.int64)
+            pos = np.minimum(np.searchsorted(stored_ids, ids), max(len(stored_ids) - 1, 0))
+            found = (stored_ids[pos] == ids) if len(stored_ids) else np.zeros(len(ids), dtype=bool)
+            seen[pos[found]] = True
+            changed = found & (stored_hashes[pos] != hashes) if len(stored_ids) else found
+            write = np.flatnonzero(~found | changed)
+
+            conn.executemany(upsert, [batch[i] for i in write])
+            conn.executemany(upsert_hash, zip(ids[write].tolist(), hashes[write].tolist()))
+            info['rows'] += len(batch)
+            info['added'] += int((~found).sum())
+            info['changed'] += int(changed.sum())
+
+        removed = stored_ids[~seen].tolist()
+        for table in (TABLE, HASH_TABLE):
+            conn.executemany(f"DELETE FROM {table} WHERE customer_id = ?", ((i,) for i in removed))
+        info['removed'] = len(removed)
+
+    info['seconds'] = time.perf_counter() - start
+    info['rows_per_sec'] = info['rows'] / info['seconds'] if info['seconds'] else float('inf')
+    return info
+
+
+def sync_indexes(conn, indexes):
+    """
+    Create the planned covering indexes and drop stale ones
+
+    Planner statistics are refreshed (ANALYZE) only when the index set
+    changed, so a no-op refresh stays cheap.
+
+    Returns:
+        float: Seconds spent
+    """
+    start = time.perf_counter()
+    existing = {name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE ?",
+        (COVERING_PREFIX + '%',))}
+    planned = dict(indexes)
+    for name in existing - set(planned):
+        conn.execute(f"DROP INDEX {name}")
+    for name, columns in indexes:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {TABLE} ({', '.join(columns)})")
+    if existing != set(planned):
+        conn.execute('ANALYZE')
+    conn.commit()
+    return time.perf_counter() - start
+
+
+# ---------------------------------------------------------------------------
+# Materialized summaries
+# ---------------------------------------------------------------------------
+
+def summary_name(dims):
+    """Table name of the summary grouped by `dims`"""
+    return SUMMARY_PREFIX + '__'.join(dims)
+
+
+def _summary_delta_sql(dims, row, sign):
+    """Trigger statement adding (sign=+1) or removing (-1) one row from a summary"""
+    name = summary_name(dims)
+    op = '+' if sign > 0 else '-'
+    columns = list(dims) + ['row_count']
+    values = [f"{row}.{d}" for d in dims] + [str(sign)]
+    updates = ['row_count = row_count + excluded.row_count']
+    for m in SUMMARY_MEASURES:
+        columns += [f"sum_{m}", f"n_{m}"]
+        values += [f"{op}COALESCE({row}.{m}, 0)", f"{op}({row}.{m} IS NOT NULL)"]
+        updates += [f"sum_{m} = sum_{m} + excluded.sum_{m}", f"n_{m} = n_{m} + excluded.n_{m}"]
+    sql = (f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join(values)}) "
+           f"ON CONFLICT({', '.join(dims)}) DO UPDATE SET {', '.join(updates)};")
+    if sign < 0:
+        sql += f" DELETE FROM {name} WHERE row_count = 0;"
+    return sql
+
+
+def ensure_summaries(conn, dimensions=SUMMARY_DIMENSIONS):
+    """
+    Create missing summary tables (one GROUP BY pass each) and their triggers
+
+    After creation, INSERT/UPDATE/DELETE triggers on the customer table
+    apply each row change to every summary, so refresh_store() keeps them
+    current without rescanning.
+
+    Returns:
+        list: Names of the summaries that were built
+    """
+    existing = {name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+        (SUMMARY_PREFIX + '%',))}
+    built = []
+    with conn:
+        for dims in dimensions:
+            name = summary_name(dims)
+            if name in existing:
+                continue
+            measure_defs = []
+            measure_aggs = []
+            for m in SUMMARY_MEASURES:
+                kind = 'REAL' if SCHEMA[m].startswith('float') else 'INTEGER'
+                measure_defs += [f"sum_{m} {kind} NOT NULL", f"n_{m} INTEGER NOT NULL"]
+                measure_aggs += [f"COALESCE(SUM({m}), 0)", f"COUNT({m})"]
+            conn.execute(f"CREATE TABLE {name} ({', '.join(f'{d} TEXT' for d in dims)}, "
+                         f"row_count INTEGER NOT NULL, {', '.join(measure_defs)}, "
+                         f"PRIMARY KEY ({', '.join(dims)}))")
+            conn.execute(f"INSERT INTO {name} SELECT {', '.join(dims)}, COUNT(*), "
+                         f"{', '.join(measure_aggs)} FROM {TABLE} GROUP BY {', '.join(dims)}")
+            conn.executescript(
+                f"CREATE TRIGGER {name}_ins AFTER INSERT ON {TABLE} BEGIN "
+                f"{_summary_delta_sql(dims, 'NEW', 1)} END;"
+                f"CREATE TRIGGER {name}_del AFTER DELETE ON {TABLE} BEGIN "
+                f"{_summary_delta_sql(dims, 'OLD', -1)} END;"
+                f"CREATE TRIGGER {name}_upd AFTER UPDATE ON {TABLE} BEGIN "
+                f"{_summary_delta_sql(dims, 'OLD', -1)} {_summary_delta_sql(dims, 'NEW', 1)} END;")
+            built.append(name)
+    return built
+
+
+def list_summaries(conn):
+    """
+    Summaries present in a database
+
+    Returns:
+        dict: Summary table name -> tuple of group columns
+    """
+    if not isinstance(conn, sqlite3.Connection):
+        return {}
+    names = {name for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+        (SUMMARY_PREFIX + '%',))}
+    return {summary_name(dims): dims for dims in SUMMARY_DIMENSIONS if summary_name(dims) in names}
+
+
+def _translate_aggregates(sql):
+    """Rewrite COUNT/SUM/AVG over customer columns into summary-column aggregates"""
+    sql = re.sub(r'COUNT\(\s*\*\s*\)', 'SUM(row_count)', sql, flags=re.I)
+    sql = re.sub(r'COUNT\(\s*(\w+)\s*\)', r'SUM(n_\1)', sql, flags=re.I)
+    sql = re.sub(r'AVG\(\s*(\w+)\s*\)', r'(SUM(sum_\1) * 1.0 / SUM(n_\1))', sql, flags=re.I)
+    return re.sub(r'(?<!\w)SUM\(\s*(?!row_count|sum_|n_)(\w+)\s*\)', r'SUM(sum_\1)', sql, flags=re.I)
+
+
+def _covers(sql, dims):
+    """True when every customer column left in a translated query is a group column"""
+    if re.search(r'\b(MIN|MAX)\s*\(', sql, re.I):
+        return False
+    aliases = set(re.findall(r'\bAS\s+(\w+)', sql, re.I))
+    used = {word for word in re.findall(r'\w+', sql) if word in SCHEMA} - aliases
+    return used <= set(dims)
+
+
+def rewrite_query(sql, summaries):
+    """
+    Point a query at materialized summaries where the result is unchanged
+
+    - Scalar subqueries such as (SELECT COUNT(*) FROM ecommerce_customers)
+      or (SELECT AVG(x) FROM ecommerce_customers) read the smallest summary.
+    - A query with only COUNT/SUM/AVG aggregates whose GROUP BY and WHERE
+      columns are all group columns of a summary is run on the smallest
+      such summary.
+
+    Returns:
+        str: Rewritten SQL (the input when nothing matches)
+    """
+    if not summaries:
+        return sql
+    by_size = sorted(summaries.items(), key=lambda item: len(item[1]))
+
+    def scalar(match):
+        inner = _translate_aggregates(match.group(1))
+        return f"(SELECT {inner} FROM {by_size[0][0]})"
+
+    sql = re.sub(rf'\(\s*SELECT\s+((?:COUNT|SUM|AVG)\(\s*[\w*]+\s*\))\s+FROM\s+{TABLE}\s*\)',
+                 scalar, sql, flags=re.I)
+    if len(re.findall(rf'\bFROM\s+{TABLE}\b', sql, re.I)) != 1 or \
+            not re.search(r'\b(COUNT|SUM|AVG)\s*\(', sql, re.I):
+        return sql
+    translated = _translate_aggregates(sql)
+    for name, dims in by_size:
+        if _covers(translated, dims):
+            return re.sub(rf'\bFROM\s+{TABLE}\b', f"FROM {name}", translated, flags=re.I)
+    return sql
+
+
+def execute(conn, sql):
+    """Run a SQL statement and return the result as a DataFrame"""
+    if isinstance(conn, sqlite3.Connection):
+        return pd.read_sql_query(sql, conn)
+    return conn.execute(sql).df()
+
+
+def run_query(conn, query_id, queries, rewrite=True):
+    """
+    Run one numbered query from queries.sql
+
+    Args:
+        conn: Connection from connect() or open_store()
+        query_id: Query number
+        queries: Dict returned by parse_queries()[1]
+        rewrite: Read from materialized summaries when they answer the query
+
+    Returns:
+        DataFrame: Query result
+    """
+    if query_id not in queries:
+        raise KeyError(f"Query {query_id} not found in {QUERIES_FILE}")
+    sql = queries[query_id][1]
+    if rewrite:
+        sql = rewrite_query(sql, list_summaries(conn))
+    return execute(conn, sql)
+
+
+def benchmark(conn, queries, query_ids=None, repeat=3, rewrite=True):
+    """
+    Time every query
+
+    Returns:
+        DataFrame: id, title, rows, best_ms, median_ms and whether the
+        query was rewritten to a summary, per query
+    """
+    summaries = list_summaries(conn) if rewrite else {}
+    results = []
+    for query_id in (sorted(queries) if query_ids is None else query_ids):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run_query(conn, query_id, queries, rewrite=rewrite)
+            times.append((time.perf_counter() - start) * 1000)
+        sql = queries[query_id][1]
+        results.append({'id': query_id, 'title': queries[query_id][0], 'rows': len(result),
+                        'best_ms': min(times), 'median_ms': float(np.median(times)),
+                        'rewritten': rewrite_query(sql, summaries) != sql})
+    return pd.DataFrame(results)
+
+
+def print_benchmark(results):
+    """Print benchmark timings, slowest first"""
+    print(f"\n   {'#':>3}  {'best (ms)':>10} {'median (ms)':>12} {'rows':>8}  title")
+    for r in results.sort_values('median_ms', ascending=False).itertuples():
+        marker = ' [summary]' if r.rewritten else ''
+        print(f"   {r.id:>3}  {r.best_ms:>10.2f} {r.median_ms:>12.2f} {r.rows:>8}  {r.title}{marker}")
+    print(f"   Total (median): {results['median_ms'].sum():.1f} ms")
+
+
+def main(argv=None):
+    """Run queries.sql queries against the customer CSV"""
+    parser = argparse.ArgumentParser(description='Run the queries.sql reports on an embedded database')
+    parser.add_argument('--file', default=DEFAULT_FILE, help='Customer CSV file')
+    parser.add_argument('--queries', default=QUERIES_FILE, help='SQL file with numbered queries')
+    parser.add_argument('--engine', choices=['auto', 'duckdb', 'sqlite'], default='auto',
+                        help='Embedded engine (auto = DuckDB when installed, else SQLite)')
+    parser.add_argument('--database', nargs='?', const='', default=None, metavar='PATH',
+                        help='Use a persistent SQLite file, refreshed incrementally from the CSV '
+                             '(default path: .cache/<name>.sqlite)')
+    parser.add_argument('--query', type=int, action='append', default=[], metavar='ID',
+                        help='Query number to run (repeatable)')
+    parser.add_argument('--list', action='store_true', help='List the numbered queries')
+    parser.add_argument('--benchmark', action='store_true', help='Time every query')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per query when benchmarking')
+    parser.add_argument('--no-rewrite', action='store_true',
+                        help='Always scan the customer table instead of the materialized summaries')
+    args = parser.parse_args(argv)
+
+    _, queries = parse_queries(args.queries)
+    if args.list:
+        for query_id, (title, _) in queries.items():
+            print(f"{query_id:>3}. {title}")
+        return
+
+    if args.database is not None:
+        db_path = args.database or database_path(args.file)
+        conn = open_store(db_path, args.queries)
+        info = refresh_store(conn, args.file)
+        index_time = sync_indexes(conn, plan_covering_indexes(queries))
+        built = ensure_summaries(conn)
+        print(f"Refreshed '{db_path}' from {info['rows']} rows in {info['seconds']:.2f}s "
+              f"({info['rows_per_sec']:,.0f} rows/s): {info['added']} added, "
+              f"{info['changed']} changed, {info['removed']} removed; "
+              f"indexes synced in {index_time:.2f}s")
+        if built:
+            print(f"Built summaries: {', '.join(built)}")
+    else:
+        conn, engine, info = connect(args.file, engine=args.engine, queries_file=args.queries)
+        rate = info['rows'] / info['load_time'] if info['load_time'] else float('inf')
+        print(f"Loaded {info['rows']} customers into {engine} in {info['load_time']:.2f}s "
+              f"({rate:,.0f} rows/s), indexes built in {info['index_time']:.2f}s")
+
+    for query_id in args.query:
+        print(f"\n{query_id}. {queries[query_id][0]}")
+        print(run_query(conn, query_id, queries, rewrite=not args.no_rewrite).to_string(index=False))
+
+    if args.benchmark:
+        print_benchmark(benchmark(conn, queries, repeat=args.repeat, rewrite=not args.no_rewrite))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
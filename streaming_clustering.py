@@ -0,0 +1,121 @@
+"""
+Streaming K-Means Clustering
+============================
+Out-of-core variant of the K-Means clustering used in analyze_customers.py
+and customer_segmentation.py. The data is read in chunks with the typed
+loader and never held in memory as a whole:
+
+1. A StandardScaler is fitted incrementally with partial_fit.
+2. A MiniBatchKMeans model is fitted incrementally on the scaled chunks.
+3. Clusters are assigned chunk by chunk and appended to the output CSV,
+   while per-cluster feature means are accumulated for reporting.
+
+Chunks are always visited in file order and the model is seeded, so the
+labels are reproducible for a fixed random_state and chunksize.
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+from data_loader import DEFAULT_CHUNKSIZE, iter_chunks
+
+
+def fit_streaming_scaler(file_path, features, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Fit a StandardScaler over the file one chunk at a time
+
+    Returns:
+        StandardScaler: Scaler fitted on all rows
+    """
+    scaler = StandardScaler()
+    for chunk in iter_chunks(file_path, columns=features, chunksize=chunksize):
+        scaler.partial_fit(chunk[features].to_numpy(dtype=np.float64))
+    return scaler
+
+
+def fit_streaming_kmeans(file_path, features, n_clusters=4, chunksize=DEFAULT_CHUNKSIZE,
+                         scaler=None, n_epochs=3, batch_size=4096, random_state=42):
+    """
+    Fit MiniBatchKMeans over the file without loading it into memory
+
+    Args:
+        file_path: Path to the customer CSV
+        features: Feature columns to cluster on
+        n_clusters: Number of clusters
+        chunksize: Rows read per chunk
+        scaler: Pre-fitted StandardScaler (fitted here when None)
+        n_epochs: Number of passes over the file
+        batch_size: Mini-batch size used inside each chunk
+        random_state: Seed for initialization and mini-batch sampling
+
+    Returns:
+        tuple: (kmeans, scaler)
+    """
+    if scaler is None:
+        scaler = fit_streaming_scaler(file_path, features, chunksize)
+
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state,
+                             batch_size=batch_size, n_init=3)
+    for _ in range(n_epochs):
+        for chunk in iter_chunks(file_path, columns=features, chunksize=chunksize):
+            X_scaled = scaler.transform(chunk[features].to_numpy(dtype=np.float64))
+            # Split large chunks so every partial_fit call sees one mini-batch
+            for start in range(0, len(X_scaled), batch_size):
+                batch = X_scaled[start:start + batch_size]
+                if len(batch) >= n_clusters:
+                    kmeans.partial_fit(batch)
+    return kmeans, scaler
+
+
+def assign_streaming(file_path, features, kmeans, scaler, output_file,
+                     label_column='cluster', chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Assign clusters chunk by chunk and append them to the output CSV
+
+    Returns:
+        DataFrame: Per-cluster feature means and customer counts
+    """
+    n_clusters = kmeans.n_clusters
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    sums = np.zeros((n_clusters, len(features)))
+
+    first = True
+    for chunk in iter_chunks(file_path, chunksize=chunksize):
+        X = chunk[features].to_numpy(dtype=np.float64)
+        labels = kmeans.predict(scaler.transform(X))
+        chunk[label_column] = labels
+
+        counts += np.bincount(labels, minlength=n_clusters)
+        for j in range(len(features)):
+            sums[:, j] += np.bincount(labels, weights=X[:, j], minlength=n_clusters)
+
+        chunk.to_csv(output_file, mode='w' if first else 'a', header=first, index=False)
+        first = False
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts[:, None]
+    stats = pd.DataFrame(means, columns=features)
+    stats['customer_id'] = counts
+    stats.index.name = label_column
+    return stats[counts > 0]
+
+
+def streaming_kmeans(file_path, features, output_file, n_clusters=4, label_column='cluster',
+                     chunksize=DEFAULT_CHUNKSIZE, random_state=42):
+    """
+    Fit and apply streaming K-Means end to end
+
+    Returns:
+        tuple: (cluster_stats, kmeans, scaler)
+    """
+    kmeans, scaler = fit_streaming_kmeans(file_path, features, n_clusters=n_clusters,
+                                          chunksize=chunksize, random_state=random_state)
+    stats = assign_streaming(file_path, features, kmeans, scaler, output_file,
+                             label_column=label_column, chunksize=chunksize)
+    return stats, kmeans, scaler
@@ -0,0 +1,324 @@
+"""
+Streaming Data-Quality Validator
+================================
+Validates a customer CSV of any size without loading it whole. The file is
+split into byte ranges aligned to line starts; worker processes parse
+their ranges (typed, falling back to text when a numeric column holds
+text) and run every check as a vectorized column operation, returning
+violation counts and a few examples per check. The main process adds the
+counts up and merges the sorted customer_id runs of all ranges to find
+duplicates across the whole file.
+
+Checks:
+- schema: header columns present and in the declared order
+- missing:<column>: empty values
+- type:<column>: non-numeric values, or non-integers in integer columns
+- range:<column>: values outside RANGES (age 18-70, scores 0-100,
+  rates within [0, 1], counts >= 0, ...)
+- category:<column>: values outside data_loader.CATEGORIES
+- duplicate:customer_id: ids seen more than once anywhere in the file
+- invariant:<name>: cross-column rules (CLV = avg_order_value x
+  purchase_frequency x customer_since_months / 12, total_purchases =
+  purchase_frequency, click-through rate <= email open rate)
+
+Fields must not contain embedded newlines (true of every file the
+generator writes), so that ranges can be split on line boundaries.
+
+Usage:
+    python validate_dataset.py                         # ecommerce_customers.csv
+    python validate_dataset.py customers_100m.csv --workers 16 --json report.json
+
+Author: RSK World
+Website: https://rskworld.in
+Email: help@rskworld.in
+Phone: +91 93305 39277
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from data_loader import (CATEGORIES, COLUMNS, DEFAULT_FILE, RANGE_BYTES, SCHEMA, parse_csv_bytes,
+                         split_ranges)
+
+# Inclusive (low, high) bounds; None leaves a side open
+RATE = (0.0, 1.0)
+RANGES = {
+    'customer_id': (1, None),
+    'age': (18, 70),
+    'annual_income': (0, None),
+    'spending_score': (0, 100),
+    'purchase_frequency': (0, None),
+    'avg_order_value': (0, None),
+    'total_purchases': (0, None),
+    'browsing_time_minutes': (0, None),
+    'last_purchase_days': (0, None),
+    'customer_lifetime_value': (0, None),
+    'return_rate': RATE,
+    'social_media_engagement': (0, 100),
+    'avg_review_rating': (1, 5),
+    'cart_abandonment_rate': RATE,
+    'discount_usage_pct': RATE,
+    'customer_satisfaction_score': (1, 5),
+    'preferred_shopping_hour': (0, 23),
+    'wishlist_items': (0, None),
+    'customer_since_months': (0, None),
+    'email_open_rate': RATE,
+    'click_through_rate': RATE,
+    'cross_category_purchases': (0, None),
+    'repeat_purchase_rate': RATE,
+    'avg_session_duration': (0, None),
+    'pages_per_session': (0, None),
+    'support_interactions': (0, None),
+    'product_reviews_count': (0, None),
+    'social_shares': (0, None),
+    'coupon_redemptions': (0, None),
+}
+NUMERIC_COLUMNS = [col for col, dtype in SCHEMA.items() if dtype != 'category']
+INTEGER_COLUMNS = [col for col in NUMERIC_COLUMNS if SCHEMA[col].startswith('int')]
+MAX_EXAMPLES = 5
+
+
+def _plain(value):
+    """NumPy scalar -> JSON-friendly Python value (integral floats as int)"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _flag(result, check, mask, rows, ids, values=None):
+    """Record the rows where `mask` is True under `check`"""
+    count = int(mask.sum())
+    if count == 0:
+        return
+    result['counts'][check] = result['counts'].get(check, 0) + count
+    examples = result['examples'].setdefault(check, [])
+    if len(examples) < MAX_EXAMPLES:
+        for i in np.flatnonzero(mask)[:MAX_EXAMPLES - len(examples)]:
+            example = {'row': int(rows[i]), 'customer_id': _plain(ids[i])}
+            if values is not None:
+                example['value'] = _plain(values[i])
+            examples.append(example)
+
+
+def validate_chunk(chunk, first_row=0, result=None, invalid=None):
+    """
+    Run the per-row checks on a parsed chunk
+
+    Args:
+        chunk: DataFrame with numeric columns as float64 and categorical
+            columns as category, missing values as NaN (see parse_range)
+        first_row: Data row number of the chunk's first row
+        result: Partial result to add to (None = new)
+        invalid: Column -> mask of values that failed to parse (reported
+            as type errors by the caller, so not counted as missing)
+
+    Returns:
+        dict: rows, counts (check -> violations), examples and ids (the
+        chunk's customer_ids)
+    """
+    result = result or {'rows': 0, 'counts': {}, 'examples': {}, 'ids': []}
+    invalid = invalid or {}
+    n = len(chunk)
+    rows = np.arange(first_row, first_row + n)
+    ids = chunk['customer_id'].to_numpy(dtype=np.float64) if 'customer_id' in chunk \
+        else np.full(n, np.nan)
+
+    numeric = {}
+    for col in NUMERIC_COLUMNS:
+        if col not in chunk:
+            continue
+        values = chunk[col].to_numpy(dtype=np.float64)
+        nan = np.isnan(values)
+        _flag(result, f"missing:{col}", nan & ~invalid.get(col, False), rows, ids)
+        if col in INTEGER_COLUMNS:
+            _flag(result, f"type:{col}", ~nan & (values != np.floor(values)), rows, ids, values)
+        low, high = RANGES.get(col, (None, None))
+        out = np.zeros(n, dtype=bool)
+        if low is not None:
+            out |= values < low
+        if high is not None:
+            out |= values > high
+        _flag(result, f"range:{col}", out, rows, ids, values)
+        numeric[col] = values
+
+    for col, allowed in CATEGORIES.items():
+        if col not in chunk:
+            continue
+        column = chunk[col].astype('category')
+        codes = column.cat.codes.to_numpy()
+        _flag(result, f"missing:{col}", codes < 0, rows, ids)
+        # One membership test per distinct value, then a lookup by code
+        known = np.append(column.cat.categories.isin(allowed), True)
+        values = np.append(column.cat.categories.to_numpy(dtype=object), None)
+        _flag(result, f"category:{col}", ~known[codes], rows, ids, values[codes])
+
+    if {'customer_lifetime_value', 'avg_order_value', 'purchase_frequency',
+            'customer_since_months'} <= set(numeric):
+        # CLV is computed from the unrounded order value, so allow the
+        # half-cent rounding of avg_order_value scaled by the multiplier
+        multiplier = numeric['purchase_frequency'] * numeric['customer_since_months'] / 12
+        expected = numeric['avg_order_value'] * multiplier
+        tolerance = 0.005 * np.abs(multiplier) + 0.01
+        _flag(result, 'invariant:clv_formula',
+              np.abs(numeric['customer_lifetime_value'] - expected) > tolerance, rows, ids)
+    if {'total_purchases', 'purchase_frequency'} <= set(numeric):
+        _flag(result, 'invariant:total_purchases_eq_frequency',
+              numeric['total_purchases'] != numeric['purchase_frequency'], rows, ids)
+    if {'click_through_rate', 'email_open_rate'} <= set(numeric):
+        _flag(result, 'invariant:click_through_le_open_rate',
+              numeric['click_through_rate'] > numeric['email_open_rate'], rows, ids)
+
+    result['ids'].append(ids[~np.isnan(ids)].astype(np.int64))
+    result['rows'] += n
+    return result
+
+
+def parse_range(data, columns, result, first_row=0):
+    """
+    Parse CSV bytes for validate_chunk()
+
+    Uses data_loader.parse_csv_bytes(); the numeric values it could not
+    parse are recorded as type:<column> violations.
+
+    Returns:
+        tuple: (chunk, invalid masks for validate_chunk)
+    """
+    chunk, unparsed = parse_csv_bytes(data, columns, keep_default_na=False, na_values=[''])
+    invalid = {}
+    rows = np.arange(first_row, first_row + len(chunk))
+    for col, (bad, text) in unparsed.items():
+        _flag(result, f"type:{col}", bad, rows,
+              chunk['customer_id'].to_numpy() if 'customer_id' in chunk else rows, text)
+        invalid[col] = bad
+    return chunk, invalid
+
+
+def _validate_range(task):
+    """Worker: parse and validate one byte range of the file"""
+    file_path, columns, start, end = task
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    result = {'rows': 0, 'counts': {}, 'examples': {}, 'ids': []}
+    chunk, invalid = parse_range(data, columns, result)
+    result = validate_chunk(chunk, result=result, invalid=invalid)
+    ids = np.concatenate(result['ids']) if result['ids'] else np.empty(0, dtype=np.int64)
+    ids.sort()
+    # Sorted ids fit in int32 for any realistic dataset (halves the transfer)
+    if len(ids) and ids[0] >= np.iinfo(np.int32).min and ids[-1] <= np.iinfo(np.int32).max:
+        ids = ids.astype(np.int32)
+    result['ids'] = ids
+    return result
+
+
+def find_duplicates(runs):
+    """
+    Duplicate ids across sorted runs
+
+    Returns:
+        tuple: (number of extra occurrences, sorted array of duplicated ids)
+    """
+    if not runs:
+        return 0, np.empty(0, dtype=np.int64)
+    merged = np.sort(np.concatenate(runs), kind='stable')
+    repeated = merged[1:] == merged[:-1]
+    return int(repeated.sum()), np.unique(merged[1:][repeated])
+
+
+def validate_file(file_path=DEFAULT_FILE, workers=None, range_bytes=RANGE_BYTES):
+    """
+    Validate a customer CSV
+
+    Args:
+        file_path: CSV to check
+        workers: Worker processes (None = all cores, 1 = in-process)
+        range_bytes: Approximate bytes parsed per task
+
+    Returns:
+        dict: file, rows, seconds, valid, checks (check -> violation count,
+        zero counts omitted) and examples (check -> up to MAX_EXAMPLES rows)
+    """
+    start_time = time.perf_counter()
+    columns, ranges = split_ranges(file_path, range_bytes)
+    report = {'file': file_path, 'rows': 0, 'checks': {}, 'examples': {}}
+
+    missing = [col for col in COLUMNS if col not in columns]
+    unexpected = [col for col in columns if col not in COLUMNS]
+    if missing or unexpected or columns != COLUMNS:
+        report['checks']['schema:columns'] = len(missing) + len(unexpected) or 1
+        report['examples']['schema:columns'] = [{'missing': missing, 'unexpected': unexpected,
+                                                 'order_matches': columns == COLUMNS}]
+
+    tasks = [(file_path, columns, start, end) for start, end in ranges]
+    if workers == 1 or len(tasks) <= 1:
+        results = map(_validate_range, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        results = pool.map(_validate_range, tasks)
+    runs = []
+    try:
+        for result in results:
+            offset = report['rows'] + 1
+            for check, count in result['counts'].items():
+                report['checks'][check] = report['checks'].get(check, 0) + count
+                examples = report['examples'].setdefault(check, [])
+                for example in result['examples'][check][:MAX_EXAMPLES - len(examples)]:
+                    examples.append(dict(example, row=example['row'] + offset))
+            report['rows'] += result['rows']
+            runs.append(result['ids'])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    n_duplicates, duplicated = find_duplicates(runs)
+    if n_duplicates:
+        report['checks']['duplicate:customer_id'] = n_duplicates
+        report['examples']['duplicate:customer_id'] = [{'customer_id': int(i)}
+                                                       for i in duplicated[:MAX_EXAMPLES]]
+    report['valid'] = not report['checks']
+    report['seconds'] = time.perf_counter() - start_time
+    return report
+
+
+def print_report(report):
+    """Print a validation report"""
+    print(f"\nValidated '{report['file']}': {report['rows']:,} rows in {report['seconds']:.2f}s "
+          f"({report['rows'] / max(report['seconds'], 1e-9):,.0f} rows/s)")
+    if report['valid']:
+        print("   All checks passed")
+        return
+    print(f"   {'check':<48}{'violations':>12}")
+    for check, count in sorted(report['checks'].items(), key=lambda item: (-item[1], item[0])):
+        print(f"   {check:<48}{count:>12,}")
+        for example in report['examples'].get(check, []):
+            print(f"      {example}")
+
+
+def main(argv=None):
+    """Validate a dataset and exit with status 1 if any check fails"""
+    parser = argparse.ArgumentParser(description='Validate a customer CSV in parallel chunks')
+    parser.add_argument('file', nargs='?', default=DEFAULT_FILE, help='CSV file to validate')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: all cores, 1 = in-process)')
+    parser.add_argument('--range-mb', type=int, default=RANGE_BYTES >> 20,
+                        help='Megabytes of CSV parsed per task')
+    parser.add_argument('--json', default=None, metavar='PATH', help='Also write the report as JSON')
+    args = parser.parse_args(argv)
+
+    report = validate_file(args.file, workers=args.workers, range_bytes=args.range_mb << 20)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nReport saved to '{args.json}'")
+    return 0 if report['valid'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,16 +8,44 @@ This script creates comprehensive visualizations including:
 - Device usage patterns
 - Age group analysis
 
+Each chart is split into a prepare_* step, which reduces the DataFrame to
+the small aggregates the chart needs, and a render_* step that draws and
+saves the figure. render_charts() runs the render steps in a process pool
+(Agg backend), so workers receive only the pre-aggregated data. Counts,
+means and crosstabs are sliced from the persisted aggregate cube (cube.py)
+shared with analyze_customers.py.
+
+The scatter panels switch to a binned 2D density (np.histogram2d) when the
+dataset has more than `density_threshold` rows, optionally overlaid with a
+segment-stratified sample of points, so render cost does not grow with
+the number of customers.
+
+Usage:
+    python visualize_data.py --jobs 4 --skip correlation_heatmap
+    python visualize_data.py --density-threshold 20000 --overlay-sample 2000
+
 Author: RSK World
 Website: https://rskworld.in
 Email: help@rskworld.in
 Phone: +91 93305 39277
 """
 
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 import seaborn as sns
+from data_loader import load_customers
+from sampling import stratified_sample_indices
+from cube import build_cube, load_cube, cube_counts, cube_mean, cube_slice, cube_sum
+from correlation import correlations_from_frame, load_correlations
+from profiling import add_profile_arguments, add_stages, new_profile, profile_from_args, report_profile, stage
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -26,68 +54,163 @@ sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (14, 8)
 plt.rcParams['font.size'] = 10
 
-def load_data(file_path='ecommerce_customers.csv'):
-    """Load the dataset"""
+# Columns used by the plot_* functions
+PLOT_COLUMNS = ['age', 'annual_income', 'spending_score', 'purchase_frequency',
+                'avg_order_value', 'total_purchases', 'browsing_time_minutes',
+                'product_category_preference', 'device_type', 'segment']
+
+def load_data(file_path='ecommerce_customers.csv', columns=PLOT_COLUMNS):
+    """Load the columns needed for plotting (typed schema, Parquet-cached)"""
     try:
-        df = pd.read_csv(file_path)
+        df = load_customers(file_path, columns=columns)
         print(f"Dataset loaded: {len(df)} customers")
         return df
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found")
         return None
 
-def plot_segment_distribution(df):
-    """Plot customer segment distribution"""
+SEGMENT_COLORS = {'High Value': '#28a745', 'Medium Value': '#ffc107', 'Low Value': '#6c757d'}
+CORRELATION_COLUMNS = ['age', 'annual_income', 'spending_score', 'purchase_frequency',
+                       'avg_order_value', 'total_purchases', 'browsing_time_minutes']
+
+# Scatter panels above this many rows are drawn as binned densities
+DENSITY_THRESHOLD = 50_000
+DENSITY_BINS = 120
+# Points drawn over a density panel (stratified by segment, 0 = none)
+OVERLAY_SAMPLE = 0
+
+def _slice(df, cube, by):
+    """Roll the aggregate cube up to `by` (building it from df when not given)"""
+    return cube_slice(build_cube(df) if cube is None else cube, by)
+
+def _segment_colors(segments):
+    """SEGMENT_COLORS for segment labels in plot order (unknown segments in blue)"""
+    return [SEGMENT_COLORS.get(str(segment), '#007bff') for segment in segments]
+
+def _top_counts(sliced):
+    """Counts in value_counts() order (descending, ties in category order)"""
+    return cube_counts(sliced).sort_values(ascending=False, kind='stable')
+
+def _save(fig, output):
+    """Save and close a figure"""
+    fig.tight_layout()
+    fig.savefig(output, dpi=300, bbox_inches='tight')
+    print(f"Saved: {output}")
+    plt.close(fig)
+
+def _bin_edges(values, bins=DENSITY_BINS):
+    """Histogram bin edges; integer columns get one bin per value when that is coarser"""
+    lo, hi = float(values.min()), float(values.max())
+    if np.issubdtype(values.dtype, np.integer) and hi - lo + 1 <= bins:
+        return np.arange(lo, hi + 2) - 0.5
+    return np.linspace(lo, hi if hi > lo else lo + 1, bins + 1)
+
+def scatter_data(df, x, y, density_threshold=DENSITY_THRESHOLD, overlay_sample=OVERLAY_SAMPLE,
+                 strata='segment', random_state=42):
+    """
+    Points for a scatter panel, or a binned density for large inputs
+    
+    Args:
+        df: Customer DataFrame
+        x, y: Column names
+        density_threshold: Row count above which a 2D histogram is used
+        overlay_sample: Points kept over the density (stratified by `strata`)
+        strata: Column used to stratify the overlay sample
+        random_state: Seed for the overlay sample
+    
+    Returns:
+        dict: x, y and labels (all rows, or the overlay sample) and density
+        (None, or (counts, x edges, y edges))
+    """
+    idx = slice(None)
+    density = None
+    if len(df) > density_threshold:
+        xv, yv = df[x].to_numpy(), df[y].to_numpy()
+        counts, xedges, yedges = np.histogram2d(xv, yv, bins=[_bin_edges(xv), _bin_edges(yv)])
+        density = (counts, xedges, yedges)
+        idx = stratified_sample_indices(df[strata], overlay_sample, random_state) if overlay_sample else []
+    return {'x': df[x].to_numpy()[idx], 'y': df[y].to_numpy()[idx],
+            'labels': df[strata].to_numpy()[idx], 'density': density}
+
+def _draw_density(ax, density, cmap='viridis'):
+    """Draw a 2D histogram on a log color scale with a colorbar"""
+    counts, xedges, yedges = density
+    mesh = ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts, 0).T, cmap=cmap,
+                         norm=LogNorm())
+    ax.figure.colorbar(mesh, ax=ax, label='Customers per bin')
+
+def _draw_scatter(ax, data):
+    """Scatter colored by y (small datasets) or density plus optional overlay"""
+    if data['density'] is None:
+        ax.scatter(data['x'], data['y'], alpha=0.6, c=data['y'], cmap='viridis', s=100)
+    else:
+        _draw_density(ax, data['density'])
+        if len(data['x']):
+            ax.scatter(data['x'], data['y'], c='black', alpha=0.3, s=4)
+
+def prepare_segment_distribution(df, cube=None):
+    """Aggregates for the segment distribution chart"""
+    return {'segment_counts': _top_counts(_slice(df, cube, 'segment'))}
+
+def render_segment_distribution(data, output='segment_distribution.png'):
+    """Render the segment distribution chart"""
+    segment_counts = data['segment_counts']
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     
     # Count plot
-    segment_counts = df['segment'].value_counts()
     axes[0].bar(segment_counts.index, segment_counts.values, 
-                color=['#28a745', '#ffc107', '#6c757d'])
+                color=_segment_colors(segment_counts.index))
     axes[0].set_title('Customer Segment Distribution', fontsize=14, fontweight='bold')
     axes[0].set_xlabel('Segment')
     axes[0].set_ylabel('Number of Customers')
     axes[0].grid(axis='y', alpha=0.3)
     
     # Pie chart
-    colors = ['#28a745', '#ffc107', '#6c757d']
+    colors = _segment_colors(segment_counts.index)
     axes[1].pie(segment_counts.values, labels=segment_counts.index, autopct='%1.1f%%',
                 colors=colors, startangle=90)
     axes[1].set_title('Segment Percentage Distribution', fontsize=14, fontweight='bold')
     
-    plt.tight_layout()
-    plt.savefig('segment_distribution.png', dpi=300, bbox_inches='tight')
-    print("Saved: segment_distribution.png")
-    plt.close()
+    _save(fig, output)
 
-def plot_income_vs_spending(df):
-    """Plot income vs spending score"""
+def prepare_income_vs_spending(df, cube=None, density_threshold=DENSITY_THRESHOLD, overlay_sample=OVERLAY_SAMPLE):
+    """(income, spending score) points, or their density for large inputs"""
+    return scatter_data(df, 'annual_income', 'spending_score', density_threshold, overlay_sample)
+
+def render_income_vs_spending(data, output='income_vs_spending.png'):
+    """Render income vs spending score"""
     fig, ax = plt.subplots(figsize=(12, 8))
     
+    if data['density'] is not None:
+        _draw_density(ax, data['density'], cmap='Greys')
+    
     # Scatter plot with segment colors
-    segment_colors = {'High Value': '#28a745', 'Medium Value': '#ffc107', 'Low Value': '#6c757d'}
-    for segment in df['segment'].unique():
-        segment_data = df[df['segment'] == segment]
-        ax.scatter(segment_data['annual_income'], segment_data['spending_score'],
-                  c=segment_colors[segment], label=segment, alpha=0.6, s=100)
+    size = 100 if data['density'] is None else 6
+    for segment in pd.unique(data['labels']):
+        mask = data['labels'] == segment
+        ax.scatter(data['x'][mask], data['y'][mask],
+                  c=SEGMENT_COLORS[segment], label=segment, alpha=0.6, s=size)
     
     ax.set_xlabel('Annual Income ($)', fontsize=12)
     ax.set_ylabel('Spending Score', fontsize=12)
     ax.set_title('Annual Income vs Spending Score by Segment', fontsize=14, fontweight='bold')
-    ax.legend()
+    if len(data['x']):
+        ax.legend()
     ax.grid(alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('income_vs_spending.png', dpi=300, bbox_inches='tight')
-    print("Saved: income_vs_spending.png")
-    plt.close()
+    _save(fig, output)
 
-def plot_product_preferences(df):
-    """Plot product category preferences"""
+def prepare_product_preferences(df, cube=None):
+    """Category counts and the category-by-segment crosstab"""
+    return {'category_counts': _top_counts(_slice(df, cube, 'product_category_preference')),
+            'category_segment': cube_counts(_slice(df, cube, ['product_category_preference', 'segment']))}
+
+def render_product_preferences(data, output='product_preferences.png'):
+    """Render product category preferences"""
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     
     # Category distribution
-    category_counts = df['product_category_preference'].value_counts()
+    category_counts = data['category_counts']
     # Use a color palette that works for any number of categories
     colors = plt.cm.Set3(range(len(category_counts)))
     axes[0].bar(category_counts.index, category_counts.values, color=colors)
@@ -97,26 +220,30 @@ def plot_product_preferences(df):
     axes[0].grid(axis='y', alpha=0.3)
     
     # Category by segment
-    category_segment = pd.crosstab(df['product_category_preference'], df['segment'])
-    category_segment.plot(kind='bar', ax=axes[1], color=['#6c757d', '#ffc107', '#28a745'])
+    data['category_segment'].plot(kind='bar', ax=axes[1],
+                                  color=_segment_colors(data['category_segment'].columns))
     axes[1].set_title('Product Category by Segment', fontsize=14, fontweight='bold')
     axes[1].set_xlabel('Category')
     axes[1].set_ylabel('Number of Customers')
     axes[1].legend(title='Segment')
     axes[1].grid(axis='y', alpha=0.3)
-    axes[1].tick_params(axis='x', rotation=45, ha='right')
+    # tick_params() does not accept ha, so align the labels directly
+    plt.setp(axes[1].get_xticklabels(), rotation=45, ha='right')
     
-    plt.tight_layout()
-    plt.savefig('product_preferences.png', dpi=300, bbox_inches='tight')
-    print("Saved: product_preferences.png")
-    plt.close()
+    _save(fig, output)
 
-def plot_device_usage(df):
-    """Plot device type usage patterns"""
+def prepare_device_usage(df, cube=None):
+    """Device counts and average browsing time per device"""
+    by_device = _slice(df, cube, 'device_type')
+    return {'device_counts': _top_counts(by_device),
+            'device_browsing': cube_mean(by_device, 'browsing_time_minutes').sort_values(ascending=False)}
+
+def render_device_usage(data, output='device_usage.png'):
+    """Render device type usage patterns"""
     fig, axes = plt.subplots(1, 2, figsize=(14, 6))
     
     # Device distribution
-    device_counts = df['device_type'].value_counts()
+    device_counts = data['device_counts']
     axes[0].bar(device_counts.index, device_counts.values, 
                 color=['#007bff', '#28a745', '#ffc107'])
     axes[0].set_title('Device Type Distribution', fontsize=14, fontweight='bold')
@@ -125,28 +252,30 @@ def plot_device_usage(df):
     axes[0].grid(axis='y', alpha=0.3)
     
     # Average browsing time by device
-    device_browsing = df.groupby('device_type')['browsing_time_minutes'].mean().sort_values(ascending=False)
+    device_browsing = data['device_browsing']
     axes[1].bar(device_browsing.index, device_browsing.values, color=['#007bff', '#28a745', '#ffc107'])
     axes[1].set_title('Average Browsing Time by Device', fontsize=14, fontweight='bold')
     axes[1].set_xlabel('Device Type')
     axes[1].set_ylabel('Average Browsing Time (minutes)')
     axes[1].grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('device_usage.png', dpi=300, bbox_inches='tight')
-    print("Saved: device_usage.png")
-    plt.close()
+    _save(fig, output)
 
-def plot_age_analysis(df):
-    """Plot age group analysis"""
-    # Create age groups
-    df['age_group'] = pd.cut(df['age'], bins=[0, 25, 35, 50, 100], 
-                             labels=['Young (0-25)', 'Adult (26-35)', 'Middle (36-50)', 'Senior (50+)'])
-    
+def prepare_age_analysis(df, cube=None, density_threshold=DENSITY_THRESHOLD,
+                         overlay_sample=OVERLAY_SAMPLE):
+    """Age group aggregates and (age, spending score) points or density"""
+    by_age = _slice(df, cube, 'age_group')
+    return {'age_counts': cube_counts(by_age),
+            'age_spending': cube_mean(by_age, 'spending_score'),
+            'age_segment': cube_counts(_slice(df, cube, ['age_group', 'segment'])),
+            'scatter': scatter_data(df, 'age', 'spending_score', density_threshold, overlay_sample)}
+
+def render_age_analysis(data, output='age_analysis.png'):
+    """Render age group analysis"""
     fig, axes = plt.subplots(2, 2, figsize=(14, 12))
     
     # Age distribution
-    age_counts = df['age_group'].value_counts().sort_index()
+    age_counts = data['age_counts']
     axes[0, 0].bar(range(len(age_counts)), age_counts.values, color=['#007bff', '#28a745', '#ffc107', '#dc3545'])
     axes[0, 0].set_xticks(range(len(age_counts)))
     axes[0, 0].set_xticklabels(age_counts.index, rotation=15, ha='right')
@@ -155,7 +284,7 @@ def plot_age_analysis(df):
     axes[0, 0].grid(axis='y', alpha=0.3)
     
     # Average spending by age group
-    age_spending = df.groupby('age_group')['spending_score'].mean().sort_index()
+    age_spending = data['age_spending']
     axes[0, 1].bar(range(len(age_spending)), age_spending.values, color=['#007bff', '#28a745', '#ffc107', '#dc3545'])
     axes[0, 1].set_xticks(range(len(age_spending)))
     axes[0, 1].set_xticklabels(age_spending.index, rotation=15, ha='right')
@@ -164,16 +293,15 @@ def plot_age_analysis(df):
     axes[0, 1].grid(axis='y', alpha=0.3)
     
     # Age vs spending scatter
-    axes[1, 0].scatter(df['age'], df['spending_score'], alpha=0.6, c=df['spending_score'], 
-                      cmap='viridis', s=100)
+    _draw_scatter(axes[1, 0], data['scatter'])
     axes[1, 0].set_xlabel('Age')
     axes[1, 0].set_ylabel('Spending Score')
     axes[1, 0].set_title('Age vs Spending Score', fontsize=12, fontweight='bold')
     axes[1, 0].grid(alpha=0.3)
     
     # Age group by segment
-    age_segment = pd.crosstab(df['age_group'], df['segment'])
-    age_segment.plot(kind='bar', ax=axes[1, 1], color=['#6c757d', '#ffc107', '#28a745'])
+    data['age_segment'].plot(kind='bar', ax=axes[1, 1],
+                             color=_segment_colors(data['age_segment'].columns))
     axes[1, 1].set_title('Age Group by Segment', fontsize=12, fontweight='bold')
     axes[1, 1].set_xlabel('Age Group')
     axes[1, 1].set_ylabel('Number of Customers')
@@ -181,101 +309,252 @@ def plot_age_analysis(df):
     axes[1, 1].grid(axis='y', alpha=0.3)
     axes[1, 1].tick_params(axis='x', rotation=15)
     
-    plt.tight_layout()
-    plt.savefig('age_analysis.png', dpi=300, bbox_inches='tight')
-    print("Saved: age_analysis.png")
-    plt.close()
+    _save(fig, output)
 
-def plot_correlation_heatmap(df):
-    """Plot correlation heatmap"""
-    numeric_cols = ['age', 'annual_income', 'spending_score', 'purchase_frequency',
-                   'avg_order_value', 'total_purchases', 'browsing_time_minutes']
-    correlation_matrix = df[numeric_cols].corr()
-    
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', center=0,
+def prepare_correlation_heatmap(df, cube=None, correlations=None):
+    """Correlation matrix of the numeric features (from `correlations` when given)"""
+    if correlations is None:
+        correlations = correlations_from_frame(df, CORRELATION_COLUMNS)
+    return {'correlation_matrix': correlations['pearson'].loc[CORRELATION_COLUMNS,
+                                                              CORRELATION_COLUMNS]}
+
+def render_correlation_heatmap(data, output='correlation_heatmap.png'):
+    """Render the correlation heatmap"""
+    fig = plt.figure(figsize=(10, 8))
+    sns.heatmap(data['correlation_matrix'], annot=True, cmap='coolwarm', center=0,
                 square=True, linewidths=1, cbar_kws={"shrink": 0.8})
     plt.title('Feature Correlation Heatmap', fontsize=14, fontweight='bold', pad=20)
-    plt.tight_layout()
-    plt.savefig('correlation_heatmap.png', dpi=300, bbox_inches='tight')
-    print("Saved: correlation_heatmap.png")
-    plt.close()
+    _save(fig, output)
 
-def plot_purchase_behavior(df):
-    """Plot purchase behavior analysis"""
+def prepare_purchase_behavior(df, cube=None, density_threshold=DENSITY_THRESHOLD,
+                              overlay_sample=OVERLAY_SAMPLE):
+    """Purchase frequency histogram, segment aggregates and scatter points or density"""
+    counts, edges = np.histogram(df['purchase_frequency'], bins=20)
+    by_segment = _slice(df, cube, 'segment')
+    return {'frequency_hist': (counts, edges),
+            'segment_aov': cube_mean(by_segment, 'avg_order_value').sort_values(ascending=False),
+            'segment_purchases': cube_sum(by_segment, 'total_purchases'),
+            'scatter': scatter_data(df, 'purchase_frequency', 'spending_score',
+                                    density_threshold, overlay_sample)}
+
+def render_purchase_behavior(data, output='purchase_behavior.png'):
+    """Render purchase behavior analysis"""
     fig, axes = plt.subplots(2, 2, figsize=(14, 12))
     
-    # Purchase frequency distribution
-    axes[0, 0].hist(df['purchase_frequency'], bins=20, color='#007bff', edgecolor='black', alpha=0.7)
+    # Purchase frequency distribution (pre-binned counts drawn as weights)
+    counts, edges = data['frequency_hist']
+    axes[0, 0].hist(edges[:-1], bins=edges, weights=counts, color='#007bff', edgecolor='black', alpha=0.7)
     axes[0, 0].set_title('Purchase Frequency Distribution', fontsize=12, fontweight='bold')
     axes[0, 0].set_xlabel('Purchase Frequency')
     axes[0, 0].set_ylabel('Number of Customers')
     axes[0, 0].grid(axis='y', alpha=0.3)
     
     # Average order value by segment
-    segment_aov = df.groupby('segment')['avg_order_value'].mean().sort_values(ascending=False)
-    axes[0, 1].bar(segment_aov.index, segment_aov.values, color=['#28a745', '#ffc107', '#6c757d'])
+    segment_aov = data['segment_aov']
+    axes[0, 1].bar(segment_aov.index, segment_aov.values, color=_segment_colors(segment_aov.index))
     axes[0, 1].set_title('Average Order Value by Segment', fontsize=12, fontweight='bold')
     axes[0, 1].set_xlabel('Segment')
     axes[0, 1].set_ylabel('Average Order Value ($)')
     axes[0, 1].grid(axis='y', alpha=0.3)
     
     # Purchase frequency vs spending score
-    axes[1, 0].scatter(df['purchase_frequency'], df['spending_score'], 
-                      alpha=0.6, c=df['spending_score'], cmap='viridis', s=100)
+    _draw_scatter(axes[1, 0], data['scatter'])
     axes[1, 0].set_xlabel('Purchase Frequency')
     axes[1, 0].set_ylabel('Spending Score')
     axes[1, 0].set_title('Purchase Frequency vs Spending Score', fontsize=12, fontweight='bold')
     axes[1, 0].grid(alpha=0.3)
     
     # Total purchases by segment
-    segment_purchases = df.groupby('segment')['total_purchases'].sum()
+    segment_purchases = data['segment_purchases']
     axes[1, 1].bar(segment_purchases.index, segment_purchases.values, 
-                   color=['#28a745', '#ffc107', '#6c757d'])
+                   color=_segment_colors(segment_purchases.index))
     axes[1, 1].set_title('Total Purchases by Segment', fontsize=12, fontweight='bold')
     axes[1, 1].set_xlabel('Segment')
     axes[1, 1].set_ylabel('Total Purchases')
     axes[1, 1].grid(axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('purchase_behavior.png', dpi=300, bbox_inches='tight')
-    print("Saved: purchase_behavior.png")
-    plt.close()
+    _save(fig, output)
 
-def main():
-    """Main visualization function"""
+# Chart name -> (prepare, render, output file), in rendering order
+CHARTS = {
+    'segment_distribution': (prepare_segment_distribution, render_segment_distribution,
+                             'segment_distribution.png'),
+    'income_vs_spending': (prepare_income_vs_spending, render_income_vs_spending,
+                           'income_vs_spending.png'),
+    'product_preferences': (prepare_product_preferences, render_product_preferences,
+                            'product_preferences.png'),
+    'device_usage': (prepare_device_usage, render_device_usage, 'device_usage.png'),
+    'age_analysis': (prepare_age_analysis, render_age_analysis, 'age_analysis.png'),
+    'correlation_heatmap': (prepare_correlation_heatmap, render_correlation_heatmap,
+                            'correlation_heatmap.png'),
+    'purchase_behavior': (prepare_purchase_behavior, render_purchase_behavior,
+                          'purchase_behavior.png'),
+}
+# Charts whose prepare step also accepts density_threshold / overlay_sample
+DENSITY_CHARTS = ('income_vs_spending', 'age_analysis', 'purchase_behavior')
+
+def plot_segment_distribution(df):
+    """Plot customer segment distribution"""
+    render_segment_distribution(prepare_segment_distribution(df))
+
+def plot_income_vs_spending(df):
+    """Plot income vs spending score"""
+    render_income_vs_spending(prepare_income_vs_spending(df))
+
+def plot_product_preferences(df):
+    """Plot product category preferences"""
+    render_product_preferences(prepare_product_preferences(df))
+
+def plot_device_usage(df):
+    """Plot device type usage patterns"""
+    render_device_usage(prepare_device_usage(df))
+
+def plot_age_analysis(df):
+    """Plot age group analysis"""
+    render_age_analysis(prepare_age_analysis(df))
+
+def plot_correlation_heatmap(df):
+    """Plot correlation heatmap"""
+    render_correlation_heatmap(prepare_correlation_heatmap(df))
+
+def plot_purchase_behavior(df):
+    """Plot purchase behavior analysis"""
+    render_purchase_behavior(prepare_purchase_behavior(df))
+
+def _init_renderer():
+    """Worker initializer: switch to the non-interactive Agg backend"""
+    matplotlib.use('Agg')
+
+def _render_chart(task):
+    """Worker: render one chart, returning its time and profiling.stage() record"""
+    name, data, output = task
+    worker_profile = new_profile('render')
+    with stage(worker_profile, f"render:{name}") as record:
+        CHARTS[name][1](data, output)
+    return name, record['wall_s'], record
+
+def render_charts(df, charts=None, n_jobs=None, density_threshold=DENSITY_THRESHOLD,
+                  overlay_sample=OVERLAY_SAMPLE, cube=None, correlations=None, profile=None):
+    """
+    Prepare and render charts, rendering in parallel worker processes
+    
+    Args:
+        df: Customer DataFrame
+        charts: Chart names to render (default: all of CHARTS)
+        n_jobs: Worker processes (None = one per chart up to the core
+            count, 1 = render in-process)
+        density_threshold: Rows above which scatter panels become densities
+        overlay_sample: Points drawn over each density panel
+        cube: Aggregate cube for the counts/means/crosstabs (built from df
+            when not given)
+        correlations: Matrices from correlation.load_correlations() for
+            the heatmap (computed from df when not given)
+        profile: Profile from profiling.new_profile() to record each
+            prepare and render stage in (render stages are measured in the
+            worker that drew the chart)
+    
+    Returns:
+        dict: Chart name -> (prepare seconds, render seconds, output file)
+    """
+    charts = list(CHARTS) if charts is None else [name for name in CHARTS if name in charts]
+    if cube is None:
+        with stage(profile, 'build_cube', df):
+            cube = build_cube(df)
+    tasks = []
+    prepare_times = {}
+    for name in charts:
+        prepare, _, output = CHARTS[name]
+        options = {'cube': cube}
+        if name in DENSITY_CHARTS:
+            options.update(density_threshold=density_threshold, overlay_sample=overlay_sample)
+        if name == 'correlation_heatmap':
+            options['correlations'] = correlations
+        start = time.perf_counter()
+        with stage(profile, f"prepare:{name}", df):
+            tasks.append((name, prepare(df, **options), output))
+        prepare_times[name] = time.perf_counter() - start
+    
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    with stage(profile, 'render_all'):
+        if n_jobs == 1:
+            _init_renderer()
+            results = [_render_chart(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_renderer) as pool:
+                results = list(pool.map(_render_chart, tasks))
+    render_times = {name: seconds for name, seconds, _ in results}
+    add_stages(profile, [record for _, _, record in results],
+               process='in-process' if n_jobs == 1 else 'worker')
+    
+    return {name: (prepare_times[name], render_times[name], CHARTS[name][2]) for name in charts}
+
+def print_render_timings(timings, elapsed):
+    """Print per-chart prepare/render times, slowest render first"""
+    print("\nChart timings (seconds):")
+    print(f"   {'chart':<22}{'prepare':>10}{'render':>10}")
+    for name, (prepare_time, render_time, _) in sorted(timings.items(), key=lambda item: -item[1][1]):
+        print(f"   {name:<22}{prepare_time:>10.2f}{render_time:>10.2f}")
+    print(f"   Total wall time: {elapsed:.2f}s")
+
+def run_visualizations(args, profile=None):
+    """
+    Render the charts selected by the command-line arguments
+    
+    Each stage is measured when `profile` (see profiling.py) is given.
+    """
     print("="*60)
     print("E-COMMERCE CUSTOMER DATASET - DATA VISUALIZATION")
     print("RSK World - https://rskworld.in")
     print("="*60)
     
     # Load data
-    df = load_data()
+    with stage(profile, 'load') as record:
+        df = record['df'] = load_data(args.file)
     if df is None:
         return
+    with stage(profile, 'load_cube'):
+        cube = load_cube(args.file)
+    charts = [name for name in CHARTS if name not in args.skip]
+    correlations = None
+    if 'correlation_heatmap' in charts:
+        with stage(profile, 'load_correlations'):
+            correlations = load_correlations(args.file)
     
     # Generate all visualizations
     print("\nGenerating visualizations...")
-    plot_segment_distribution(df)
-    plot_income_vs_spending(df)
-    plot_product_preferences(df)
-    plot_device_usage(df)
-    plot_age_analysis(df)
-    plot_correlation_heatmap(df)
-    plot_purchase_behavior(df)
+    start = time.perf_counter()
+    timings = render_charts(df, charts, n_jobs=args.jobs, density_threshold=args.density_threshold,
+                            overlay_sample=args.overlay_sample, cube=cube,
+                            correlations=correlations, profile=profile)
+    print_render_timings(timings, time.perf_counter() - start)
     
     print("\n" + "="*60)
     print("ALL VISUALIZATIONS GENERATED SUCCESSFULLY!")
     print("="*60)
     print("\nGenerated files:")
-    print("  - segment_distribution.png")
-    print("  - income_vs_spending.png")
-    print("  - product_preferences.png")
-    print("  - device_usage.png")
-    print("  - age_analysis.png")
-    print("  - correlation_heatmap.png")
-    print("  - purchase_behavior.png")
+    for name in charts:
+        print(f"  - {CHARTS[name][2]}")
+
+def main(argv=None):
+    """Main visualization function"""
+    parser = argparse.ArgumentParser(description='Generate the customer dataset charts')
+    parser.add_argument('--file', default='ecommerce_customers.csv', help='Customer CSV file')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Rendering processes (default: one per chart up to the core count)')
+    parser.add_argument('--skip', nargs='+', default=[], choices=list(CHARTS), metavar='CHART',
+                        help=f"Charts to skip: {', '.join(CHARTS)}")
+    parser.add_argument('--density-threshold', type=int, default=DENSITY_THRESHOLD,
+                        help='Rows above which scatter panels are drawn as binned densities')
+    parser.add_argument('--overlay-sample', type=int, default=OVERLAY_SAMPLE,
+                        help='Segment-stratified points drawn over density panels (0 = none)')
+    add_profile_arguments(parser, 'visualize_data')
+    args = parser.parse_args(argv)
+    
+    profile = profile_from_args(args, 'visualize_data')
+    try:
+        run_visualizations(args, profile)
+    finally:
+        report_profile(profile, args)
 
 if __name__ == "__main__":
     main()
-